@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Migration script to add token_version column to account table.
+
+Access token mang claim "ver" phải khớp account.token_version; tăng cột này để thu hồi mọi token đã cấp.
+Token cũ (không có claim "ver") được coi là ver = 0 nên vẫn dùng được sau khi migrate.
+"""
+import os
+import sys
+
+from sqlalchemy import inspect, text
+
+# Add the current directory to the path so we can import from app
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.database.session import engine
+
+
+def run_migration():
+    """Add token_version column to account table"""
+    columns = {column["name"] for column in inspect(engine).get_columns("account")}
+    if "token_version" in columns:
+        print("token_version column already exists in account table")
+        return
+
+    with engine.begin() as conn:
+        print("Adding token_version column to account table...")
+        conn.execute(text("""
+            ALTER TABLE account
+            ADD COLUMN token_version INTEGER NOT NULL DEFAULT 0
+        """))
+    print("Migration completed successfully!")
+
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Migration script to add product search indexes (dùng với SEARCH_BACKEND=fulltext).
+
+PostgreSQL: bật extension pg_trgm + unaccent (cần quyền CREATE trên database) và tạo GIN index trigram
+trên tên variation / product. SQLite: tạo bảng FTS5 variation_search + trigger đồng bộ.
+Chạy lại được; trên SQLite mỗi lần chạy sẽ dựng lại bảng FTS5 từ dữ liệu hiện có.
+"""
+import os
+import sys
+
+# Add the current directory to the path so we can import from app
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.database.fulltext import install_fulltext
+from app.database.session import engine
+
+
+def run_migration():
+    """Create full-text search indexes for product / variation names"""
+    with engine.begin() as conn:
+        print(f"Creating product search indexes ({engine.dialect.name})...")
+        if not install_fulltext(conn):
+            print(f"Full-text search is not supported on {engine.dialect.name}, keep SEARCH_BACKEND=like")
+            return
+    print("Migration completed successfully! Set SEARCH_BACKEND=fulltext to use it.")
+
+
+if __name__ == "__main__":
+    run_migration()
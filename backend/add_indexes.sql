@@ -56,6 +56,7 @@ CREATE INDEX IF NOT EXISTS idx_employee_status ON employee(status);
 CREATE INDEX IF NOT EXISTS idx_variation_product_status ON variation(productid, status);
 CREATE INDEX IF NOT EXISTS idx_posorder_customer_status ON posorder(customerid, status);
 CREATE INDEX IF NOT EXISTS idx_images_variation_default ON images(variationid, set_default);
+CREATE INDEX IF NOT EXISTS idx_posorder_creation_date_pk ON posorder(creation_date DESC, pk_posorder DESC); -- keyset pagination
 
 -- Analyze tables for better query planning
 ANALYZE account;
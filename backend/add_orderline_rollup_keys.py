@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Migration script to add categoryid / brandid columns to orderline table.
+
+sales_daily_rollup trừ số liệu khi hủy/sửa đơn theo nhóm (danh mục, thương hiệu) chụp trên orderline lúc đặt hàng.
+Dòng cũ được điền theo product hiện tại (giống cách rollup đang tính), nên chạy trước khi đổi danh mục sản phẩm.
+"""
+import os
+import sys
+
+from sqlalchemy import inspect, text
+
+# Add the current directory to the path so we can import from app
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.database.session import engine
+
+
+def run_migration():
+    """Add categoryid / brandid columns to orderline table and backfill them"""
+    columns = {column["name"] for column in inspect(engine).get_columns("orderline")}
+
+    with engine.begin() as conn:
+        for column in ("categoryid", "brandid"):
+            if column in columns:
+                print(f"{column} column already exists in orderline table")
+                continue
+            print(f"Adding {column} column to orderline table...")
+            conn.execute(text(f"ALTER TABLE orderline ADD COLUMN {column} INTEGER"))
+
+        print("Backfilling categoryid / brandid from current products...")
+        conn.execute(text("""
+            UPDATE orderline
+            SET categoryid = COALESCE((
+                    SELECT p.categoryid FROM variation v JOIN product p ON p.pk_product = v.productid
+                    WHERE v.pk_variation = orderline.variationid
+                ), 0),
+                brandid = COALESCE((
+                    SELECT p.brandid FROM variation v JOIN product p ON p.pk_product = v.productid
+                    WHERE v.pk_variation = orderline.variationid
+                ), 0)
+            WHERE categoryid IS NULL OR brandid IS NULL
+        """))
+    print("Migration completed successfully!")
+
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,84 @@
+import logging
+from typing import NamedTuple, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.model.account_model import Account
+from app.model.customer_model import Customer
+
+logger = logging.getLogger(__name__)
+
+
+class CachedAccount(NamedTuple):
+    """Thông tin account cần cho mỗi request đã đăng nhập (không phải ORM object, không gắn với session)"""
+
+    PK_Account: int
+    Username: str
+    RoleID: int
+    Status: str
+    CustomerID: Optional[int]
+    TokenVersion: int = 0
+
+
+class AccountCache:
+    """
+    Cache username -> CachedAccount (TTL ngắn + LRU) cho get_current_account.
+    Các thay đổi status / mật khẩu / customer phải gọi invalidate_account(username) để có hiệu lực ngay;
+    các thay đổi khác có hiệu lực sau tối đa `ttl` giây.
+    """
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 30):
+        self._accounts = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, db: Session, username: str) -> Optional[CachedAccount]:
+        account = self._accounts.get(username)
+        if account is not None:
+            return account
+
+        # Một câu SELECT: account + customer profile (nếu có)
+        row = db.execute(
+            select(
+                Account.PK_Account,
+                Account.Username,
+                Account.RoleID,
+                Account.Status,
+                Customer.PK_Customer,
+                Account.Token_Version,
+            )
+            .outerjoin(Customer, Customer.AccountID == Account.PK_Account)
+            .where(Account.Username == username)
+            .order_by(Customer.PK_Customer)
+            .limit(1)
+        ).first()
+        if row is None:
+            return None
+        account = CachedAccount(*row)
+        self._accounts.set(username, account)
+        return account
+
+    def invalidate(self, username: str):
+        self._accounts.pop(username)
+
+    def clear(self):
+        self._accounts.clear()
+
+
+_account_cache: Optional[AccountCache] = None
+
+
+def get_account_cache() -> AccountCache:
+    global _account_cache
+    if _account_cache is None:
+        from app.core.config import settings
+
+        _account_cache = AccountCache(settings.AUTH_CACHE_SIZE, settings.AUTH_CACHE_TTL_SECONDS)
+    return _account_cache
+
+
+def invalidate_account(username: Optional[str]):
+    """Gọi sau khi commit thay đổi status / mật khẩu / customer của account"""
+    if _account_cache is not None and username:
+        _account_cache.invalidate(username)
+        logger.debug(f"Account cache invalidated: {username}")
@@ -1,16 +1,23 @@
 from datetime import datetime, timedelta
+from typing import Optional
 import logging
+import math
+import uuid
 
-from argon2 import PasswordHasher
-from argon2.exceptions import VerifyMismatchError
+from fastapi import HTTPException, status
 from jose import jwt
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
+from app.auth.login_limiter import LoginRateLimited, get_login_limiter
+from app.auth.password_pool import PasswordPoolBusy, get_password_pool
+from app.auth.revocation import get_revocation_list
 from app.core.config import settings
 from app.model.account_model import Account
+from app.model.customer_model import Customer
+from app.model.employee_model import Employee
 from app.schema.account_schema import AccountCreate
 
-ph = PasswordHasher()
 logger = logging.getLogger(__name__)
 
 
@@ -18,20 +25,30 @@ class AuthService:
     def __init__(self, db: Session):
         self.db = db
 
+    @staticmethod
+    def _server_busy() -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many concurrent login requests, please retry",
+            headers={"Retry-After": "1"},
+        )
+
     @staticmethod
     def hash_password(password: str) -> str:
-        return ph.hash(password)
+        """Argon2 chạy trong process pool riêng; pool đầy thì 503"""
+        try:
+            return get_password_pool().hash(password)
+        except PasswordPoolBusy:
+            raise AuthService._server_busy()
 
     @staticmethod
     def verify_password(plain_password: str, hashed_password: str) -> bool:
         try:
-            logger.debug(f"Verifying password: plain='{plain_password}' (len={len(plain_password)})")
-            ph.verify(hashed_password, plain_password)
-            logger.debug("Password verification SUCCESS")
-            return True
-        except VerifyMismatchError:
-            logger.debug("Password verification FAILED")
-            return False
+            is_valid = get_password_pool().verify(hashed_password, plain_password)
+        except PasswordPoolBusy:
+            raise AuthService._server_busy()
+        logger.debug(f"Password verification {'SUCCESS' if is_valid else 'FAILED'}")
+        return is_valid
 
     def create_access_token(self, data: dict, expires_delta: timedelta | None = None) -> str:
         to_encode = data.copy()
@@ -39,12 +56,49 @@ class AuthService:
             expires_delta if expires_delta else timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         )
         to_encode.update({"exp": expire})
+        to_encode.setdefault("jti", uuid.uuid4().hex)  # id riêng của token, dùng để thu hồi (logout)
         return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
 
+    def create_account_token(self, account: Account) -> str:
+        """Access token kèm claim role_id / customer_id / employee_id / ver để request sau không phải query lại"""
+        customer_id, employee_id = self.db.execute(
+            select(
+                select(Customer.PK_Customer)
+                .where(Customer.AccountID == account.PK_Account)
+                .order_by(Customer.PK_Customer)
+                .limit(1)
+                .scalar_subquery(),
+                select(Employee.PK_Employee).where(Employee.AccountID == account.PK_Account).limit(1).scalar_subquery(),
+            )
+        ).one()
+        return self.create_access_token(
+            data={
+                "sub": account.Username,
+                "role_id": account.RoleID,
+                "customer_id": customer_id,
+                "employee_id": employee_id,
+                "ver": account.Token_Version or 0,
+            }
+        )
+
+    @staticmethod
+    def revoke_tokens(account: Account):
+        """Thu hồi mọi access token đã cấp cho account (caller commit)"""
+        account.Token_Version = (account.Token_Version or 0) + 1
+
+    def revoke_token(self, payload: dict, account_id: Optional[int] = None):
+        """Thu hồi riêng token có claim `payload` (logout) tới khi nó hết hạn"""
+        jti = payload.get("jti")
+        if jti is None:
+            # token cấp trước khi có jti: không thu hồi riêng được, chỉ có thể revoke_tokens
+            logger.warning(f"Token without jti cannot be revoked: {payload.get('sub')}")
+            return
+        expires_at = datetime.utcfromtimestamp(payload["exp"])
+        get_revocation_list().revoke(self.db, jti, expires_at, account_id)
+
     def register_account(self, account: AccountCreate) -> Account:
         # Check if username already exists
         if self.db.query(Account).filter(Account.Username == account.username).first():
-            from fastapi import HTTPException
             raise HTTPException(status_code=400, detail="Username already exists.")
 
         hashed_password = self.hash_password(account.password)
@@ -59,14 +113,55 @@ class AuthService:
         self.db.refresh(db_account)
         return db_account
 
+    def _rehash_if_needed(self, account: Account, password: str):
+        """Hash cũ (tham số ARGON2_* khác hiện tại) được hash lại bằng mật khẩu vừa xác thực"""
+        if not get_password_pool().needs_rehash(account.Password):
+            return
+        try:
+            account.Password = self.hash_password(password)
+        except HTTPException:
+            return  # pool đang quá tải - để lần đăng nhập sau
+        self.db.commit()
+        logger.info(f"Rehashed password for account {account.PK_Account} with current Argon2 parameters")
+
+    def login(self, username: str, password: str, client_ip: Optional[str] = None) -> Account:
+        """
+        Đăng nhập: giới hạn tần suất theo username / IP trước khi query và hash, một câu SELECT account.
+        Raise HTTPException 429 (quá nhiều lần thử), 401 (sai username / mật khẩu), 503 (pool Argon2 quá tải).
+        """
+        limiter = get_login_limiter()
+        if limiter is not None:
+            try:
+                limiter.check(username, client_ip)
+            except LoginRateLimited as e:
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many login attempts, please try again later",
+                    headers={"Retry-After": str(math.ceil(e.retry_after))},
+                )
+
+        account = self.db.query(Account).filter(Account.Username == username).first()
+        if account is None:
+            logger.warning(f"Login failed - username not found: {username}")
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Username does not exist")
+        if not self.verify_password(password, account.Password):
+            logger.warning(f"Login failed - incorrect password for: {username}")
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect password")
+
+        if limiter is not None:
+            limiter.succeeded(username)
+        self._rehash_if_needed(account, password)
+        return account
+
     def authenticate_account(self, username: str, password: str) -> Account | None:
-        logger.debug(f"Authenticating username='{username}', password='{password}' (len={len(password)})")
+        logger.debug(f"Authenticating username='{username}'")
         account = self.db.query(Account).filter(Account.Username == username).first()
         if account:
             logger.debug(f"Account found: {account.Username}, RoleID={account.RoleID}")
             is_valid = self.verify_password(password, account.Password)
             logger.debug(f"Password validation result: {is_valid}")
             if is_valid:
+                self._rehash_if_needed(account, password)
                 return account
         else:
             logger.debug(f"Account not found for username: {username}")
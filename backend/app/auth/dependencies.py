@@ -1,12 +1,13 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import JWTError, jwt
+from jose import JWTError
 from sqlalchemy.orm import Session
 import logging
 
-from app.core.config import settings
+from app.auth.account_cache import CachedAccount, get_account_cache
+from app.auth.revocation import get_revocation_list
+from app.auth.token_cache import get_token_cache
 from app.database.session import get_db
-from app.model.account_model import Account
 
 # Swagger will use this tokenUrl for the Authorize button
 # But it works with any login endpoint that returns access_token
@@ -14,27 +15,43 @@ oauth2 = OAuth2PasswordBearer(tokenUrl="user/auth/login")
 logger = logging.getLogger(__name__)
 
 
-def get_current_account(db: Session = Depends(get_db), token: str = Depends(oauth2)) -> Account:
-    logger.debug(f"Validating token: {token[:20]}...")
-    credentials_exception = HTTPException(
+def _credentials_exception(detail: str = "Could not validate credentials") -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
+        detail=detail,
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def get_token_payload(token: str = Depends(oauth2)) -> dict:
+    """Claims của access token (giải mã một lần cho mỗi request, cache tới khi token hết hạn)"""
+    logger.debug(f"Validating token: {token[:20]}...")
     try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        username: str = payload.get("sub")
-        logger.debug(f"Token decoded, username: {username}")
-        if username is None:
-            logger.warning("Token payload missing 'sub' field")
-            raise credentials_exception
+        payload = get_token_cache().decode(token)
     except JWTError as e:
         logger.warning(f"JWT decode error: {e}")
-        raise credentials_exception
-    account = db.query(Account).filter(Account.Username == username).first()
+        raise _credentials_exception()
+    if payload.get("sub") is None:
+        logger.warning("Token payload missing 'sub' field")
+        raise _credentials_exception()
+    return payload
+
+
+def get_current_account(db: Session = Depends(get_db), payload: dict = Depends(get_token_payload)) -> CachedAccount:
+    username: str = payload["sub"]
+    # Bloom filter: token chưa bị thu hồi (gần như mọi request) không cần query revoked_token
+    jti = payload.get("jti")
+    if jti is not None and get_revocation_list().is_revoked(db, jti):
+        logger.warning(f"Revoked token (logout) for username: {username}")
+        raise _credentials_exception("Token has been revoked")
+    # Cache ngắn hạn: phần lớn request đã đăng nhập không cần query account / customer
+    account = get_account_cache().get(db, username)
     if account is None:
         logger.warning(f"Account not found for username: {username}")
-        raise credentials_exception
+        raise _credentials_exception()
+    if payload.get("ver", 0) != account.TokenVersion:
+        logger.warning(f"Revoked token for username: {username}")
+        raise _credentials_exception("Token has been revoked")
     if account.Status != "ACTIVE":
         logger.warning(f"Account not active: {username}")
         raise HTTPException(
@@ -45,7 +62,18 @@ def get_current_account(db: Session = Depends(get_db), token: str = Depends(oaut
     return account
 
 
-def get_current_admin_account(current_account: Account = Depends(get_current_account)) -> Account:
+def get_current_customer_id(
+    payload: dict = Depends(get_token_payload), current_account: CachedAccount = Depends(get_current_account)
+) -> int:
+    """customer_id của user đang đăng nhập: lấy từ claim của token (token cũ không có claim thì lấy từ account)"""
+    customer_id = payload.get("customer_id") or current_account.CustomerID
+    if customer_id is None:
+        logger.error(f"Customer profile not found for account: {current_account.Username}")
+        raise HTTPException(status_code=404, detail="Customer profile not found")
+    return customer_id
+
+
+def get_current_admin_account(current_account: CachedAccount = Depends(get_current_account)) -> CachedAccount:
     """Dependency to ensure user has admin role (role_id = 1)"""
     if current_account.RoleID != 1:
         raise HTTPException(
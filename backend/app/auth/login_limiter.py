@@ -0,0 +1,145 @@
+import ipaddress
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, List, Optional
+
+from app.core.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryRateLimitBackend:
+    """
+    Sliding window log trong bộ nhớ process (một node / một worker).
+    Backend khác (Redis, ...) chỉ cần cài đặt hit() và reset() với cùng ý nghĩa.
+    """
+
+    def __init__(self, max_keys: int = 100000, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._windows = TTLCache(maxsize=max_keys, clock=clock)
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, limit: int, window: float) -> Optional[float]:
+        """
+        Ghi một lần thử cho `key` nếu trong `window` giây gần nhất còn dưới `limit` lần.
+        Trả về None nếu được phép, hoặc số giây phải chờ nếu đã vượt giới hạn (lần thử không được ghi).
+        """
+        with self._lock:
+            now = self._clock()
+            attempts = self._windows.get(key)
+            if attempts is None:
+                attempts = deque()
+            while attempts and attempts[0] <= now - window:
+                attempts.popleft()
+            if len(attempts) >= limit:
+                return attempts[0] + window - now
+            attempts.append(now)
+            # key không được thử lại trong `window` giây thì không còn cần giữ
+            self._windows.set(key, attempts, ttl=window)
+            return None
+
+    def reset(self, key: str):
+        with self._lock:
+            self._windows.pop(key)
+
+
+class LoginRateLimited(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__(f"Too many login attempts, retry after {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class LoginLimiter:
+    """
+    Giới hạn số lần đăng nhập theo username và theo IP (sliding window) - kiểm tra trước khi query / hash Argon2.
+    Đăng nhập thành công thì xóa bộ đếm của username.
+    """
+
+    def __init__(self, backend, per_username: int = 10, per_ip: int = 100, window: float = 300):
+        self.backend = backend
+        self.per_username = per_username
+        self.per_ip = per_ip
+        self.window = window
+
+    def check(self, username: str, client_ip: Optional[str]):
+        """Raise LoginRateLimited nếu IP hoặc username đã vượt giới hạn, nếu không thì tính là một lần thử"""
+        keys = [(f"ip:{client_ip}", self.per_ip)] if client_ip else []
+        keys.append((f"user:{username.lower()}", self.per_username))
+        for key, limit in keys:
+            retry_after = self.backend.hit(key, limit, self.window)
+            if retry_after is not None:
+                logger.warning(f"Login rate limited: {key}")
+                raise LoginRateLimited(retry_after)
+
+    def succeeded(self, username: str):
+        self.backend.reset(f"user:{username.lower()}")
+
+
+_limiter: Optional[LoginLimiter] = None
+
+
+def get_login_limiter() -> Optional[LoginLimiter]:
+    """None khi LOGIN_RATE_LIMIT_BACKEND=none"""
+    global _limiter
+    if _limiter is None:
+        from app.core.config import settings
+
+        if settings.LOGIN_RATE_LIMIT_BACKEND == "none":
+            return None
+        _limiter = LoginLimiter(
+            MemoryRateLimitBackend(),
+            per_username=settings.LOGIN_MAX_ATTEMPTS_PER_USERNAME,
+            per_ip=settings.LOGIN_MAX_ATTEMPTS_PER_IP,
+            window=settings.LOGIN_RATE_WINDOW_SECONDS,
+        )
+    return _limiter
+
+
+def parse_trusted_proxies(value: str) -> List:
+    """TRUSTED_PROXIES: danh sách IP / CIDR cách nhau bởi dấu phẩy, "*" = mọi địa chỉ"""
+    networks = []
+    for item in value.split(","):
+        item = item.strip()
+        if item == "*":
+            networks += [ipaddress.ip_network("0.0.0.0/0"), ipaddress.ip_network("::/0")]
+        elif item:
+            networks.append(ipaddress.ip_network(item, strict=False))
+    return networks
+
+
+def _is_trusted(address: str, trusted: List) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in trusted)
+
+
+def client_ip(peer: Optional[str], forwarded_for: Optional[str], trusted: List) -> Optional[str]:
+    """
+    IP của client: nếu kết nối đến từ proxy tin cậy thì đọc X-Forwarded-For từ phải sang trái và lấy địa chỉ
+    đầu tiên không phải proxy tin cậy (các hop bên trái do client tự gửi, không dùng được).
+    """
+    if peer is None or not _is_trusted(peer, trusted):
+        return peer
+    hops = [hop.strip() for hop in (forwarded_for or "").split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not _is_trusted(hop, trusted):
+            return hop
+    return hops[0] if hops else peer
+
+
+_trusted_proxies: Optional[List] = None
+
+
+def request_client_ip(request) -> Optional[str]:
+    """client_ip() của một request FastAPI theo TRUSTED_PROXIES"""
+    global _trusted_proxies
+    if _trusted_proxies is None:
+        from app.core.config import settings
+
+        _trusted_proxies = parse_trusted_proxies(settings.TRUSTED_PROXIES)
+    peer = request.client.host if request.client else None
+    return client_ip(peer, request.headers.get("x-forwarded-for"), _trusted_proxies)
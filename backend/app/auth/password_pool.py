@@ -0,0 +1,137 @@
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerifyMismatchError
+
+logger = logging.getLogger(__name__)
+
+_hasher = PasswordHasher()
+
+
+def _configure(time_cost: int, memory_cost: int, parallelism: int):
+    """Chạy trong mỗi process của pool: Argon2 dùng tham số của Settings (ARGON2_*)"""
+    global _hasher
+    _hasher = PasswordHasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+
+
+def _hash(password: str, hasher: Optional[PasswordHasher] = None) -> str:
+    return (hasher or _hasher).hash(password)
+
+
+def _verify(hashed_password: str, plain_password: str, hasher: Optional[PasswordHasher] = None) -> bool:
+    try:
+        return (hasher or _hasher).verify(hashed_password, plain_password)
+    except (VerifyMismatchError, InvalidHashError):
+        return False
+
+
+class PasswordPoolBusy(Exception):
+    """Hàng đợi hash mật khẩu đã đầy - request nên được trả về 503"""
+
+
+class PasswordHasherPool:
+    """
+    Chạy Argon2 trong một process pool riêng (tối đa `workers` process) để login không chiếm CPU / GIL
+    của worker đang phục vụ các request khác. Tối đa `max_pending` lệnh hash/verify được chờ cùng lúc;
+    vượt quá thì raise PasswordPoolBusy ngay thay vì giữ thread của request.
+    workers = 0: chạy trực tiếp trong thread của request (dev / test).
+    `time_cost` / `memory_cost` (KiB) / `parallelism`: tham số Argon2 cho hash mới (mặc định của argon2-cffi).
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        max_pending: int = 32,
+        time_cost: Optional[int] = None,
+        memory_cost: Optional[int] = None,
+        parallelism: Optional[int] = None,
+    ):
+        self.workers = workers
+        self.max_pending = max_pending
+        default = PasswordHasher()
+        self.params = (
+            time_cost or default.time_cost,
+            memory_cost or default.memory_cost,
+            parallelism or default.parallelism,
+        )
+        self._hasher = PasswordHasher(*self.params)
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers, initializer=_configure, initargs=self.params
+                )
+            return self._executor
+
+    def _run(self, fn, *args):
+        if self.workers <= 0:
+            return fn(*args, hasher=self._hasher)
+        if not self._slots.acquire(blocking=False):
+            logger.warning(f"Password hashing pool saturated ({self.max_pending} pending)")
+            raise PasswordPoolBusy()
+        try:
+            executor = self._get_executor()
+            try:
+                return executor.submit(fn, *args).result()
+            except BrokenProcessPool:
+                # Một process con bị kill (OOM...) - tạo pool mới cho các request sau
+                logger.exception("Password hashing pool broken, restarting")
+                with self._lock:
+                    if self._executor is executor:
+                        self._executor = None
+                executor.shutdown(wait=False)
+                raise PasswordPoolBusy()
+        finally:
+            self._slots.release()
+
+    def hash(self, password: str) -> str:
+        return self._run(_hash, password)
+
+    def verify(self, hashed_password: str, plain_password: str) -> bool:
+        return self._run(_verify, hashed_password, plain_password)
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """Hash được tạo với tham số Argon2 khác tham số hiện tại (chỉ parse chuỗi hash, không tốn CPU)"""
+        try:
+            return self._hasher.check_needs_rehash(hashed_password)
+        except InvalidHashError:
+            return False
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+
+_pool: Optional[PasswordHasherPool] = None
+
+
+def get_password_pool() -> PasswordHasherPool:
+    global _pool
+    if _pool is None:
+        from app.core.config import settings
+
+        _pool = PasswordHasherPool(
+            settings.PASSWORD_HASH_WORKERS,
+            settings.PASSWORD_HASH_MAX_PENDING,
+            time_cost=settings.ARGON2_TIME_COST,
+            memory_cost=settings.ARGON2_MEMORY_COST,
+            parallelism=settings.ARGON2_PARALLELISM,
+        )
+    return _pool
+
+
+def shutdown_password_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
@@ -0,0 +1,177 @@
+import hashlib
+import logging
+import math
+import threading
+from datetime import datetime
+from typing import Callable, Iterable, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.model.revoked_token_model import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """Bloom filter cố định: không có false negative, tỉ lệ false positive ~ `error_rate` khi chứa `capacity` phần tử"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(capacity, 1)
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.sha256(item.encode()).digest()
+        # double hashing: h1 + i*h2
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:16], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, item: str):
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class RevocationList:
+    """
+    Danh sách jti đã thu hồi: bảng revoked_token + Bloom filter trong bộ nhớ (nạp lại mỗi `refresh_interval` giây).
+    Token không có trong filter (gần như mọi request) được chấp nhận mà không query DB; chỉ khi filter báo
+    "có thể" mới kiểm tra bảng. Token bị thu hồi ở worker khác có hiệu lực ở đây sau lần refresh tiếp theo.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        refresh_interval: float = 30,
+        capacity: int = 100000,
+        error_rate: float = 0.001,
+    ):
+        self.refresh_interval = refresh_interval
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._session_factory = session_factory
+        self._filter = BloomFilter(capacity, error_rate)
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._pending: Optional[list] = None  # jti thu hồi trong lúc refresh, thêm lại vào filter mới
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _new_session(self) -> Session:
+        if self._session_factory is None:
+            from app.database.session import SessionLocal
+
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    def _add(self, jtis: Iterable[str]):
+        with self._lock:
+            for jti in jtis:
+                self._filter.add(jti)
+                if self._pending is not None:
+                    self._pending.append(jti)
+
+    def revoke(self, db: Session, jti: str, expires_at: datetime, account_id: Optional[int] = None):
+        """Thu hồi token (commit ngay). Gọi lại với cùng jti không sao."""
+        db.add(RevokedToken(JTI=jti, AccountID=account_id, Expires_At=expires_at, Revoked_At=datetime.utcnow()))
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+        self._add([jti])
+
+    def is_revoked(self, db: Session, jti: str) -> bool:
+        with self._lock:
+            maybe = jti in self._filter
+        if not maybe:
+            return False
+        return db.execute(select(RevokedToken.JTI).where(RevokedToken.JTI == jti)).first() is not None
+
+    def refresh(self, db: Optional[Session] = None) -> int:
+        """Xóa các dòng đã hết hạn và dựng lại filter từ bảng. Trả về số jti đang bị thu hồi."""
+        with self._refresh_lock:
+            return self._refresh(db)
+
+    def _refresh(self, db: Optional[Session]) -> int:
+        with self._lock:
+            self._pending = []
+        own_session = db is None
+        try:
+            db = db or self._new_session()
+            try:
+                db.execute(delete(RevokedToken).where(RevokedToken.Expires_At <= datetime.utcnow()))
+                db.commit()
+                jtis = db.execute(select(RevokedToken.JTI)).scalars().all()
+            finally:
+                if own_session:
+                    db.close()
+
+            bloom = BloomFilter(max(self.capacity, 2 * len(jtis)), self.error_rate)
+            for jti in jtis:
+                bloom.add(jti)
+        except Exception:
+            with self._lock:
+                self._pending = None
+            raise
+        with self._lock:
+            # revoke() commit sau câu SELECT ở trên không có trong snapshot
+            for jti in self._pending:
+                bloom.add(jti)
+            self._pending = None
+            self._filter = bloom
+        logger.debug(f"Token revocation filter refreshed: {len(jtis)} revoked tokens")
+        return len(jtis)
+
+    def _run(self):
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception:
+                logger.exception("Token revocation refresh failed, will retry")
+
+    def start(self):
+        self.refresh()
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="token-revocation-refresh", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+_revocation_list: Optional[RevocationList] = None
+
+
+def get_revocation_list() -> RevocationList:
+    global _revocation_list
+    if _revocation_list is None:
+        from app.core.config import settings
+
+        _revocation_list = RevocationList(
+            refresh_interval=settings.TOKEN_REVOCATION_REFRESH_SECONDS,
+            capacity=settings.TOKEN_REVOCATION_FILTER_CAPACITY,
+        )
+    return _revocation_list
+
+
+def start_revocation_list() -> RevocationList:
+    revocation_list = get_revocation_list()
+    revocation_list.start()
+    return revocation_list
+
+
+def stop_revocation_list():
+    if _revocation_list is not None:
+        _revocation_list.stop()
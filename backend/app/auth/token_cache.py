@@ -0,0 +1,73 @@
+import hashlib
+import logging
+import threading
+import time
+from typing import Callable, Optional
+
+from jose import jwt
+
+from app.core.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+
+class TokenCache:
+    """
+    Cache kết quả jwt.decode (claims đã kiểm tra chữ ký + exp) theo sha256 của token, tới khi token hết hạn.
+    Token lỗi không được cache. Thread-safe.
+    """
+
+    def __init__(self, secret_key: str, algorithm: str, maxsize: int = 10000, clock: Callable[[], float] = time.time):
+        self.secret_key = secret_key
+        self.algorithm = algorithm
+        self.maxsize = maxsize
+        self._clock = clock
+        self._cache = TTLCache(maxsize=maxsize, clock=clock)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def decode(self, token: str) -> dict:
+        """Như jwt.decode; raise JWTError nếu token không hợp lệ / hết hạn"""
+        key = hashlib.sha256(token.encode()).digest()
+        payload = self._cache.get(key) if self.maxsize > 0 else None
+        with self._lock:
+            if payload is not None:
+                self.hits += 1
+                return payload
+            self.misses += 1
+
+        payload = jwt.decode(token, self.secret_key, algorithms=[self.algorithm])
+        exp = payload.get("exp")
+        if self.maxsize > 0 and isinstance(exp, (int, float)):
+            ttl = exp - self._clock()
+            if ttl > 0:
+                self._cache.set(key, payload, ttl=ttl)
+        return payload
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits, misses = self.hits, self.misses
+        total = hits + misses
+        return {
+            "size": len(self._cache),
+            "maxsize": self.maxsize,
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / total, 4) if total else None,
+        }
+
+    def clear(self):
+        self._cache.clear()
+
+
+_token_cache: Optional[TokenCache] = None
+
+
+def get_token_cache() -> TokenCache:
+    global _token_cache
+    if _token_cache is None:
+        from app.core.config import settings
+
+        _token_cache = TokenCache(settings.SECRET_KEY, settings.ALGORITHM, settings.JWT_CACHE_SIZE)
+    return _token_cache
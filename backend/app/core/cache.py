@@ -0,0 +1,65 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+_MISSING = object()
+
+
+class TTLCache:
+    """LRU cache trong bộ nhớ (một process), mỗi entry hết hạn sau `ttl` giây. Thread-safe."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_locked(self, key: Hashable):
+        entry = self._data.get(key)
+        if entry is None:
+            return _MISSING
+        value, expires_at = entry
+        if expires_at <= self._clock():
+            del self._data[key]
+            return _MISSING
+        self._data.move_to_end(key)
+        return value
+
+    def _set_locked(self, key: Hashable, value: Any, ttl: Optional[float]):
+        self._data[key] = (value, self._clock() + (self.ttl if ttl is None else ttl))
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            value = self._get_locked(key)
+        return default if value is _MISSING else value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Ghi entry; `ttl` riêng cho entry này (mặc định dùng ttl của cache)"""
+        with self._lock:
+            self._set_locked(key, value, ttl)
+
+    def add(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> Any:
+        """Chỉ ghi khi key chưa có (hoặc đã hết hạn). Trả về giá trị đang có, hoặc None nếu vừa ghi."""
+        with self._lock:
+            current = self._get_locked(key)
+            if current is not _MISSING:
+                return current
+            self._set_locked(key, value, ttl)
+            return None
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.pop(key, None)
+        return default if entry is None else entry[0]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
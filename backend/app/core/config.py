@@ -8,6 +8,41 @@ class Settings(BaseSettings):
     ALGORITHM: str = Field("HS256", env="ALGORITHM")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(30, env="ACCESS_TOKEN_EXPIRE_MINUTES")
 
+    # Connection pool (QueuePool) - chỉnh theo số worker của uvicorn/gunicorn
+    DB_POOL_SIZE: int = Field(5, env="DB_POOL_SIZE")
+    DB_MAX_OVERFLOW: int = Field(10, env="DB_MAX_OVERFLOW")
+    DB_POOL_PRE_PING: bool = Field(True, env="DB_POOL_PRE_PING")
+    DB_POOL_RECYCLE: int = Field(1800, env="DB_POOL_RECYCLE")  # giây, -1 để tắt
+    DB_POOL_TIMEOUT: float = Field(30, env="DB_POOL_TIMEOUT")  # giây chờ tối đa khi pool đầy
+    DB_POOL_SLOW_CHECKOUT_MS: float = Field(100, env="DB_POOL_SLOW_CHECKOUT_MS")
+
+    # Idempotency-Key cho POST /user/orders/ và /admin/orders/
+    IDEMPOTENCY_BACKEND: str = Field("memory", env="IDEMPOTENCY_BACKEND")  # memory (một node) | database
+    IDEMPOTENCY_TTL_SECONDS: int = Field(86400, env="IDEMPOTENCY_TTL_SECONDS")  # thời gian giữ response
+    IDEMPOTENCY_LOCK_SECONDS: int = Field(60, env="IDEMPOTENCY_LOCK_SECONDS")  # giữ key khi request đang chạy
+    IDEMPOTENCY_CACHE_SIZE: int = Field(10000, env="IDEMPOTENCY_CACHE_SIZE")  # số key tối đa (memory)
+    AUTH_CACHE_TTL_SECONDS: float = Field(30, env="AUTH_CACHE_TTL_SECONDS")  # 0 = tắt cache account
+    AUTH_CACHE_SIZE: int = Field(10000, env="AUTH_CACHE_SIZE")
+    JWT_CACHE_SIZE: int = Field(10000, env="JWT_CACHE_SIZE")  # số token đã giải mã được cache; 0 = tắt
+    TOKEN_REVOCATION_REFRESH_SECONDS: float = Field(30, env="TOKEN_REVOCATION_REFRESH_SECONDS")
+    TOKEN_REVOCATION_FILTER_CAPACITY: int = Field(100000, env="TOKEN_REVOCATION_FILTER_CAPACITY")
+    LOGIN_RATE_LIMIT_BACKEND: str = Field("memory", env="LOGIN_RATE_LIMIT_BACKEND")  # memory | none
+    LOGIN_MAX_ATTEMPTS_PER_USERNAME: int = Field(10, env="LOGIN_MAX_ATTEMPTS_PER_USERNAME")
+    LOGIN_MAX_ATTEMPTS_PER_IP: int = Field(100, env="LOGIN_MAX_ATTEMPTS_PER_IP")
+    LOGIN_RATE_WINDOW_SECONDS: float = Field(300, env="LOGIN_RATE_WINDOW_SECONDS")
+    TRUSTED_PROXIES: str = Field("", env="TRUSTED_PROXIES")  # IP / CIDR của reverse proxy, đọc X-Forwarded-For
+    PASSWORD_HASH_WORKERS: int = Field(2, env="PASSWORD_HASH_WORKERS")  # process Argon2; 0 = chạy trong request
+    PASSWORD_HASH_MAX_PENDING: int = Field(32, env="PASSWORD_HASH_MAX_PENDING")  # vượt quá thì 503
+    # Tham số Argon2 cho hash mới - chạy `python calibrate_argon2.py` để chọn theo phần cứng
+    ARGON2_TIME_COST: int = Field(3, env="ARGON2_TIME_COST")
+    ARGON2_MEMORY_COST: int = Field(65536, env="ARGON2_MEMORY_COST")  # KiB
+    ARGON2_PARALLELISM: int = Field(4, env="ARGON2_PARALLELISM")
+    CART_BACKEND: str = Field("database", env="CART_BACKEND")  # database | memory (write-behind, một worker)
+    CART_FLUSH_INTERVAL_SECONDS: float = Field(5, env="CART_FLUSH_INTERVAL_SECONDS")
+    CART_IDLE_SECONDS: float = Field(600, env="CART_IDLE_SECONDS")  # memory: bỏ giỏ đã ghi, không dùng quá lâu
+    SEARCH_BACKEND: str = Field("like", env="SEARCH_BACKEND")  # like | fulltext | memory (index trong process)
+    SEARCH_INDEX_REFRESH_SECONDS: float = Field(300, env="SEARCH_INDEX_REFRESH_SECONDS")  # memory: nạp lại toàn bộ
+
     class Config:
         env_file = ".env"  # Cho phép đọc file .env
 
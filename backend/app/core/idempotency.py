@@ -0,0 +1,173 @@
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Callable, NamedTuple, Optional
+
+from fastapi import HTTPException, Response
+from sqlalchemy import delete
+from sqlalchemy.exc import IntegrityError
+
+from app.core.cache import TTLCache
+from app.model.idempotency_model import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+IDEMPOTENT_REPLAY_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+
+class IdempotencyRecord(NamedTuple):
+    fingerprint: str
+    response: Optional[Any]  # None khi request đầu tiên còn đang xử lý
+
+
+def request_fingerprint(payload: Any) -> str:
+    raw = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class MemoryIdempotencyStore:
+    """Lưu trong bộ nhớ process (TTL + LRU) - chỉ đúng khi chạy một node / một worker"""
+
+    def __init__(self, maxsize: int, ttl: int, lock_ttl: int):
+        self.ttl = ttl
+        self.lock_ttl = lock_ttl
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def reserve(self, scope: str, key: str, fingerprint: str) -> Optional[IdempotencyRecord]:
+        """Giữ key cho request này; trả về record đang có nếu key đã được dùng"""
+        return self._cache.add((scope, key), IdempotencyRecord(fingerprint, None), ttl=self.lock_ttl)
+
+    def complete(self, scope: str, key: str, fingerprint: str, response: Any):
+        self._cache.set((scope, key), IdempotencyRecord(fingerprint, response), ttl=self.ttl)
+
+    def release(self, scope: str, key: str):
+        self._cache.pop((scope, key))
+
+
+class DatabaseIdempotencyStore:
+    """Lưu trong bảng idempotency_key - dùng chung giữa nhiều worker / node"""
+
+    def __init__(self, ttl: int, lock_ttl: int, session_factory: Optional[Callable] = None):
+        self.ttl = ttl
+        self.lock_ttl = lock_ttl
+        self._session_factory = session_factory
+
+    def _session(self):
+        # Session riêng: key phải được ghi/commit độc lập với transaction của request
+        if self._session_factory is None:
+            from app.database.session import SessionLocal
+
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    def reserve(self, scope: str, key: str, fingerprint: str) -> Optional[IdempotencyRecord]:
+        now = datetime.utcnow()
+        with self._session() as db:
+            db.execute(
+                delete(IdempotencyKey).where(
+                    IdempotencyKey.Scope == scope, IdempotencyKey.Key == key, IdempotencyKey.Expires_At <= now
+                )
+            )
+            db.add(
+                IdempotencyKey(
+                    Scope=scope,
+                    Key=key,
+                    Fingerprint=fingerprint,
+                    Expires_At=now + timedelta(seconds=self.lock_ttl),
+                )
+            )
+            try:
+                db.commit()
+                return None
+            except IntegrityError:
+                db.rollback()
+
+            row = db.get(IdempotencyKey, (scope, key))
+            if row is None:  # vừa bị release bởi request khác - coi như vẫn đang xử lý
+                return IdempotencyRecord(fingerprint, None)
+            return IdempotencyRecord(row.Fingerprint, json.loads(row.Response) if row.Response else None)
+
+    def complete(self, scope: str, key: str, fingerprint: str, response: Any):
+        with self._session() as db:
+            row = db.get(IdempotencyKey, (scope, key))
+            if row is None:
+                return
+            row.Response = json.dumps(response, default=str)
+            row.Expires_At = datetime.utcnow() + timedelta(seconds=self.ttl)
+            db.commit()
+
+    def release(self, scope: str, key: str):
+        with self._session() as db:
+            db.execute(delete(IdempotencyKey).where(IdempotencyKey.Scope == scope, IdempotencyKey.Key == key))
+            db.commit()
+
+    def purge_expired(self) -> int:
+        with self._session() as db:
+            result = db.execute(delete(IdempotencyKey).where(IdempotencyKey.Expires_At <= datetime.utcnow()))
+            db.commit()
+            return result.rowcount
+
+
+_store = None
+
+
+def get_idempotency_store():
+    global _store
+    if _store is None:
+        from app.core.config import settings
+
+        if settings.IDEMPOTENCY_BACKEND == "database":
+            _store = DatabaseIdempotencyStore(settings.IDEMPOTENCY_TTL_SECONDS, settings.IDEMPOTENCY_LOCK_SECONDS)
+        else:
+            _store = MemoryIdempotencyStore(
+                settings.IDEMPOTENCY_CACHE_SIZE, settings.IDEMPOTENCY_TTL_SECONDS, settings.IDEMPOTENCY_LOCK_SECONDS
+            )
+    return _store
+
+
+def run_idempotent(
+    response: Response,
+    key: Optional[str],
+    scope: str,
+    payload: Any,
+    handler: Callable[[], Any],
+    store=None,
+):
+    """
+    Chạy `handler` một lần cho mỗi (scope, Idempotency-Key).
+    handler phải trả về dữ liệu JSON được (response đã serialize) để có thể trả lại cho các lần retry.
+    Request lỗi không được lưu: key được giải phóng để client retry.
+    """
+    if not key:
+        return handler()
+    if len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=400, detail=f"{IDEMPOTENCY_KEY_HEADER} must be at most {MAX_KEY_LENGTH} characters"
+        )
+
+    store = store or get_idempotency_store()
+    fingerprint = request_fingerprint(payload)
+    existing = store.reserve(scope, key, fingerprint)
+    if existing is not None:
+        if existing.fingerprint != fingerprint:
+            raise HTTPException(
+                status_code=422, detail=f"{IDEMPOTENCY_KEY_HEADER} was already used with a different request body"
+            )
+        if existing.response is None:
+            raise HTTPException(
+                status_code=409, detail=f"A request with this {IDEMPOTENCY_KEY_HEADER} is still being processed"
+            )
+        logger.debug(f"Idempotent replay for {scope} key={key}")
+        response.headers[IDEMPOTENT_REPLAY_HEADER] = "true"
+        return existing.response
+
+    try:
+        result = handler()
+    except BaseException:
+        store.release(scope, key)
+        raise
+    store.complete(scope, key, fingerprint, result)
+    return result
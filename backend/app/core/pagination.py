@@ -0,0 +1,137 @@
+import base64
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Literal, Optional, Sequence
+
+from sqlalchemy import func, text, tuple_
+from sqlalchemy.orm import Query
+
+# exact: SELECT count(*) theo đúng bộ lọc
+# estimated: đọc pg_class.reltuples (chỉ khi không có bộ lọc và DB là PostgreSQL), nếu không thì dùng exact
+CountMode = Literal["exact", "estimated"]
+
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+
+def _estimated_count(query: Query) -> Optional[int]:
+    session = query.session
+    if session.get_bind().dialect.name != "postgresql":
+        return None
+    table_name = query.column_descriptions[0]["entity"].__table__.name
+    estimate = session.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table_name)"),
+        {"table_name": table_name},
+    ).scalar()
+    # reltuples = -1 khi bảng chưa từng được ANALYZE
+    if estimate is None or estimate < 0:
+        return None
+    return int(estimate)
+
+
+def total_count(query: Query, mode: CountMode = "exact") -> int:
+    """Đếm tổng số dòng của query (bỏ ORDER BY / OFFSET / LIMIT)"""
+    if mode == "estimated" and query.whereclause is None:
+        estimate = _estimated_count(query)
+        if estimate is not None:
+            return estimate
+    return query.order_by(None).limit(None).offset(None).count()
+
+
+# ---------------------------------------------------------------------------
+# Keyset (cursor) pagination
+# Cursor là token base64 (opaque) chứa giá trị các cột sắp xếp của dòng cuối trang trước,
+# ví dụ (Creation_date, PK_POSOrder) cho đơn hàng. Trang sau lọc bằng so sánh tuple
+# (col1, col2) < (v1, v2) nên dùng được index và không phải bỏ qua `skip` dòng.
+# ---------------------------------------------------------------------------
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+class NullsAs:
+    """
+    Cột nullable trong keyset: sắp xếp / so sánh theo coalesce(column, value).
+    (NULL, id) < (v, id) luôn là NULL nên trang sau sẽ rỗng, và NULL đứng đầu/cuối tùy DB.
+    """
+
+    def __init__(self, column, value):
+        self.column = column
+        self.value = value
+
+    @property
+    def key(self) -> str:
+        return self.column.key
+
+    def expression(self):
+        return func.coalesce(self.column, self.value)
+
+
+def _expression(col):
+    return col.expression() if isinstance(col, NullsAs) else col
+
+
+def _row_value(row, col):
+    value = getattr(row, col.key)
+    if value is None and isinstance(col, NullsAs):
+        return col.value
+    return value
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"dec": str(value)}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "dec" in value:
+            return Decimal(value["dec"])
+        raise InvalidCursorError("Invalid cursor")
+    return value
+
+
+def encode_cursor(values: Sequence) -> str:
+    raw = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != size:
+            raise InvalidCursorError("Invalid cursor")
+        return [_decode_value(v) for v in values]
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError("Invalid cursor") from e
+
+
+def keyset_order(keyset: Sequence, descending: bool = False) -> list:
+    return [_expression(col).desc() if descending else _expression(col).asc() for col in keyset]
+
+
+def keyset_filter(keyset: Sequence, cursor: str, descending: bool = False):
+    """Điều kiện WHERE lấy các dòng nằm sau cursor theo thứ tự của keyset"""
+    values = decode_cursor(cursor, len(keyset))
+    keyset = [_expression(col) for col in keyset]
+    if len(keyset) == 1:
+        return keyset[0] < values[0] if descending else keyset[0] > values[0]
+    columns, bounds = tuple_(*keyset), tuple_(*values)
+    return columns < bounds if descending else columns > bounds
+
+
+def next_cursor(rows: Sequence, limit: int, keyset: Sequence) -> Optional[str]:
+    """Cursor của trang kế tiếp, None nếu đây là trang cuối"""
+    if not rows or len(rows) < limit:
+        return None
+    last = rows[-1]
+    return encode_cursor([_row_value(last, col) for col in keyset])
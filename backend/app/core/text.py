@@ -0,0 +1,20 @@
+import re
+import unicodedata
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def fold(text: str) -> str:
+    """Chữ thường, bỏ dấu tiếng Việt (kể cả đ -> d); tương đương f_unaccent(lower(...)) trên Postgres"""
+    text = unicodedata.normalize("NFD", text.lower().replace("đ", "d"))
+    return "".join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def words(text: str) -> list:
+    """Các từ của `text` sau khi fold"""
+    return _WORD_RE.findall(fold(text))
+
+
+def escape_like(text: str, escape: str = "\\") -> str:
+    """Escape ký tự đặc biệt của LIKE (% và _) trong chuỗi người dùng nhập"""
+    return text.replace(escape, escape * 2).replace("%", escape + "%").replace("_", escape + "_")
@@ -0,0 +1,74 @@
+"""
+Index tìm kiếm sản phẩm (SEARCH_BACKEND=fulltext), cài bằng `python add_fulltext_search.py`.
+
+- PostgreSQL: pg_trgm + unaccent, GIN index trigram trên f_unaccent(lower(name)) của variation và product.
+  LIKE '%từ khóa%' dùng được index, xếp hạng bằng word_similarity.
+- SQLite (local / test): bảng FTS5 variation_search (rowid = pk_variation) giữ đồng bộ bằng trigger,
+  tìm theo tiền tố từng từ, xếp hạng bm25.
+"""
+from sqlalchemy import column, table
+
+variation_search = table("variation_search", column("rowid"), column("rank"))
+
+POSTGRES_DDL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE EXTENSION IF NOT EXISTS unaccent",
+    # unaccent() chỉ là STABLE nên không dùng được trong index biểu thức
+    """
+    CREATE OR REPLACE FUNCTION f_unaccent(text) RETURNS text
+    LANGUAGE sql IMMUTABLE PARALLEL SAFE STRICT
+    AS $$ SELECT public.unaccent('public.unaccent', $1) $$
+    """,
+    "CREATE INDEX IF NOT EXISTS ix_variation_name_trgm ON variation USING gin (f_unaccent(lower(name)) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS ix_product_name_trgm ON product USING gin (f_unaccent(lower(name)) gin_trgm_ops)",
+]
+
+
+def _sqlite_fold(value: str) -> str:
+    # remove_diacritics của unicode61 không đổi đ/Đ (không phải ký tự tổ hợp)
+    return f"replace(replace({value}, 'đ', 'd'), 'Đ', 'D')"
+
+
+_SQLITE_INSERT = (
+    "INSERT INTO variation_search(rowid, name, product_name) VALUES "
+    f"(new.pk_variation, {_sqlite_fold('new.name')}, "
+    f"{_sqlite_fold('(SELECT name FROM product WHERE pk_product = new.productid)')});"
+)
+
+SQLITE_DDL = [
+    "DROP TABLE IF EXISTS variation_search",
+    "CREATE VIRTUAL TABLE variation_search USING fts5(name, product_name, tokenize = 'unicode61 remove_diacritics 2')",
+    f"""
+    INSERT INTO variation_search(rowid, name, product_name)
+    SELECT v.pk_variation, {_sqlite_fold('v.name')}, {_sqlite_fold('p.name')}
+    FROM variation v LEFT JOIN product p ON p.pk_product = v.productid
+    """,
+    f"CREATE TRIGGER IF NOT EXISTS variation_search_ai AFTER INSERT ON variation BEGIN {_SQLITE_INSERT} END",
+    f"""
+    CREATE TRIGGER IF NOT EXISTS variation_search_au AFTER UPDATE OF name, productid ON variation BEGIN
+        DELETE FROM variation_search WHERE rowid = old.pk_variation;
+        {_SQLITE_INSERT}
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS variation_search_ad AFTER DELETE ON variation BEGIN
+        DELETE FROM variation_search WHERE rowid = old.pk_variation;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS variation_search_product_au AFTER UPDATE OF name ON product BEGIN
+        UPDATE variation_search SET product_name = {_sqlite_fold('new.name')}
+        WHERE rowid IN (SELECT pk_variation FROM variation WHERE productid = new.pk_product);
+    END
+    """,
+]
+
+
+def install_fulltext(conn) -> bool:
+    """Tạo index tìm kiếm cho dialect của `conn` (chạy lại được). False nếu dialect không hỗ trợ."""
+    statements = {"postgresql": POSTGRES_DDL, "sqlite": SQLITE_DDL}.get(conn.dialect.name)
+    if statements is None:
+        return False
+    for statement in statements:
+        conn.exec_driver_sql(statement)
+    return True
@@ -0,0 +1,100 @@
+import logging
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+logger = logging.getLogger(__name__)
+
+
+class PoolMetrics:
+    """Thống kê thời gian chờ lấy connection từ pool (thread-safe)"""
+
+    def __init__(self, window: int = 1024, slow_checkout_ms: float = 100):
+        self.slow_checkout_ms = slow_checkout_ms
+        self._lock = threading.Lock()
+        self._waits = deque(maxlen=window)
+        self._reset_counters()
+
+    def _reset_counters(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.slow_checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record_wait(self, seconds: float):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+            self._waits.append(seconds)
+            slow = seconds * 1000 >= self.slow_checkout_ms
+            if slow:
+                self.slow_checkouts += 1
+        if slow:
+            logger.warning(f"Slow pool checkout: waited {seconds * 1000:.1f}ms for a connection")
+
+    def record_timeout(self, seconds: float):
+        with self._lock:
+            self.timeouts += 1
+            self.max_wait = max(self.max_wait, seconds)
+        logger.error(f"Pool checkout timed out after {seconds:.1f}s")
+
+    def reset(self):
+        with self._lock:
+            self._waits.clear()
+            self._reset_counters()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            waits = sorted(self._waits)
+            checkouts, total_wait = self.checkouts, self.total_wait
+            data = {
+                "checkouts": checkouts,
+                "timeouts": self.timeouts,
+                "slow_checkouts": self.slow_checkouts,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+            }
+
+        def percentile(p: float) -> float:
+            if not waits:
+                return 0.0
+            return round(waits[min(len(waits) - 1, int(p * len(waits)))] * 1000, 3)
+
+        data["avg_wait_ms"] = round(total_wait / checkouts * 1000, 3) if checkouts else 0.0
+        data["p50_wait_ms"] = percentile(0.50)
+        data["p95_wait_ms"] = percentile(0.95)
+        data["p99_wait_ms"] = percentile(0.99)
+        data["window"] = len(waits)
+        return data
+
+
+pool_metrics = PoolMetrics()
+async_pool_metrics = PoolMetrics()
+
+
+class _TimedCheckoutMixin:
+    """Ghi lại thời gian chờ của mỗi lần checkout vào `metrics`"""
+
+    metrics = pool_metrics
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            self.metrics.record_timeout(time.perf_counter() - start)
+            raise
+        self.metrics.record_wait(time.perf_counter() - start)
+        return conn
+
+
+class TimedQueuePool(_TimedCheckoutMixin, QueuePool):
+    metrics = pool_metrics
+
+
+class TimedAsyncAdaptedQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    metrics = async_pool_metrics
@@ -1,9 +1,33 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
+from app.database.pool_metrics import (
+    TimedAsyncAdaptedQueuePool,
+    TimedQueuePool,
+    async_pool_metrics,
+    pool_metrics,
+)
 
-engine = create_engine(settings.DATABASE_URL)
+
+def _engine_options(database_url, poolclass=TimedQueuePool) -> dict:
+    """Tham số pool cho engine; SQLite (dùng khi test) giữ pool mặc định của driver"""
+    if make_url(database_url).get_backend_name() == "sqlite":
+        return {}
+    return {
+        "poolclass": poolclass,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    }
+
+
+pool_metrics.slow_checkout_ms = settings.DB_POOL_SLOW_CHECKOUT_MS
+async_pool_metrics.slow_checkout_ms = settings.DB_POOL_SLOW_CHECKOUT_MS
+engine = create_engine(settings.DATABASE_URL, **_engine_options(settings.DATABASE_URL))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
@@ -13,3 +37,82 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def async_database_url(database_url: str):
+    """Chuyển DATABASE_URL sang driver async (asyncpg / aiosqlite) và tách các tham số asyncpg không hiểu"""
+    url = make_url(database_url)
+    connect_args = {}
+    backend = url.get_backend_name()
+    if backend == "postgresql":
+        # asyncpg không nhận sslmode trong query string (Render thêm ?sslmode=require)
+        sslmode = url.query.get("sslmode")
+        if sslmode:
+            url = url.difference_update_query(["sslmode"])
+            if sslmode != "disable":
+                connect_args["ssl"] = sslmode
+        url = url.set(drivername="postgresql+asyncpg")
+    elif backend == "sqlite":
+        url = url.set(drivername="sqlite+aiosqlite")
+    return url, connect_args
+
+
+# Engine async được tạo khi cần để các script đồng bộ không phải cài asyncpg
+_async_engine = None
+_AsyncSessionLocal = None
+
+
+def get_async_engine():
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        url, connect_args = async_database_url(settings.DATABASE_URL)
+        _async_engine = create_async_engine(
+            url,
+            connect_args=connect_args,
+            **_engine_options(settings.DATABASE_URL, poolclass=TimedAsyncAdaptedQueuePool),
+        )
+        _AsyncSessionLocal = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+    return _async_engine
+
+
+async def get_async_db():
+    get_async_engine()
+    async with _AsyncSessionLocal() as db:
+        yield db
+
+
+async def dispose_async_engine():
+    if _async_engine is not None:
+        await _async_engine.dispose()
+
+
+def _queue_pool_status(pool) -> dict:
+    return {
+        "pool_class": type(pool).__name__,
+        "metrics": pool.metrics.snapshot(),
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
+
+
+def get_pool_status() -> dict:
+    """Trạng thái hiện tại của connection pool cùng thống kê thời gian chờ checkout"""
+    pool = engine.pool
+    if isinstance(pool, TimedQueuePool):
+        status = _queue_pool_status(pool)
+        status["config"] = {
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_pre_ping": settings.DB_POOL_PRE_PING,
+            "pool_recycle": settings.DB_POOL_RECYCLE,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+        }
+    else:
+        status = {"pool_class": type(pool).__name__, "metrics": pool_metrics.snapshot()}
+    if _async_engine is not None and isinstance(_async_engine.pool, TimedAsyncAdaptedQueuePool):
+        status["async"] = _queue_pool_status(_async_engine.pool)
+    return status
@@ -0,0 +1,13 @@
+from sqlalchemy.orm import Session
+
+
+def dialect_insert(db: Session, table):
+    """INSERT hỗ trợ ON CONFLICT (PostgreSQL / SQLite) theo dialect của session"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"ON CONFLICT upsert is not supported for dialect '{dialect}'")
+    return insert(table)
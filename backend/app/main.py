@@ -20,8 +20,11 @@ logging.getLogger("uvicorn.access").setLevel(logging.INFO)
 
 import app.model  # Đảm bảo model được load trước
 import app.model.address_model  # Import address models explicitly
+from app.auth.password_pool import shutdown_password_pool
+from app.auth.revocation import start_revocation_list, stop_revocation_list
+from app.core.config import settings
 from app.database.base_class import Base
-from app.database.session import engine
+from app.database.session import dispose_async_engine, engine
 from app.router import (
     address_router,
     auth_router,
@@ -31,13 +34,17 @@ from app.router import (
     customer_router,
     employee_router,
     images_router,
+    internal_router,
     order_router,
     product_router,
     public_router,
+    report_router,
     user_order_router,
     user_router,
     variation_router,
 )
+from app.service.cart_store import start_cart_store, stop_cart_store
+from app.service.search_index import start_search_index, stop_search_index
 
 app = FastAPI(title="Auth Service API", version="0.1.0")
 
@@ -63,6 +70,22 @@ def health_check():
     return {"status": "ok", "message": "Backend is running"}
 
 
+@app.on_event("startup")
+def startup():
+    start_cart_store(settings.CART_BACKEND, settings.CART_FLUSH_INTERVAL_SECONDS, settings.CART_IDLE_SECONDS)
+    start_revocation_list()
+    start_search_index(settings.SEARCH_BACKEND, settings.SEARCH_INDEX_REFRESH_SECONDS)
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    stop_cart_store()  # ghi nốt giỏ hàng còn trong bộ nhớ
+    stop_revocation_list()
+    stop_search_index()
+    shutdown_password_pool()
+    await dispose_async_engine()
+
+
 # ✅ Tạo bảng DB
 Base.metadata.create_all(bind=engine)
 
@@ -79,6 +102,7 @@ app.include_router(images_router.router)
 app.include_router(customer_router.router)
 app.include_router(employee_router.router)
 app.include_router(order_router.router)
+app.include_router(report_router.router)
 
 # User routes
 app.include_router(user_router.router)
@@ -87,6 +111,9 @@ app.include_router(cart_router.router)
 app.include_router(user_order_router.router)
 app.include_router(address_router.router)
 
+# Internal / monitoring routes
+app.include_router(internal_router.router)
+
 # Serve static files (mount AFTER routers to avoid path conflicts)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
@@ -8,12 +8,15 @@ from app.model.cartitem_model import CartItem
 from app.model.category_model import Category
 from app.model.customer_model import Customer
 from app.model.employee_model import Employee
+from app.model.idempotency_model import IdempotencyKey
 from app.model.images_model import Images
 from app.model.orderline_model import OrderLine
 from app.model.paymentmethod_model import PaymentMethod
 from app.model.posorder_model import POSOrder
 from app.model.product_model import Product
+from app.model.revoked_token_model import RevokedToken
 from app.model.role_model import Role
+from app.model.sales_rollup_model import SalesDailyRollup
 from app.model.variation_model import Variation
 
 __all__ = [
@@ -32,4 +35,7 @@ __all__ = [
     "PaymentMethod",
     "POSOrder",
     "OrderLine",
+    "SalesDailyRollup",
+    "IdempotencyKey",
+    "RevokedToken",
 ]
@@ -12,6 +12,8 @@ class Account(Base):
     Password = Column("password", String(255), nullable=False)
     RoleID = Column("roleid", Integer, ForeignKey("role.pk_role"), nullable=False)
     Status = Column("status", String(50), nullable=False, default="ACTIVE")
+    # Tăng lên để thu hồi mọi access token đã cấp (claim "ver" phải khớp)
+    Token_Version = Column("token_version", Integer, nullable=False, default=0, server_default="0")
 
     role = relationship("Role")
     employee = relationship("Employee", back_populates="account", uselist=False)
@@ -4,6 +4,11 @@ from app.database.base_class import Base
 
 
 class CartVariation(Base):
+    """
+    Bảng cũ ánh xạ cartitem -> variation (1:1). Không còn được ghi: CartItem.VariationID thay thế.
+    Giữ lại cho dữ liệu cũ / migrate_cartitem_variation.py.
+    """
+
     __tablename__ = "cart_variation"
 
     PK_CartVariation = Column("pk_cart_variation", Integer, primary_key=True, index=True)
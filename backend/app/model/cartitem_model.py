@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Integer, String
+from sqlalchemy import Column, ForeignKey, Index, Integer, String
 
 from app.database.base_class import Base
 
@@ -8,5 +8,12 @@ class CartItem(Base):
 
     PK_CartItem = Column("pk_cartitem", Integer, primary_key=True, index=True)
     Customer_id = Column("customer_id", Integer, ForeignKey("customer.pk_customer"))
+    # Variation nằm ngay trên dòng giỏ hàng (trước đây qua bảng cart_variation 1:1)
+    VariationID = Column("variation_id", Integer, ForeignKey("variation.pk_variation"))
     Quantity = Column("quantity", Integer)
     Status = Column("status", String(50))
+
+    # Mỗi customer chỉ có một dòng cho mỗi variation/trạng thái - cho phép INSERT ... ON CONFLICT khi thêm vào giỏ
+    __table_args__ = (
+        Index("uq_cartitem_customer_variation_status", "customer_id", "variation_id", "status", unique=True),
+    )
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, DateTime, String, Text
+
+from app.database.base_class import Base
+
+
+class IdempotencyKey(Base):
+    """Kết quả của request POST có header Idempotency-Key (dùng khi IDEMPOTENCY_BACKEND=database)"""
+
+    __tablename__ = "idempotency_key"
+
+    Scope = Column("scope", String(100), primary_key=True)  # endpoint + người gọi
+    Key = Column("key", String(255), primary_key=True)
+    Fingerprint = Column("fingerprint", String(64), nullable=False)  # sha256 của request body
+    Response = Column("response", Text)  # JSON; NULL khi request còn đang xử lý
+    Expires_At = Column("expires_at", DateTime, nullable=False, index=True)
@@ -14,6 +14,9 @@ class OrderLine(Base):
     Unit_Price = Column("unit_price", Numeric(12, 2))
     Price = Column("price", Numeric(12, 2))
     Status = Column("status", String(50))
+    # Nhóm (danh mục, thương hiệu) của sales_daily_rollup chụp lúc đặt hàng (0 = không có); NULL ở dòng cũ
+    CategoryID = Column("categoryid", Integer)
+    BrandID = Column("brandid", Integer)
     Creation_date = Column("creation_date", TIMESTAMP)
     Edit_date = Column("edit_date", TIMESTAMP)
 
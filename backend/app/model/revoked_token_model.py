@@ -0,0 +1,14 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String
+
+from app.database.base_class import Base
+
+
+class RevokedToken(Base):
+    """Access token đã bị thu hồi (logout) theo claim jti; xóa được khi token đã hết hạn"""
+
+    __tablename__ = "revoked_token"
+
+    JTI = Column("jti", String(64), primary_key=True)
+    AccountID = Column("accountid", Integer, ForeignKey("account.pk_account", ondelete="CASCADE"), index=True)
+    Expires_At = Column("expires_at", DateTime, nullable=False, index=True)  # exp của token
+    Revoked_At = Column("revoked_at", DateTime, nullable=False)
@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Date, Integer, Numeric, String
+
+from app.database.base_class import Base
+
+
+class SalesDailyRollup(Base):
+    """Doanh số theo ngày / danh mục / thương hiệu / trạng thái đơn - cập nhật cùng transaction với đơn hàng"""
+
+    __tablename__ = "sales_daily_rollup"
+
+    # CategoryID / BrandID = 0 khi sản phẩm không có danh mục/thương hiệu (khóa chính không nhận NULL)
+    Sale_Date = Column("sale_date", Date, primary_key=True)
+    CategoryID = Column("categoryid", Integer, primary_key=True)
+    BrandID = Column("brandid", Integer, primary_key=True)
+    Status = Column("status", String(50), primary_key=True)
+    Order_Count = Column("order_count", Integer, nullable=False, default=0)
+    Line_Count = Column("line_count", Integer, nullable=False, default=0)
+    Quantity = Column("quantity", Integer, nullable=False, default=0)
+    Revenue = Column("revenue", Numeric(14, 2), nullable=False, default=0)
@@ -3,7 +3,7 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
-from app.auth.dependencies import get_current_account
+from app.auth.dependencies import get_current_customer_id
 from app.database.session import get_db
 from app.schema.address_schema import (
     AddressCreate,
@@ -14,20 +14,10 @@ from app.schema.address_schema import (
     WardResponse,
 )
 from app.service.address_service import AddressService
-from app.service.user_service import UserService
 
 router = APIRouter(prefix="/user/addresses", tags=["User - Addresses"])
 
 
-def get_current_customer_id(current_account=Depends(get_current_account), db: Session = Depends(get_db)):
-    """Helper để lấy customer_id từ account hiện tại"""
-    user_service = UserService(db)
-    customer = user_service.get_user_profile(current_account.PK_Account)
-    if not customer:
-        raise HTTPException(status_code=404, detail="Customer profile not found")
-    return customer.PK_Customer
-
-
 @router.get("/provinces", response_model=List[ProvinceResponse])
 def get_provinces(db: Session = Depends(get_db)):
     """Lấy danh sách tỉnh/thành phố"""
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 import logging
 
+from app.auth.account_cache import CachedAccount
 from app.auth.auth_service import AuthService
+from app.auth.dependencies import get_current_account, get_token_payload
+from app.auth.login_limiter import request_client_ip
 from app.database.session import get_db
-from app.model.account_model import Account
 from app.schema.account_schema import AccountCreate, AccountLogin, AccountResponse
 
 logger = logging.getLogger(__name__)
@@ -24,19 +26,11 @@ def register(account: AccountCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/login")
-def login(account: AccountLogin, db: Session = Depends(get_db)):
+def login(account: AccountLogin, request: Request, db: Session = Depends(get_db)):
     logger.info(f"Login attempt for username: {account.username}")
     auth_service = AuthService(db)  # tạo instance với db
-    db_account = auth_service.authenticate_account(account.username, account.password)
-    if not db_account:
-        # Check if user exists
-        user_exists = db.query(Account).filter(Account.Username == account.username).first()
-        if not user_exists:
-            logger.warning(f"Login failed - username not found: {account.username}")
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Username does not exist")
-        else:
-            logger.warning(f"Login failed - incorrect password for: {account.username}")
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect password")
+    client_ip = request_client_ip(request)
+    db_account = auth_service.login(account.username, account.password, client_ip)
 
     logger.info(f"Login successful for: {account.username}, Role: {db_account.RoleID}")
     # Check account status
@@ -46,10 +40,22 @@ def login(account: AccountLogin, db: Session = Depends(get_db)):
             detail=f"Account is {db_account.Status}. Please contact administrator."
         )
 
-    access_token = auth_service.create_access_token(data={"sub": db_account.Username, "role_id": db_account.RoleID})
+    access_token = auth_service.create_account_token(db_account)
     return {
         "access_token": access_token,
         "token_type": "bearer",
         "role_id": db_account.RoleID,
         "account_status": db_account.Status
     }
+
+
+@router.post("/logout")
+def logout(
+    payload: dict = Depends(get_token_payload),
+    current_account: CachedAccount = Depends(get_current_account),
+    db: Session = Depends(get_db),
+):
+    """Thu hồi access token hiện tại"""
+    AuthService(db).revoke_token(payload, current_account.PK_Account)
+    logger.info(f"Logout: {current_account.Username}")
+    return {"message": "Logged out"}
@@ -3,51 +3,19 @@ from typing import List
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
-from app.auth.dependencies import get_current_account
+from app.auth.dependencies import get_current_customer_id
 from app.database.session import get_db
-from app.schema.cart_schema import CartItemAdd, CartItemResponse, CartItemUpdate
+from app.schema.cart_schema import CartBulkAdd, CartItemAdd, CartItemResponse, CartItemUpdate
 from app.service.cart_service import CartService
-from app.service.user_service import UserService
 
 router = APIRouter(prefix="/cart", tags=["User - Cart"])
 
 
-def get_current_customer_id(current_account=Depends(get_current_account), db: Session = Depends(get_db)):
-    """Helper để lấy customer_id từ account hiện tại"""
-    user_service = UserService(db)
-    customer = user_service.get_user_profile(current_account.PK_Account)
-    if not customer:
-        raise HTTPException(status_code=404, detail="Customer profile not found")
-    return customer.PK_Customer
-
-
 @router.get("/", response_model=List[CartItemResponse])
 def get_cart(customer_id: int = Depends(get_current_customer_id), db: Session = Depends(get_db)):
-    """Lấy giỏ hàng của user"""
+    """Lấy giỏ hàng của user (kèm giá, tồn kho và ảnh mặc định của variation)"""
     service = CartService(db)
-    items = service.get_cart_items(customer_id)
-
-    # Populate variation info
-    from app.model.cart_variation_model import CartVariation
-    from app.model.variation_model import Variation
-
-    result = []
-    for item in items:
-        cart_var = db.query(CartVariation).filter(CartVariation.CartItemID == item.PK_CartItem).first()
-        if cart_var:
-            variation = db.query(Variation).filter(Variation.PK_Variation == cart_var.VariationID).first()
-            item_dict = {
-                "PK_CartItem": item.PK_CartItem,
-                "Customer_id": item.Customer_id,
-                "VariationID": cart_var.VariationID,
-                "Quantity": item.Quantity,
-                "Status": item.Status,
-                "variation_name": variation.Name if variation else "Unknown",
-                "Price": float(variation.Price) if variation else 0,
-            }
-            result.append(item_dict)
-
-    return result
+    return service.get_cart_view(customer_id)
 
 
 @router.post("/", response_model=CartItemResponse)
@@ -56,25 +24,22 @@ def add_to_cart(item: CartItemAdd, customer_id: int = Depends(get_current_custom
     service = CartService(db)
     try:
         cart_item = service.add_to_cart(customer_id, item)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return service.get_cart_view(customer_id, cart_item_id=cart_item.PK_CartItem)[0]
 
-        # Get variation info
-        from app.model.cart_variation_model import CartVariation
-        from app.model.variation_model import Variation
-
-        cart_var = db.query(CartVariation).filter(CartVariation.CartItemID == cart_item.PK_CartItem).first()
-        variation = db.query(Variation).filter(Variation.PK_Variation == cart_var.VariationID).first()
 
-        return {
-            "PK_CartItem": cart_item.PK_CartItem,
-            "Customer_id": cart_item.Customer_id,
-            "VariationID": cart_var.VariationID,
-            "Quantity": cart_item.Quantity,
-            "Status": cart_item.Status,
-            "variation_name": variation.Name if variation else "Unknown",
-            "Price": float(variation.Price) if variation else 0,
-        }
+@router.post("/bulk", response_model=List[CartItemResponse])
+def add_to_cart_bulk(
+    data: CartBulkAdd, customer_id: int = Depends(get_current_customer_id), db: Session = Depends(get_db)
+):
+    """Thêm nhiều sản phẩm vào giỏ hàng (khôi phục giỏ đã lưu); trả về giỏ hàng sau khi cập nhật"""
+    service = CartService(db)
+    try:
+        service.add_items(customer_id, data.items)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    return service.get_cart_view(customer_id)
 
 
 @router.put("/{cart_item_id}", response_model=CartItemResponse)
@@ -90,25 +55,17 @@ def update_cart_item(
     if not cart_item:
         raise HTTPException(status_code=404, detail="Cart item not found")
 
-    # Get variation info
-    from app.model.cart_variation_model import CartVariation
-    from app.model.variation_model import Variation
-
-    cart_var = db.query(CartVariation).filter(CartVariation.CartItemID == cart_item.PK_CartItem).first()
-    if not cart_var:
-        raise HTTPException(status_code=404, detail="Cart variation not found")
-
-    variation = db.query(Variation).filter(Variation.PK_Variation == cart_var.VariationID).first()
-
-    return {
-        "PK_CartItem": cart_item.PK_CartItem,
-        "Customer_id": cart_item.Customer_id,
-        "VariationID": cart_var.VariationID,
-        "Quantity": cart_item.Quantity,
-        "Status": cart_item.Status,
-        "variation_name": variation.Name if variation else "Unknown",
-        "Price": float(variation.Price) if variation else 0,
-    }
+    view = service.get_cart_view(customer_id, cart_item_id=cart_item_id)
+    if not view:
+        # Số lượng <= 0: item đã bị xóa khỏi giỏ
+        return {
+            "PK_CartItem": cart_item_id,
+            "Customer_id": customer_id,
+            "VariationID": cart_item.VariationID,
+            "Quantity": 0,
+            "Status": cart_item.Status,
+        }
+    return view[0]
 
 
 @router.delete("/{cart_item_id}")
@@ -1,9 +1,10 @@
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
 from app.auth.dependencies import get_current_admin_account
+from app.core.pagination import NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER, CountMode, InvalidCursorError, next_cursor
 from app.database.session import get_db
 from app.model.account_model import Account
 from app.schema.images_schema import ImagesCreate, ImagesResponse, ImagesUpdate
@@ -13,16 +14,30 @@ router = APIRouter(prefix="/admin/images", tags=["Admin - Images"])
 
 @router.get("/", response_model=List[ImagesResponse])
 def list_images(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, le=1000),
     product_id: Optional[int] = None,
     variation_id: Optional[int] = None,
+    total: Optional[CountMode] = Query(
+        None, description="Trả tổng số ảnh trong header X-Total-Count (exact | estimated)"
+    ),
+    cursor: Optional[str] = Query(None, description="Cursor từ header X-Next-Cursor của trang trước (bỏ qua skip)"),
     db: Session = Depends(get_db),
     current_admin: Account = Depends(get_current_admin_account)
 ):
     """Lấy danh sách tất cả ảnh"""
     service = ImagesService(db)
-    return service.get_images(skip, limit, product_id, variation_id)
+    try:
+        images = service.get_images(skip, limit, product_id, variation_id, cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    token = next_cursor(images, limit, ImagesService.KEYSET)
+    if token:
+        response.headers[NEXT_CURSOR_HEADER] = token
+    if total:
+        response.headers[TOTAL_COUNT_HEADER] = str(service.count_images(product_id, variation_id, mode=total))
+    return images
 
 @router.get("/{image_id}", response_model=ImagesResponse)
 def get_image(image_id: int, db: Session = Depends(get_db), current_admin: Account = Depends(get_current_admin_account)):
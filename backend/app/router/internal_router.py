@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends
+
+from app.auth.dependencies import get_current_admin_account
+from app.auth.token_cache import get_token_cache
+from app.database.session import get_pool_status
+from app.model.account_model import Account
+
+router = APIRouter(prefix="/internal", tags=["Internal"])
+
+
+@router.get("/pool")
+def pool_stats(current_admin: Account = Depends(get_current_admin_account)):
+    """Thống kê connection pool: số connection đang dùng, overflow và thời gian chờ checkout"""
+    return get_pool_status()
+
+
+@router.get("/token-cache")
+def token_cache_stats(current_admin: Account = Depends(get_current_admin_account)):
+    """Thống kê cache giải mã JWT: số token đang cache, hit / miss"""
+    return get_token_cache().stats()
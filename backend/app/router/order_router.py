@@ -1,41 +1,56 @@
 from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
 from app.auth.dependencies import get_current_admin_account
+from app.core.idempotency import IDEMPOTENCY_KEY_HEADER, run_idempotent
+from app.core.pagination import NEXT_CURSOR_HEADER, InvalidCursorError, next_cursor
 from app.database.session import get_db
 from app.model.account_model import Account
 from app.schema.order_schema import OrderCreate, OrderLineResponse, OrderResponse, OrderUpdate
-from app.service.order_service import OrderService
+from app.service.order_service import OrderService, StatisticsBucket
 
 router = APIRouter(prefix="/admin/orders", tags=["Admin - Orders"])
 
 
 @router.get("/", response_model=List[OrderResponse])
 def list_orders(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, le=1000),
     status: Optional[str] = Query(None, description="Lọc theo trạng thái đơn hàng"),
     customer_id: Optional[int] = Query(None, description="Lọc theo ID khách hàng"),
     start_date: Optional[datetime] = Query(None, description="Lọc từ ngày (YYYY-MM-DD)"),
     end_date: Optional[datetime] = Query(None, description="Lọc đến ngày (YYYY-MM-DD)"),
+    cursor: Optional[str] = Query(None, description="Cursor từ header X-Next-Cursor của trang trước (bỏ qua skip)"),
     db: Session = Depends(get_db),
     current_admin: Account = Depends(get_current_admin_account)
 ):
-    """Lấy danh sách tất cả đơn hàng với khả năng lọc và phân trang"""
+    """Lấy danh sách tất cả đơn hàng với khả năng lọc và phân trang (offset hoặc cursor)"""
     service = OrderService(db)
-    return service.get_orders(skip, limit, status, customer_id, start_date, end_date)
+    try:
+        orders = service.get_orders(skip, limit, status, customer_id, start_date, end_date, cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    token = next_cursor(orders, limit, OrderService.KEYSET)
+    if token:
+        response.headers[NEXT_CURSOR_HEADER] = token
+    return orders
 
 
 @router.get("/statistics")
 def get_order_statistics(
-    start_date: Optional[datetime] = None, end_date: Optional[datetime] = None, db: Session = Depends(get_db), current_admin: Account = Depends(get_current_admin_account)
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    group_by: Optional[StatisticsBucket] = Query(None, description="Chia doanh thu theo ngày hoặc tuần (day | week)"),
+    db: Session = Depends(get_db),
+    current_admin: Account = Depends(get_current_admin_account),
 ):
-    """Lấy thống kê đơn hàng"""
+    """Lấy thống kê đơn hàng (theo trạng thái, phương thức thanh toán và theo ngày/tuần)"""
     service = OrderService(db)
-    return service.get_order_statistics(start_date, end_date)
+    return service.get_order_statistics(start_date, end_date, group_by)
 
 
 @router.get("/{order_id}", response_model=OrderResponse)
@@ -59,13 +74,25 @@ def get_order_lines(order_id: int, db: Session = Depends(get_db), current_admin:
 
 
 @router.post("/", response_model=OrderResponse)
-def create_order(order: OrderCreate, db: Session = Depends(get_db), current_admin: Account = Depends(get_current_admin_account)):
-    """Tạo đơn hàng mới"""
+def create_order(
+    order: OrderCreate,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_KEY_HEADER),
+    db: Session = Depends(get_db),
+    current_admin: Account = Depends(get_current_admin_account),
+):
+    """Tạo đơn hàng mới (gửi header Idempotency-Key để retry an toàn)"""
     service = OrderService(db)
-    try:
-        return service.create_order(order)
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+
+    def handler():
+        try:
+            created = service.create_order(order)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return OrderResponse.model_validate(created).model_dump(mode="json")
+
+    scope = f"admin:{current_admin.PK_Account}:POST /admin/orders/"
+    return run_idempotent(response, idempotency_key, scope, order.model_dump(mode="json"), handler)
 
 
 @router.put("/{order_id}", response_model=OrderResponse)
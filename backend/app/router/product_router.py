@@ -1,10 +1,11 @@
 from typing import List, Optional
 import logging
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 
 from app.auth.dependencies import get_current_admin_account
+from app.core.pagination import NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER, CountMode, InvalidCursorError, next_cursor
 from app.database.session import get_db
 from app.model.account_model import Account
 from app.schema.product_schema import ProductCreate, ProductResponse
@@ -16,17 +17,32 @@ router = APIRouter(prefix="/admin/products", tags=["Admin - Products"])
 
 @router.get("/", response_model=List[ProductResponse])
 def list_products(
+    response: Response,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(10, le=100, description="Maximum number of records to return"),
     name: Optional[str] = Query(None, description="Filter by product name (partial match)"),
     category_id: Optional[int] = Query(None, description="Filter by category ID"),
     brand_id: Optional[int] = Query(None, description="Filter by brand ID"),
+    total: Optional[CountMode] = Query(None, description="Return total count in X-Total-Count (exact | estimated)"),
+    cursor: Optional[str] = Query(
+        None, description="Cursor from the previous page's X-Next-Cursor header (ignores skip)"
+    ),
     db: Session = Depends(get_db),
     current_admin: Account = Depends(get_current_admin_account)
 ):
     logger.info(f"GET /admin/products - skip={skip}, limit={limit}, name={name}, category_id={category_id}, brand_id={brand_id}")
     service = ProductService(db)
-    products = service.get_products(skip=skip, limit=limit, name=name, category_id=category_id, brand_id=brand_id)
+    try:
+        products = service.get_products(skip=skip, limit=limit, name=name, category_id=category_id,
+                                        brand_id=brand_id, cursor=cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    token = next_cursor(products, limit, ProductService.KEYSET)
+    if token:
+        response.headers[NEXT_CURSOR_HEADER] = token
+    if total:
+        count = service.count_products(name=name, category_id=category_id, brand_id=brand_id, mode=total)
+        response.headers[TOTAL_COUNT_HEADER] = str(count)
     logger.info(f"GET /admin/products - returned {len(products)} products")
     return products
 
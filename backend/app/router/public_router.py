@@ -1,46 +1,66 @@
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.database.session import get_db
+from app.core.config import settings
+from app.core.pagination import NEXT_CURSOR_HEADER, InvalidCursorError, next_cursor
+from app.database.session import get_async_db, get_db
 from app.schema.public_schema import BrandPublic, CategoryPublic, ProductPublic, ProductVariationPublic
-from app.service.public_service import PublicProductService
+from app.service.public_service import VARIATION_KEYSET, AsyncPublicProductService, PublicProductService
+from app.service.search_index import get_search_index
 
 router = APIRouter(prefix="/products", tags=["Public - Products"])
 
 
 @router.get("/", response_model=List[ProductVariationPublic])
-def list_product_variations(
+async def list_product_variations(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(20, le=100),
     category_id: Optional[int] = None,
     brand_id: Optional[int] = None,
     search: Optional[str] = None,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(None, description="Cursor từ header X-Next-Cursor của trang trước (bỏ qua skip)"),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Lấy danh sách biến thể sản phẩm (công khai) - hiển thị random variations"""
-    service = PublicProductService(db)
-    return service.get_variations(skip, limit, category_id, brand_id, search)
+    service = AsyncPublicProductService(db, settings.SEARCH_BACKEND)
+    try:
+        variations = await service.get_variations(skip, limit, category_id, brand_id, search, cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    token = next_cursor(variations, limit, VARIATION_KEYSET)
+    if token:
+        response.headers[NEXT_CURSOR_HEADER] = token
+    return variations
 
 
 @router.get("/featured", response_model=List[ProductVariationPublic])
-def get_featured_variations(limit: int = Query(10, le=50), db: Session = Depends(get_db)):
+async def get_featured_variations(limit: int = Query(10, le=50), db: AsyncSession = Depends(get_async_db)):
     """Lấy biến thể sản phẩm nổi bật/bán chạy"""
-    service = PublicProductService(db)
-    return service.get_featured_variations(limit)
+    service = AsyncPublicProductService(db, settings.SEARCH_BACKEND)
+    return await service.get_featured_variations(limit)
 
 
 @router.get("/search", response_model=List[ProductVariationPublic])
-def search_variations(
+async def search_variations(
     keyword: str = Query(..., min_length=1),
     skip: int = Query(0, ge=0),
     limit: int = Query(20, le=100),
-    db: Session = Depends(get_db),
+    category_id: Optional[int] = None,
+    brand_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db),
 ):
     """Tìm kiếm biến thể sản phẩm"""
-    service = PublicProductService(db)
-    return service.search_variations(keyword, skip, limit)
+    index = get_search_index()
+    if index is not None:
+        # SEARCH_BACKEND=memory: không query DB; tìm kiếm tốn CPU và chờ lock của index nên không chạy trên event loop
+        return await run_in_threadpool(index.search, keyword, skip, limit, category_id, brand_id)
+    service = AsyncPublicProductService(db, settings.SEARCH_BACKEND)
+    return await service.search_variations(keyword, skip, limit, category_id, brand_id)
 
 
 @router.get("/categories", response_model=List[CategoryPublic])
@@ -0,0 +1,51 @@
+from datetime import date
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.auth.dependencies import get_current_admin_account
+from app.database.session import get_db
+from app.model.account_model import Account
+from app.schema.report_schema import BrandSalesResponse, CategorySalesResponse, DailySalesResponse
+from app.service.report_service import ReportService
+
+router = APIRouter(prefix="/admin/reports", tags=["Admin - Reports"])
+
+STATUS_DESCRIPTION = "Lọc theo trạng thái đơn (mặc định: tất cả trừ CANCELLED)"
+
+
+@router.get("/daily", response_model=List[DailySalesResponse])
+def daily_sales(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    status: Optional[str] = Query(None, description=STATUS_DESCRIPTION),
+    db: Session = Depends(get_db),
+    current_admin: Account = Depends(get_current_admin_account),
+):
+    """Doanh thu theo ngày (đọc từ sales_daily_rollup)"""
+    return ReportService(db).daily_sales(start_date, end_date, status)
+
+
+@router.get("/categories", response_model=List[CategorySalesResponse])
+def sales_by_category(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    status: Optional[str] = Query(None, description=STATUS_DESCRIPTION),
+    db: Session = Depends(get_db),
+    current_admin: Account = Depends(get_current_admin_account),
+):
+    """Doanh thu theo danh mục (đọc từ sales_daily_rollup)"""
+    return ReportService(db).sales_by_category(start_date, end_date, status)
+
+
+@router.get("/brands", response_model=List[BrandSalesResponse])
+def sales_by_brand(
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    status: Optional[str] = Query(None, description=STATUS_DESCRIPTION),
+    db: Session = Depends(get_db),
+    current_admin: Account = Depends(get_current_admin_account),
+):
+    """Doanh thu theo thương hiệu (đọc từ sales_daily_rollup)"""
+    return ReportService(db).sales_by_brand(start_date, end_date, status)
@@ -1,73 +1,54 @@
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 import logging
 
-from app.auth.dependencies import get_current_account
+from app.auth.dependencies import get_current_customer_id
+from app.core.idempotency import IDEMPOTENCY_KEY_HEADER, run_idempotent
+from app.core.pagination import NEXT_CURSOR_HEADER, InvalidCursorError, next_cursor
 from app.database.session import get_db
-from app.schema.order_schema import OrderCreate, OrderLineResponse, OrderResponse
+from app.schema.cart_schema import CartItemResponse
+from app.schema.order_schema import OrderLineResponse, OrderResponse
+from app.service.cart_service import CartService
+from app.service.checkout_service import DEFAULT_PAYMENT_METHOD_ID, CheckoutService
 from app.service.order_service import OrderService
-from app.service.user_service import UserService
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/user/orders", tags=["User - Orders"])
 
 
-def get_current_customer_id(current_account=Depends(get_current_account), db: Session = Depends(get_db)):
-    """Helper để lấy customer_id từ account hiện tại"""
-    logger.debug(f"Getting customer_id for account: {current_account.Username} (PK: {current_account.PK_Account})")
-    user_service = UserService(db)
-    customer = user_service.get_user_profile(current_account.PK_Account)
-    if not customer:
-        logger.error(f"Customer profile not found for account: {current_account.Username}")
-        raise HTTPException(status_code=404, detail="Customer profile not found")
-    logger.debug(f"Found customer_id: {customer.PK_Customer}")
-    return customer.PK_Customer
-
-
 @router.get("/", response_model=List[OrderResponse])
 def get_my_orders(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(50, le=100),
     status: Optional[str] = None,
+    cursor: Optional[str] = Query(None, description="Cursor từ header X-Next-Cursor của trang trước (bỏ qua skip)"),
     customer_id: int = Depends(get_current_customer_id),
     db: Session = Depends(get_db),
 ):
-    """Lấy danh sách đơn hàng của user"""
-    from app.model.posorder_model import POSOrder
-
-    query = db.query(POSOrder).filter(POSOrder.CustomerID == customer_id)
-
-    if status:
-        query = query.filter(POSOrder.Status == status)
-
-    orders = query.order_by(POSOrder.Creation_date.desc()).offset(skip).limit(limit).all()
-
-    # Populate shipping addresses for each order
+    """Lấy danh sách đơn hàng của user (kèm địa chỉ giao hàng)"""
     service = OrderService(db)
-    for order in orders:
-        order_with_address = service.get_order_by_id(order.PK_POSOrder)
-        if order_with_address:
-            order.ShippingAddress = order_with_address.ShippingAddress
-
+    try:
+        orders = service.get_customer_orders(customer_id, skip, limit, status, cursor)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    token = next_cursor(orders, limit, OrderService.KEYSET)
+    if token:
+        response.headers[NEXT_CURSOR_HEADER] = token
     return orders
 
 
 @router.get("/{order_id}", response_model=OrderResponse)
 def get_order_detail(order_id: int, customer_id: int = Depends(get_current_customer_id), db: Session = Depends(get_db)):
     """Lấy chi tiết đơn hàng"""
-    from app.model.posorder_model import POSOrder
-
-    # First verify order belongs to customer
-    order = db.query(POSOrder).filter(POSOrder.PK_POSOrder == order_id, POSOrder.CustomerID == customer_id).first()
-
+    # Lọc theo customer_id để chỉ chủ đơn hàng mới xem được
+    service = OrderService(db)
+    order = service.get_order_by_id(order_id, customer_id=customer_id)
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
-
-    # Use OrderService to get order with shipping address populated
-    service = OrderService(db)
-    return service.get_order_by_id(order_id)
+    return order
 
 
 @router.get("/{order_id}/items", response_model=List[OrderLineResponse])
@@ -86,49 +67,31 @@ def get_order_items(order_id: int, customer_id: int = Depends(get_current_custom
 
 
 @router.post("/", response_model=OrderResponse)
-def create_order(order_data: dict, customer_id: int = Depends(get_current_customer_id), db: Session = Depends(get_db)):
-    """Tạo đơn hàng mới từ giỏ hàng"""
-    from app.model.cart_variation_model import CartVariation
-    from app.model.variation_model import Variation
-    from app.service.cart_service import CartService
-
-    # Get cart items
-    cart_service = CartService(db)
-    cart_items = cart_service.get_cart_items(customer_id)
-
-    if not cart_items:
-        raise HTTPException(status_code=400, detail="Cart is empty")
-
-    # Build order lines from cart
-    order_lines = []
-    for cart_item in cart_items:
-        cart_var = db.query(CartVariation).filter(CartVariation.CartItemID == cart_item.PK_CartItem).first()
-        if cart_var:
-            variation = db.query(Variation).filter(Variation.PK_Variation == cart_var.VariationID).first()
-            if variation:
-                order_lines.append(
-                    {"VariationID": cart_var.VariationID, "Quantity": cart_item.Quantity, "Unit_Price": variation.Price}
-                )
-
-    # Create order
-    order = OrderCreate(
-        CustomerID=customer_id,
-        EmployeeID=None,
-        AddressID=order_data.get("address_id"),
-        PaymentMethodID=order_data.get("payment_method_id", 5),  # Default to Cash
-        Note=order_data.get("note", ""),
-        Type_Order="Online",
-        order_lines=order_lines,
-    )
-
-    service = OrderService(db)
-    try:
-        new_order = service.create_order(order)
-        # Clear cart after successful order
-        cart_service.clear_cart(customer_id)
-        return new_order
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+def create_order(
+    order_data: dict,
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, alias=IDEMPOTENCY_KEY_HEADER),
+    customer_id: int = Depends(get_current_customer_id),
+    db: Session = Depends(get_db),
+):
+    """Tạo đơn hàng mới từ giỏ hàng (tạo đơn và xóa giỏ trong cùng một transaction)"""
+    service = CheckoutService(db)
+
+    def handler():
+        try:
+            order = service.checkout(
+                customer_id,
+                address_id=order_data.get("address_id"),
+                payment_method_id=order_data.get("payment_method_id", DEFAULT_PAYMENT_METHOD_ID),
+                note=order_data.get("note", ""),
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return OrderResponse.model_validate(order).model_dump(mode="json")
+
+    # Retry với cùng Idempotency-Key trả lại đơn đã tạo thay vì checkout lại
+    scope = f"customer:{customer_id}:POST /user/orders/"
+    return run_idempotent(response, idempotency_key, scope, order_data, handler)
 
 
 @router.post("/{order_id}/cancel", response_model=OrderResponse)
@@ -148,6 +111,18 @@ def cancel_my_order(order_id: int, customer_id: int = Depends(get_current_custom
     return cancelled
 
 
+@router.post("/{order_id}/reorder", response_model=List[CartItemResponse])
+def reorder(order_id: int, customer_id: int = Depends(get_current_customer_id), db: Session = Depends(get_db)):
+    """Đặt lại: thêm toàn bộ sản phẩm của đơn cũ vào giỏ hàng, trả về giỏ hàng sau khi cập nhật"""
+    service = CartService(db)
+    try:
+        if not service.reorder(customer_id, order_id):
+            raise HTTPException(status_code=404, detail="Order not found")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return service.get_cart_view(customer_id)
+
+
 @router.post("/{order_id}/confirm-received", response_model=OrderResponse)
 def confirm_order_received(
     order_id: int,
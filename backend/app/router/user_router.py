@@ -1,12 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Form
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Form
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 import logging
 
-from app.auth.dependencies import get_current_account
+from app.auth.dependencies import get_current_account, get_token_payload
+from app.auth.login_limiter import request_client_ip
 from app.auth.auth_service import AuthService
 from app.database.session import get_db
-from app.model.account_model import Account
 from app.schema.account_schema import AccountLogin
 from app.schema.user_schema import (
     ChangePassword,
@@ -23,20 +23,12 @@ router = APIRouter(prefix="/user", tags=["User"])
 
 
 @router.post("/auth/login")
-def user_login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+def user_login(request: Request, form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     """Login cho customer (RoleID = 2) - OAuth2 compatible"""
     logger.info(f"User login attempt for username: {form_data.username}")
     auth_service = AuthService(db)
-    db_account = auth_service.authenticate_account(form_data.username, form_data.password)
-    
-    if not db_account:
-        user_exists = db.query(Account).filter(Account.Username == form_data.username).first()
-        if not user_exists:
-            logger.warning(f"Login failed - username not found: {form_data.username}")
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Username does not exist")
-        else:
-            logger.warning(f"Login failed - incorrect password for: {form_data.username}")
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Incorrect password")
+    client_ip = request_client_ip(request)
+    db_account = auth_service.login(form_data.username, form_data.password, client_ip)
     logger.info(f"User login successful for: {form_data.username}, Role: {db_account.RoleID}")
     
     # Check account status
@@ -46,7 +38,7 @@ def user_login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = D
             detail=f"Account is {db_account.Status}. Please contact administrator."
         )
 
-    access_token = auth_service.create_access_token(data={"sub": db_account.Username, "role_id": db_account.RoleID})
+    access_token = auth_service.create_account_token(db_account)
     return {
         "access_token": access_token,
         "token_type": "bearer",
@@ -55,6 +47,18 @@ def user_login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = D
     }
 
 
+@router.post("/auth/logout")
+def user_logout(
+    payload: dict = Depends(get_token_payload),
+    current_account=Depends(get_current_account),
+    db: Session = Depends(get_db),
+):
+    """Logout: thu hồi access token hiện tại (token khác của account vẫn dùng được)"""
+    AuthService(db).revoke_token(payload, current_account.PK_Account)
+    logger.info(f"User logout: {current_account.Username}")
+    return {"message": "Logged out"}
+
+
 @router.post("/register", response_model=UserProfile, status_code=status.HTTP_201_CREATED)
 def register(user_data: UserRegister, db: Session = Depends(get_db)):
     """Đăng ký tài khoản khách hàng mới"""
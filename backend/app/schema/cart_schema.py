@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 
 from pydantic import BaseModel
 
@@ -8,6 +8,10 @@ class CartItemAdd(BaseModel):
     quantity: int = 1
 
 
+class CartBulkAdd(BaseModel):
+    items: List[CartItemAdd]
+
+
 class CartItemUpdate(BaseModel):
     quantity: int
 
@@ -20,6 +24,9 @@ class CartItemResponse(BaseModel):
     VariationID: int
     variation_name: Optional[str] = None
     Price: Optional[float] = None
+    Stock: Optional[int] = None  # Tồn kho hiện tại của variation
+    ProductID: Optional[int] = None
+    Image: Optional[str] = None  # Ảnh mặc định (variation, nếu không có thì product)
 
     class Config:
         from_attributes = True
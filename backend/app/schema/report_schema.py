@@ -0,0 +1,37 @@
+from datetime import date
+from decimal import Decimal
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class DailySalesResponse(BaseModel):
+    date: date
+    orders: int
+    quantity: int
+    revenue: Decimal
+
+    class Config:
+        from_attributes = True
+
+
+class CategorySalesResponse(BaseModel):
+    category_id: int
+    category_name: Optional[str]
+    orders: int
+    quantity: int
+    revenue: Decimal
+
+    class Config:
+        from_attributes = True
+
+
+class BrandSalesResponse(BaseModel):
+    brand_id: int
+    brand_name: Optional[str]
+    orders: int
+    quantity: int
+    revenue: Decimal
+
+    class Config:
+        from_attributes = True
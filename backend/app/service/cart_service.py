@@ -1,68 +1,254 @@
+from typing import List, Optional
+
+from sqlalchemy import and_, func, or_, select
 from sqlalchemy.orm import Session
 
-from app.model.cart_variation_model import CartVariation
+from app.database.upsert import dialect_insert
 from app.model.cartitem_model import CartItem
+from app.model.images_model import Images
+from app.model.orderline_model import OrderLine
+from app.model.posorder_model import POSOrder
 from app.model.variation_model import Variation
 from app.schema.cart_schema import CartItemAdd
+from app.service.cart_store import CartLine, MemoryCartStore, get_cart_store
 import logging
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
 
+def _default_image():
+    """Ảnh mặc định: ưu tiên ảnh của variation, sau đó ảnh chung của product; Set_Default trước"""
+    return (
+        select(Images.Id_Image)
+        .where(
+            or_(
+                Images.VariationID == Variation.PK_Variation,
+                and_(Images.ProductID == Variation.ProductID, Images.VariationID.is_(None)),
+            )
+        )
+        .order_by(
+            Images.VariationID.is_(None),
+            func.coalesce(Images.Set_Default, False).desc(),
+            Images.PK_Images,
+        )
+        .limit(1)
+        .correlate(Variation)
+        .scalar_subquery()
+    )
+
+
+def _variation_columns():
+    return (
+        func.coalesce(Variation.Name, "Unknown").label("variation_name"),
+        func.coalesce(Variation.Price, 0).label("Price"),
+        Variation.Quantity.label("Stock"),
+        Variation.ProductID,
+        _default_image().label("Image"),
+    )
+
+
 class CartService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, store: Optional[MemoryCartStore] = None):
         self.db = db
+        # CART_BACKEND=memory: giỏ hàng nằm trong bộ nhớ, ghi xuống DB theo chu kỳ (write-behind)
+        self.store = store if store is not None else get_cart_store()
+
+    def _memory_item(self, customer_id: int, line: CartLine):
+        """CartItem tạm (không add vào session) để router dùng như khi đọc từ DB"""
+        return CartItem(
+            PK_CartItem=line.cart_item_id,
+            Customer_id=customer_id,
+            VariationID=line.variation_id,
+            Quantity=line.quantity,
+            Status="active",
+        )
+
+    def _check_stock(self, requested: dict, in_cart: dict):
+        """Một câu SELECT tồn kho cho mọi variation; lỗi thì liệt kê tất cả variation không hợp lệ"""
+        stock = dict(
+            self.db.execute(
+                select(Variation.PK_Variation, Variation.Quantity).where(Variation.PK_Variation.in_(requested))
+            ).all()
+        )
+        self._raise_stock_errors(requested, stock, in_cart)
+
+    @staticmethod
+    def _raise_stock_errors(requested: dict, stock: dict, in_cart: dict):
+        errors = []
+        for variation_id in sorted(requested):
+            if variation_id not in stock:
+                errors.append(f"variation {variation_id} not found")
+            elif (stock[variation_id] or 0) < requested[variation_id] + in_cart.get(variation_id, 0):
+                errors.append(f"variation {variation_id}: not enough stock ({stock[variation_id] or 0} left)")
+        if errors:
+            raise ValueError("; ".join(errors))
 
     def get_cart_items(self, customer_id: int):
         """Lấy tất cả items trong giỏ hàng của customer"""
         carts = self.db.query(CartItem).filter(CartItem.Customer_id == customer_id, CartItem.Status == "active").all()
-        for idx, c in enumerate(carts,1):
-            print(f"[{idx}] ID:{c.PK_CartItem} Qty:{c.Quantity}")
+        logger.debug(f"{len(carts)} cart items for customer {customer_id}")
         return carts
 
+    def get_cart_view(self, customer_id: int, cart_item_id: Optional[int] = None):
+        """Giỏ hàng đầy đủ (item, variation, giá, tồn kho, ảnh mặc định) trong một câu SELECT"""
+        if self.store is not None:
+            return self._memory_cart_view(customer_id, cart_item_id)
+
+        stmt = (
+            select(
+                CartItem.PK_CartItem,
+                CartItem.Customer_id,
+                CartItem.VariationID,
+                CartItem.Quantity,
+                CartItem.Status,
+                *_variation_columns(),
+            )
+            .outerjoin(Variation, Variation.PK_Variation == CartItem.VariationID)
+            .where(
+                CartItem.Customer_id == customer_id,
+                CartItem.Status == "active",
+                CartItem.VariationID.is_not(None),
+            )
+            .order_by(CartItem.PK_CartItem)
+        )
+        if cart_item_id is not None:
+            stmt = stmt.where(CartItem.PK_CartItem == cart_item_id)
+        rows = self.db.execute(stmt).mappings().all()
+        logger.debug(f"Cart view: {len(rows)} items for customer {customer_id}")
+        return rows
+
+    def _memory_cart_view(self, customer_id: int, cart_item_id: Optional[int] = None):
+        lines = self.store.items(self.db, customer_id)
+        if cart_item_id is not None:
+            variation_id = self.store.resolve(self.db, customer_id, cart_item_id)
+            lines = [line for line in lines if line.variation_id == variation_id]
+        if not lines:
+            return []
+        variations = {
+            row["PK_Variation"]: row
+            for row in self.db.execute(
+                select(Variation.PK_Variation, *_variation_columns()).where(
+                    Variation.PK_Variation.in_([line.variation_id for line in lines])
+                )
+            ).mappings()
+        }
+        empty = {"variation_name": "Unknown", "Price": 0, "Stock": None, "ProductID": None, "Image": None}
+        return [
+            {
+                "PK_CartItem": line.cart_item_id,
+                "Customer_id": customer_id,
+                "VariationID": line.variation_id,
+                "Quantity": line.quantity,
+                "Status": "active",
+                **{key: variations.get(line.variation_id, empty)[key] for key in empty},
+            }
+            for line in lines
+        ]
+
+    def add_items(self, customer_id: int, items: List[CartItemAdd]):
+        """
+        Thêm nhiều variation vào giỏ trong một transaction (cộng dồn vào item đã có).
+        Tồn kho được kiểm tra cho toàn bộ danh sách bằng một câu SELECT; lỗi ở một item thì không item nào được thêm.
+        """
+        requested = {}
+        for item in items:
+            if item.quantity <= 0:
+                raise ValueError(f"Invalid quantity {item.quantity} for variation {item.variation_id}")
+            requested[item.variation_id] = requested.get(item.variation_id, 0) + item.quantity
+        if not requested:
+            return
+
+        if self.store is not None:
+            self._check_stock(requested, self.store.quantities(self.db, customer_id))
+            self.store.add(self.db, customer_id, requested)
+            return
+
+        # Một câu SELECT: tồn kho + số lượng đang có trong giỏ cho mọi variation được yêu cầu
+        rows = self.db.execute(
+            select(Variation.PK_Variation, Variation.Quantity, CartItem.Quantity.label("in_cart"))
+            .outerjoin(
+                CartItem,
+                and_(
+                    CartItem.VariationID == Variation.PK_Variation,
+                    CartItem.Customer_id == customer_id,
+                    CartItem.Status == "active",
+                ),
+            )
+            .where(Variation.PK_Variation.in_(requested))
+        ).all()
+        self._raise_stock_errors(
+            requested,
+            {row.PK_Variation: row.Quantity for row in rows},
+            {row.PK_Variation: row.in_cart for row in rows if row.in_cart},
+        )
+
+        # Một câu INSERT ... ON CONFLICT cho toàn bộ danh sách
+        self._upsert_items(customer_id, requested)
+        self.db.commit()
+        logger.debug(f"Bulk add: {len(requested)} variations for customer {customer_id}")
+
+    def _upsert_items(self, customer_id: int, quantities: dict):
+        """INSERT ... ON CONFLICT (customer_id, variation_id, status) DO UPDATE quantity = quantity + excluded"""
+        table = CartItem.__table__
+        stmt = dialect_insert(self.db, table).values(
+            [
+                {"customer_id": customer_id, "variation_id": variation_id, "quantity": quantity, "status": "active"}
+                for variation_id, quantity in quantities.items()
+            ]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.customer_id, table.c.variation_id, table.c.status],
+            set_={"quantity": table.c.quantity + stmt.excluded.quantity},
+        )
+        return self.db.execute(stmt.returning(table.c.pk_cartitem)).scalars().all()
+
+    def reorder(self, customer_id: int, order_id: int):
+        """Thêm lại các sản phẩm của một đơn cũ vào giỏ. Trả về False nếu đơn không thuộc customer."""
+        lines = self.db.execute(
+            select(OrderLine.VariationID, func.sum(OrderLine.Quantity).label("quantity"))
+            .join(POSOrder, POSOrder.PK_POSOrder == OrderLine.OrderID)
+            .where(
+                POSOrder.PK_POSOrder == order_id,
+                POSOrder.CustomerID == customer_id,
+                OrderLine.VariationID.is_not(None),
+            )
+            .group_by(OrderLine.VariationID)
+        ).all()
+        if not lines:
+            return False
+        self.add_items(customer_id, [CartItemAdd(variation_id=v, quantity=q) for v, q in lines])
+        return True
+
     def add_to_cart(self, customer_id: int, item_data: CartItemAdd):
-        """Thêm sản phẩm vào giỏ hàng"""
+        """Thêm sản phẩm vào giỏ hàng (cộng dồn nếu variation đã có trong giỏ)"""
+        if item_data.quantity <= 0:
+            raise ValueError("Quantity must be positive")
+
         # Check if variation exists and has stock
-        variation = self.db.query(Variation).filter(Variation.PK_Variation == item_data.variation_id).first()
+        stock = self.db.execute(
+            select(Variation.Quantity).where(Variation.PK_Variation == item_data.variation_id)
+        ).first()
 
-        if not variation:
+        if not stock:
             raise ValueError("Product variation not found")
 
-        if variation.Quantity < item_data.quantity:
+        if (stock.Quantity or 0) < item_data.quantity:
             raise ValueError("Not enough stock")
 
-        # Check if item already in cart
-        existing_cart_item = (
-            self.db.query(CartItem)
-            .filter(CartItem.Customer_id == customer_id, CartItem.Status == "active")
-            .join(CartVariation)
-            .filter(CartVariation.VariationID == item_data.variation_id)
-            .first()
-        )
+        if self.store is not None:
+            (line,) = self.store.add(self.db, customer_id, {item_data.variation_id: item_data.quantity})
+            return self._memory_item(customer_id, line)
 
-        if existing_cart_item:
-            # Update quantity
-            existing_cart_item.Quantity += item_data.quantity
-            self.db.commit()
-            self.db.refresh(existing_cart_item)
-            logger.debug(f"Updated cart item {existing_cart_item.PK_CartItem} quantity to {existing_cart_item.Quantity} for customer {customer_id}")
-            return existing_cart_item
-        else:
-            # Create new cart item
-            cart_item = CartItem(Customer_id=customer_id, Quantity=item_data.quantity, Status="active")
-            self.db.add(cart_item)
-            self.db.flush()
-
-            # Create cart_variation mapping
-            cart_var = CartVariation(CartItemID=cart_item.PK_CartItem, VariationID=item_data.variation_id)
-            self.db.add(cart_var)
-            self.db.commit()
-            self.db.refresh(cart_item)
-            logger.debug(f"Added new cart item {cart_item.PK_CartItem} quantity {cart_item.Quantity} for customer {customer_id}")
-            return cart_item
+        (cart_item_id,) = self._upsert_items(customer_id, {item_data.variation_id: item_data.quantity})
+        self.db.commit()
+        logger.debug(f"Upserted cart item {cart_item_id} (+{item_data.quantity}) for customer {customer_id}")
+        return self.db.get(CartItem, cart_item_id, populate_existing=True)
 
     def update_cart_item(self, cart_item_id: int, customer_id: int, quantity: int):
         """Cập nhật số lượng trong giỏ hàng, kiểm tra tồn kho"""
+        if self.store is not None:
+            return self._update_memory_item(cart_item_id, customer_id, quantity)
+
         cart_item = (
             self.db.query(CartItem)
             .filter(CartItem.PK_CartItem == cart_item_id, CartItem.Customer_id == customer_id)
@@ -73,17 +259,13 @@ class CartService:
             logger.error(f"CartItem ID {cart_item_id} for Customer ID {customer_id} not found")
             return None
 
-        # Lấy variation từ cart_variation
-        cart_var = self.db.query(CartVariation).filter(CartVariation.CartItemID == cart_item_id).first()
-        if not cart_var:
-            return None
-        variation = self.db.query(Variation).filter(Variation.PK_Variation == cart_var.VariationID).first()
+        variation = self.db.query(Variation).filter(Variation.PK_Variation == cart_item.VariationID).first()
         if not variation:
             return None
 
         if quantity > variation.Quantity:
             from fastapi import HTTPException
-            logger.error(f"Not enough stock for variation ID {cart_var.VariationID}. Requested: {quantity}, Available: {variation.Quantity}")
+            logger.error(f"Not enough stock for variation ID {cart_item.VariationID}. Requested: {quantity}, Available: {variation.Quantity}")
             raise HTTPException(status_code=400, detail="Not enough stock")
 
         if quantity <= 0:
@@ -96,8 +278,30 @@ class CartService:
         logger.debug(f"Updated cart item {cart_item_id} to quantity {quantity} for customer {customer_id}")
         return cart_item
 
+    def _update_memory_item(self, cart_item_id: int, customer_id: int, quantity: int):
+        variation_id = self.store.resolve(self.db, customer_id, cart_item_id)
+        if variation_id is None:
+            logger.error(f"CartItem ID {cart_item_id} for Customer ID {customer_id} not found")
+            return None
+        stock = self.db.execute(select(Variation.Quantity).where(Variation.PK_Variation == variation_id)).first()
+        if not stock:
+            return None
+        if quantity > (stock.Quantity or 0):
+            from fastapi import HTTPException
+            raise HTTPException(status_code=400, detail="Not enough stock")
+
+        self.store.set_quantity(self.db, customer_id, variation_id, quantity)
+        return self._memory_item(customer_id, CartLine(cart_item_id, variation_id, max(quantity, 0)))
+
     def remove_from_cart(self, cart_item_id: int, customer_id: int):
         """Xóa sản phẩm khỏi giỏ hàng"""
+        if self.store is not None:
+            variation_id = self.store.resolve(self.db, customer_id, cart_item_id)
+            if variation_id is None:
+                return False
+            self.store.set_quantity(self.db, customer_id, variation_id, 0)
+            return True
+
         cart_item = (
             self.db.query(CartItem)
             .filter(CartItem.PK_CartItem == cart_item_id, CartItem.Customer_id == customer_id)
@@ -114,6 +318,10 @@ class CartService:
 
     def clear_cart(self, customer_id: int):
         """Xóa toàn bộ giỏ hàng"""
+        if self.store is not None:
+            self.store.clear(self.db, customer_id)
+            return True
+
         self.db.query(CartItem).filter(CartItem.Customer_id == customer_id).delete()
         self.db.commit()
         logger.debug(f"Cleared cart for customer {customer_id}")
@@ -0,0 +1,290 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.database.upsert import dialect_insert
+from app.model.cartitem_model import CartItem
+
+logger = logging.getLogger(__name__)
+
+
+class CartLine(NamedTuple):
+    cart_item_id: int  # PK_CartItem nếu đã ghi xuống DB, nếu chưa thì id tạm = -variation_id
+    variation_id: int
+    quantity: int
+
+
+class MemoryCartStore:
+    """
+    Giỏ hàng active giữ trong bộ nhớ process (CART_BACKEND=memory).
+    Thay đổi chỉ ghi vào bộ nhớ rồi được ghi xuống bảng cartitem theo chu kỳ (write-behind),
+    khi checkout và khi tắt app. Chỉ dùng khi chạy một worker (hoặc sticky session theo customer).
+    Giỏ đã ghi xuống DB và không được truy cập trong `idle_seconds` bị bỏ khỏi bộ nhớ sau mỗi lần flush nền.
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        flush_interval: float = 5,
+        idle_seconds: float = 600,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.flush_interval = flush_interval
+        self.idle_seconds = idle_seconds
+        self._session_factory = session_factory
+        self._clock = clock
+        # customer_id -> {variation_id: [pk_cartitem | None, quantity]}
+        self._carts: Dict[int, Dict[int, list]] = {}
+        self._touched: Dict[int, float] = {}  # customer_id -> lần truy cập cuối
+        self._dirty = set()
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()  # checkout phải chờ lần flush nền đang chạy ghi xong
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Đọc / ghi trong bộ nhớ
+    # ------------------------------------------------------------------
+    def _cart(self, db: Session, customer_id: int) -> Dict[int, list]:
+        with self._lock:
+            cart = self._carts.get(customer_id)
+        if cart is not None:
+            return cart
+        # Lần đầu truy cập: nạp giỏ từ DB (ngoài lock)
+        rows = db.execute(
+            select(CartItem.PK_CartItem, CartItem.VariationID, CartItem.Quantity)
+            .where(
+                CartItem.Customer_id == customer_id,
+                CartItem.Status == "active",
+                CartItem.VariationID.is_not(None),
+            )
+            .order_by(CartItem.PK_CartItem)
+        ).all()
+        with self._lock:
+            return self._carts.setdefault(customer_id, {v: [pk, q] for pk, v, q in rows})
+
+    @contextmanager
+    def _locked_cart(self, db: Session, customer_id: int):
+        """Giỏ của customer, giữ lock; nạp lại nếu giỏ vừa bị evict giữa lúc nạp và lúc lấy lock"""
+        while True:
+            cart = self._cart(db, customer_id)
+            with self._lock:
+                if self._carts.get(customer_id) is cart:
+                    self._touched[customer_id] = self._clock()
+                    yield cart
+                    return
+
+    def items(self, db: Session, customer_id: int) -> List[CartLine]:
+        with self._locked_cart(db, customer_id) as cart:
+            return [CartLine(pk or -v, v, q) for v, (pk, q) in cart.items()]
+
+    def quantities(self, db: Session, customer_id: int) -> Dict[int, int]:
+        with self._locked_cart(db, customer_id) as cart:
+            return {v: q for v, (_, q) in cart.items()}
+
+    def resolve(self, db: Session, customer_id: int, cart_item_id: int) -> Optional[int]:
+        """cart_item_id (PK thật hoặc id tạm -variation_id, kể cả sau khi đã flush) -> variation_id"""
+        with self._locked_cart(db, customer_id) as cart:
+            if cart_item_id < 0:
+                return -cart_item_id if -cart_item_id in cart else None
+            for variation_id, (pk, _) in cart.items():
+                if pk == cart_item_id:
+                    return variation_id
+        return None
+
+    def add(self, db: Session, customer_id: int, quantities: Dict[int, int]) -> List[CartLine]:
+        with self._locked_cart(db, customer_id) as cart:
+            for variation_id, quantity in quantities.items():
+                entry = cart.setdefault(variation_id, [None, 0])
+                entry[1] += quantity
+            self._dirty.add(customer_id)
+            return [CartLine(cart[v][0] or -v, v, cart[v][1]) for v in quantities]
+
+    def set_quantity(self, db: Session, customer_id: int, variation_id: int, quantity: int):
+        """Đặt số lượng; quantity <= 0 thì xóa khỏi giỏ"""
+        with self._locked_cart(db, customer_id) as cart:
+            if quantity <= 0:
+                cart.pop(variation_id, None)
+            else:
+                cart.setdefault(variation_id, [None, 0])[1] = quantity
+            self._dirty.add(customer_id)
+
+    def clear(self, db: Session, customer_id: int):
+        with self._locked_cart(db, customer_id) as cart:
+            cart.clear()
+            self._dirty.add(customer_id)
+
+    @contextmanager
+    def checking_out(self, db: Session, customer_id: int):
+        """
+        Ghi giỏ xuống cartitem rồi giữ flush lock suốt checkout: flush nền không thể ghi lại
+        các dòng cartitem vừa bị xóa. Caller gọi checked_out() trước khi ra khỏi block.
+        """
+        with self._flush_lock:
+            self._flush(db, [customer_id])
+            yield
+
+    def checked_out(self, customer_id: int, ordered: Dict[int, int]):
+        """
+        Bỏ các variation vừa được đặt hàng (dòng cartitem đã bị xóa trong transaction checkout).
+        Số lượng thêm vào giỏ trong lúc checkout vẫn được giữ lại và sẽ được ghi ở lần flush sau.
+        """
+        with self._lock:
+            cart = self._carts.get(customer_id)
+            if cart is None:
+                return
+            for variation_id, quantity in ordered.items():
+                entry = cart.get(variation_id)
+                if entry is None:
+                    continue
+                if entry[1] <= quantity:
+                    del cart[variation_id]
+                else:
+                    cart[variation_id] = [None, entry[1] - quantity]
+                # flush nào đã lấy snapshot trước đó sẽ ghi lại các dòng vừa xóa - lần flush sau sửa lại
+                self._dirty.add(customer_id)
+
+    def invalidate(self, customer_id: int):
+        """Bỏ giỏ trong bộ nhớ (không ghi xuống DB) - lần truy cập sau sẽ nạp lại từ DB"""
+        with self._lock:
+            self._carts.pop(customer_id, None)
+            self._touched.pop(customer_id, None)
+            self._dirty.discard(customer_id)
+
+    def evict_idle(self) -> int:
+        """Bỏ khỏi bộ nhớ các giỏ đã ghi xuống DB (không dirty) và không được truy cập trong idle_seconds"""
+        # giữ flush lock: giỏ mà một lần flush đang ghi (chưa commit) không còn dirty nhưng DB chưa có
+        with self._flush_lock, self._lock:
+            cutoff = self._clock() - self.idle_seconds
+            idle = [c for c in self._carts if c not in self._dirty and self._touched.get(c, cutoff) <= cutoff]
+            for customer_id in idle:
+                del self._carts[customer_id]
+                self._touched.pop(customer_id, None)
+        if idle:
+            logger.debug(f"Cart write-behind: evicted {len(idle)} idle carts")
+        return len(idle)
+
+    # ------------------------------------------------------------------
+    # Write-behind
+    # ------------------------------------------------------------------
+    def _new_session(self) -> Session:
+        if self._session_factory is None:
+            from app.database.session import SessionLocal
+
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    def _write(self, db: Session, customer_id: int, snapshot: Dict[int, int]) -> Dict[int, int]:
+        """Ghi giỏ của một customer: upsert số lượng hiện tại, xóa các dòng không còn trong giỏ"""
+        table = CartItem.__table__
+        pks = {}
+        if snapshot:
+            stmt = dialect_insert(db, table).values(
+                [
+                    {"customer_id": customer_id, "variation_id": v, "quantity": q, "status": "active"}
+                    for v, q in snapshot.items()
+                ]
+            )
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.customer_id, table.c.variation_id, table.c.status],
+                set_={"quantity": stmt.excluded.quantity},
+            ).returning(table.c.variation_id, table.c.pk_cartitem)
+            pks = dict(db.execute(stmt).all())
+        db.execute(
+            delete(CartItem)
+            .where(
+                CartItem.Customer_id == customer_id,
+                CartItem.Status == "active",
+                CartItem.VariationID.is_not(None),
+                CartItem.VariationID.notin_(list(snapshot)),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        return pks
+
+    def flush(self, db: Optional[Session] = None, customer_ids: Optional[Iterable[int]] = None) -> int:
+        """Ghi các giỏ đã thay đổi xuống DB (tất cả, hoặc chỉ `customer_ids`). Trả về số giỏ đã ghi."""
+        with self._flush_lock:
+            return self._flush(db, customer_ids)
+
+    def _flush(self, db: Optional[Session], customer_ids: Optional[Iterable[int]]) -> int:
+        with self._lock:
+            targets = self._dirty if customer_ids is None else self._dirty.intersection(customer_ids)
+            snapshots = {c: {v: q for v, (_, q) in self._carts.get(c, {}).items()} for c in targets}
+            self._dirty.difference_update(snapshots)
+        if not snapshots:
+            return 0
+
+        own_session = db is None
+        db = db or self._new_session()
+        try:
+            written = {c: self._write(db, c, snapshot) for c, snapshot in snapshots.items()}
+            db.commit()
+        except Exception:
+            db.rollback()
+            with self._lock:
+                self._dirty.update(snapshots)
+            raise
+        finally:
+            if own_session:
+                db.close()
+
+        with self._lock:
+            for customer_id, pks in written.items():
+                cart = self._carts.get(customer_id, {})
+                for variation_id, pk in pks.items():
+                    if variation_id in cart:
+                        cart[variation_id][0] = pk
+        logger.debug(f"Cart write-behind: flushed {len(snapshots)} carts")
+        return len(snapshots)
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+                self.evict_idle()
+            except Exception:
+                logger.exception("Cart write-behind flush failed, will retry")
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="cart-write-behind", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Dừng thread flush và ghi nốt các thay đổi còn lại"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+
+_cart_store: Optional[MemoryCartStore] = None
+
+
+def get_cart_store() -> Optional[MemoryCartStore]:
+    """Store đang dùng, None khi CART_BACKEND=database (mặc định)"""
+    return _cart_store
+
+
+def start_cart_store(backend: str, flush_interval: float, idle_seconds: float = 600) -> Optional[MemoryCartStore]:
+    global _cart_store
+    if backend == "memory" and _cart_store is None:
+        _cart_store = MemoryCartStore(flush_interval=flush_interval, idle_seconds=idle_seconds)
+        _cart_store.start()
+        logger.info(f"Cart backend: memory (write-behind every {flush_interval}s)")
+    return _cart_store
+
+
+def stop_cart_store():
+    global _cart_store
+    if _cart_store is not None:
+        _cart_store.stop()
+        _cart_store = None
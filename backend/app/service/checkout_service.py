@@ -0,0 +1,87 @@
+import logging
+from decimal import Decimal
+from typing import Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from app.model.cartitem_model import CartItem
+from app.model.variation_model import Variation
+from app.schema.order_schema import OrderCreate, OrderLineCreate
+from app.service.cart_store import MemoryCartStore, get_cart_store
+from app.service.order_service import OrderService
+from app.service.search_index import index_stock
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+DEFAULT_PAYMENT_METHOD_ID = 5  # Cash
+
+
+class CheckoutService:
+    """Đặt hàng từ giỏ: tạo đơn và xóa giỏ trong cùng một transaction"""
+
+    def __init__(self, db: Session, cart_store: Optional[MemoryCartStore] = None):
+        self.db = db
+        self.cart_store = cart_store if cart_store is not None else get_cart_store()
+
+    def _load_cart(self, customer_id: int):
+        """Một câu SELECT: cart item + variation + giá hiện tại"""
+        return self.db.execute(
+            select(CartItem.PK_CartItem, CartItem.Quantity, Variation.PK_Variation, Variation.Price)
+            .join(Variation, Variation.PK_Variation == CartItem.VariationID)
+            .where(CartItem.Customer_id == customer_id, CartItem.Status == "active")
+            .order_by(CartItem.PK_CartItem)
+        ).all()
+
+    def checkout(
+        self,
+        customer_id: int,
+        address_id: Optional[int] = None,
+        payment_method_id: int = DEFAULT_PAYMENT_METHOD_ID,
+        note: Optional[str] = "",
+    ):
+        if self.cart_store is None:
+            return self._checkout(customer_id, address_id, payment_method_id, note)
+        # CART_BACKEND=memory: ghi giỏ xuống cartitem trước khi đặt hàng
+        with self.cart_store.checking_out(self.db, customer_id):
+            return self._checkout(customer_id, address_id, payment_method_id, note)
+
+    def _checkout(self, customer_id: int, address_id: Optional[int], payment_method_id: int, note: Optional[str]):
+        cart = self._load_cart(customer_id)
+        if not cart:
+            raise ValueError("Cart is empty")
+
+        order_lines = []
+        for item in cart:
+            if item.Price is None:
+                raise ValueError(f"Variation {item.PK_Variation} has no price")
+            order_lines.append(
+                OrderLineCreate(VariationID=item.PK_Variation, Quantity=item.Quantity, Unit_Price=Decimal(item.Price))
+            )
+
+        order = OrderService(self.db).place_order(
+            OrderCreate(
+                CustomerID=customer_id,
+                EmployeeID=None,
+                AddressID=address_id,
+                PaymentMethodID=payment_method_id,
+                Note=note,
+                Type_Order="Online",
+                order_lines=order_lines,
+            )
+        )
+
+        # Chỉ xóa những item đã được đặt (item thêm vào giỏ trong lúc checkout vẫn được giữ lại)
+        self.db.execute(
+            delete(CartItem)
+            .where(CartItem.PK_CartItem.in_([item.PK_CartItem for item in cart]))
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+        index_stock(self.db, [item.PK_Variation for item in cart])
+        if self.cart_store is not None:
+            self.cart_store.checked_out(customer_id, {item.PK_Variation: item.Quantity for item in cart})
+        self.db.refresh(order)
+        logger.debug(f"Checkout: order {order.PK_POSOrder} with {len(order_lines)} lines for customer {customer_id}")
+        return order
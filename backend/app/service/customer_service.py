@@ -3,6 +3,7 @@ from typing import Optional
 
 from sqlalchemy.orm import Session
 
+from app.auth.account_cache import invalidate_account
 from app.model.customer_model import Customer
 from app.schema.customer_schema import CustomerCreate, CustomerUpdate
 
@@ -50,19 +51,33 @@ class CustomerService:
         self.db.add(db_customer)
         self.db.commit()
         self.db.refresh(db_customer)
+        self._invalidate_account(db_customer)
         return db_customer
 
+    @staticmethod
+    def _invalidate_account(customer: Customer):
+        """Account cache giữ customer_id của account - phải bỏ khi customer thay đổi"""
+        if customer.account is not None:
+            invalidate_account(customer.account.Username)
+
     def update_customer(self, customer_id: int, customer_data: CustomerUpdate):
         customer = self.db.query(Customer).filter(Customer.PK_Customer == customer_id).first()
         if not customer:
             return None
 
+        previous_account = customer.account if "AccountID" in customer_data.model_fields_set else None
         for key, value in customer_data.dict(exclude_unset=True).items():
             setattr(customer, key, value)
 
+        if previous_account is not None and previous_account.PK_Account != customer.AccountID:
+            # token của account cũ vẫn mang claim customer_id của customer này
+            previous_account.Token_Version = (previous_account.Token_Version or 0) + 1
         customer.Edit_date = datetime.now()
         self.db.commit()
         self.db.refresh(customer)
+        if previous_account is not None:
+            invalidate_account(previous_account.Username)
+            self._invalidate_account(customer)
         return customer
 
     def deactivate_customer(self, customer_id: int):
@@ -73,4 +88,5 @@ class CustomerService:
         customer.Edit_date = datetime.now()
         self.db.commit()
         self.db.refresh(customer)
+        self._invalidate_account(customer)
         return customer
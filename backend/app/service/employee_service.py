@@ -3,6 +3,7 @@ from typing import Optional
 
 from sqlalchemy.orm import Session
 
+from app.auth.account_cache import invalidate_account
 from app.model.account_model import Account
 from app.model.employee_model import Employee
 from app.schema.employee_schema import EmployeeCreate, EmployeeUpdate
@@ -118,8 +119,10 @@ class EmployeeService:
             return None
 
         account.Status = "INACTIVE"
+        account.Token_Version = (account.Token_Version or 0) + 1  # token cũ không dùng lại được sau khi reactivate
         employee.Edit_date = datetime.now()
         self.db.commit()
+        invalidate_account(account.Username)
         self.db.refresh(employee)
         return employee
 
@@ -136,5 +139,6 @@ class EmployeeService:
         account.Status = "ACTIVE"
         employee.Edit_date = datetime.now()
         self.db.commit()
+        invalidate_account(account.Username)
         self.db.refresh(employee)
         return employee
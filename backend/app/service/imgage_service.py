@@ -1,5 +1,6 @@
 from sqlalchemy.orm import Session
 
+from app.core.pagination import CountMode, keyset_filter, total_count
 from app.model.images_model import Images
 from app.schema.images_schema import ImagesCreate, ImagesUpdate
 import logging
@@ -8,19 +9,32 @@ logger.setLevel(logging.DEBUG)
 
 
 class ImagesService:
+    KEYSET = (Images.PK_Images,)
+
     def __init__(self, db: Session):
         self.db = db
 
-    def get_images(self, skip: int = 0, limit: int = 100, product_id: int = None, variation_id: int = None):
+    def _filtered_query(self, product_id: int = None, variation_id: int = None):
         query = self.db.query(Images)
         if product_id:
             query = query.filter(Images.ProductID == product_id)
         if variation_id:
             query = query.filter(Images.VariationID == variation_id)
-        for idx, img in enumerate(query.all(), 1):
-            logger.info(f"[{idx}] Image ID:{img.PK_Images} ProductID:{img.ProductID} VariationID:{img.VariationID} Default:{img.Set_Default} SRC:{img.Id_Image}")
-        return query.offset(skip).limit(limit).all()
-        
+        return query
+
+    def get_images(self, skip: int = 0, limit: int = 100, product_id: int = None, variation_id: int = None,
+                   cursor: str = None):
+        query = self._filtered_query(product_id, variation_id).order_by(Images.PK_Images)
+        if cursor:
+            query = query.filter(keyset_filter(self.KEYSET, cursor))
+        else:
+            query = query.offset(skip)
+        images = query.limit(limit).all()
+        logger.info(f"🖼️  {len(images)} images (skip={skip}, limit={limit})")
+        return images
+
+    def count_images(self, product_id: int = None, variation_id: int = None, mode: CountMode = "exact"):
+        return total_count(self._filtered_query(product_id, variation_id), mode)
 
     def get_image_by_id(self, image_id: int):
         return self.db.query(Images).filter(Images.PK_Images == image_id).first()
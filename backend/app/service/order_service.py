@@ -1,17 +1,36 @@
 from datetime import datetime
 from decimal import Decimal
-from typing import Optional
+from typing import Literal, Optional
 
+from sqlalchemy import case, func, insert, select, update
 from sqlalchemy.orm import Session
 
+from app.core.pagination import NullsAs, keyset_filter, keyset_order
+from app.model.address_model import Address, District, Province, Ward
 from app.model.orderline_model import OrderLine
+from app.model.paymentmethod_model import PaymentMethod
 from app.model.posorder_model import POSOrder
 from app.model.variation_model import Variation
 from app.schema.order_schema import OrderCreate, OrderUpdate
+from app.service.report_service import ReportService
+from app.service.search_index import index_stock
 import logging
 
+# Đơn hàng ở trạng thái này không được sửa nữa; trạng thái được đồng bộ xuống OrderLine khi ghi
+FINAL_STATUSES = ("CANCELLED", "COMPLETED")
+
+StatisticsBucket = Literal["day", "week"]
+
+
+def _format_shipping_address(street, ward, district, province):
+    address_parts = [part for part in (street, ward, district, province) if part]
+    return ", ".join(address_parts)
+
 
 class OrderService:
+    # Thứ tự danh sách đơn hàng (mới nhất trước) - dùng cho keyset pagination; đơn không có ngày tạo đứng cuối
+    KEYSET = (NullsAs(POSOrder.Creation_date, datetime(1970, 1, 1)), POSOrder.PK_POSOrder)
+
     def __init__(self, db: Session):
         self.db = db
 
@@ -23,6 +42,7 @@ class OrderService:
         customer_id: Optional[int] = None,
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None,
+        cursor: Optional[str] = None,
     ):
         query = self.db.query(POSOrder)
 
@@ -34,57 +54,145 @@ class OrderService:
             query = query.filter(POSOrder.Order_Date >= start_date)
         if end_date:
             query = query.filter(POSOrder.Order_Date <= end_date)
-        orders_data =  query.order_by(POSOrder.Creation_date.desc()).offset(skip).limit(limit).all()
+        query = query.order_by(*keyset_order(self.KEYSET, descending=True))
+        if cursor:
+            query = query.filter(keyset_filter(self.KEYSET, cursor, descending=True))
+        else:
+            query = query.offset(skip)
+        orders_data = query.limit(limit).all()
         logging.info(f"Fetching orders with filters - Status:{status}, CustomerID:{customer_id}, DateRange:{start_date} to {end_date}")
         for idx, o in enumerate(orders_data,1):
             logging.info(f"[{idx}] ID:{o.PK_POSOrder} CustomerID:{o.CustomerID} Status:{o.Status} Total:{o.Total_Amount:,.0f}đ")
         return orders_data
 
-    def get_order_by_id(self, order_id: int):
-        order = self.db.query(POSOrder).filter(POSOrder.PK_POSOrder == order_id).first()
-        if not order:
+    def _orders_with_address_query(self):
+        """POSOrder kèm các phần của địa chỉ giao hàng trong một câu SELECT (LEFT JOIN)"""
+        return (
+            self.db.query(
+                POSOrder,
+                Address.PK_Address,
+                Address.StreetAddress,
+                Ward.Name.label("ward_name"),
+                District.Name.label("district_name"),
+                Province.Name.label("province_name"),
+            )
+            .outerjoin(Address, Address.PK_Address == POSOrder.AddressID)
+            .outerjoin(Ward, Ward.PK_Ward == Address.WardID)
+            .outerjoin(District, District.PK_District == Address.DistrictID)
+            .outerjoin(Province, Province.PK_Province == Address.ProvinceID)
+        )
+
+    @staticmethod
+    def _attach_shipping_address(row):
+        order, address_id, street, ward, district, province = row
+        order.ShippingAddress = (
+            _format_shipping_address(street, ward, district, province) if address_id else None
+        )
+        return order
+
+    def get_customer_orders(
+        self,
+        customer_id: int,
+        skip: int = 0,
+        limit: int = 50,
+        status: Optional[str] = None,
+        cursor: Optional[str] = None,
+    ):
+        """Danh sách đơn hàng của khách kèm ShippingAddress - một câu SELECT cho cả trang"""
+        query = self._orders_with_address_query().filter(POSOrder.CustomerID == customer_id)
+        if status:
+            query = query.filter(POSOrder.Status == status)
+
+        query = query.order_by(*keyset_order(self.KEYSET, descending=True))
+        if cursor:
+            query = query.filter(keyset_filter(self.KEYSET, cursor, descending=True))
+        else:
+            query = query.offset(skip)
+        return [self._attach_shipping_address(row) for row in query.limit(limit).all()]
+
+    def get_order_by_id(self, order_id: int, customer_id: Optional[int] = None):
+        """Chỉ đọc (không ghi/commit) - trạng thái OrderLine được đồng bộ trong update_order/cancel_order"""
+        query = self._orders_with_address_query().filter(POSOrder.PK_POSOrder == order_id)
+        if customer_id is not None:
+            query = query.filter(POSOrder.CustomerID == customer_id)
+        row = query.first()
+        if not row:
             return None
+        return self._attach_shipping_address(row)
 
-        # Add shipping address if exists
-        shipping_address = None
-        if order.AddressID:
-            from app.model.address_model import Address, District, Province, Ward
-            address = self.db.query(Address).filter(Address.PK_Address == order.AddressID).first()
-            if address:
-                province = self.db.query(Province).filter(Province.PK_Province == address.ProvinceID).first()
-                district = self.db.query(District).filter(District.PK_District == address.DistrictID).first()
-                ward = self.db.query(Ward).filter(Ward.PK_Ward == address.WardID).first() 
-
-                address_parts = []
-                if address.StreetAddress:
-                    address_parts.append(address.StreetAddress)
-                if ward:
-                    address_parts.append(ward.Name)
-                if district:
-                    address_parts.append(district.Name)
-                if province:
-                    address_parts.append(province.Name)
-
-                shipping_address = ", ".join(address_parts)
+    def _sync_order_line_status(self, order_id: int, status: str):
+        """Đồng bộ trạng thái tất cả OrderLine của đơn bằng một câu UPDATE"""
+        self.db.execute(
+            update(OrderLine)
+            .where(OrderLine.OrderID == order_id, func.coalesce(func.upper(OrderLine.Status), "") != status)
+            .values(Status=status)
+            .execution_options(synchronize_session=False)
+        )
 
-        # Sync order line status if order is cancelled or completed
-        if order.Status and order.Status.upper() in ["CANCELLED", "COMPLETED"]:
-            order_lines = self.db.query(OrderLine).filter(OrderLine.OrderID == order_id).all()
-            for line in order_lines:
-                if line.Status.upper() != order.Status.upper():
-                    line.Status = order.Status.upper()
-            self.db.commit()
-
-        # Add shipping address to order object
-        order.ShippingAddress = shipping_address
-        return order
+    def _reserve_stock(self, order_lines) -> dict:
+        """
+        Trừ tồn kho cho cả đơn bằng một câu UPDATE có điều kiện (quantity >= số lượng đặt).
+        Trả về variation_id -> (categoryid, brandid) để chụp vào orderline cho sales_daily_rollup.
+        """
+        requested = {}
+        for line in order_lines:
+            requested[line.VariationID] = requested.get(line.VariationID, 0) + line.Quantity
+        if not requested:
+            return {}
+
+        # Một câu SELECT ... IN để kiểm tra variation tồn tại / đủ hàng; FOR UPDATE theo thứ tự PK để tránh deadlock
+        rows = self.db.execute(
+            select(Variation.PK_Variation, Variation.Quantity, *ReportService.variation_group_columns())
+            .where(Variation.PK_Variation.in_(requested))
+            .order_by(Variation.PK_Variation)
+            .with_for_update()
+        ).all()
+        stock = {variation_id: quantity for variation_id, quantity, _, _ in rows}
+        for variation_id in sorted(requested):
+            if variation_id not in stock:
+                self.db.rollback()
+                raise ValueError(f"Variation {variation_id} not found")
+            if (stock[variation_id] or 0) < requested[variation_id]:
+                self.db.rollback()
+                raise ValueError(
+                    f"Variation {variation_id} has insufficient stock (requested {requested[variation_id]})"
+                )
+
+        quantity = case(requested, value=Variation.PK_Variation)
+        reserved = self.db.execute(
+            update(Variation)
+            .where(Variation.PK_Variation.in_(requested), Variation.Quantity >= quantity)
+            .values(Quantity=Variation.Quantity - quantity, Sold=func.coalesce(Variation.Sold, 0) + quantity)
+            .execution_options(synchronize_session=False)
+        )
+        # Vẫn giữ điều kiện quantity >= x: DB không hỗ trợ FOR UPDATE (SQLite) có thể bị đơn khác chen vào
+        if reserved.rowcount != len(requested):
+            self.db.rollback()
+            raise ValueError("Insufficient stock for one or more variations")
+        return {variation_id: (category, brand) for variation_id, _, category, brand in rows}
 
     def create_order(self, order_data: OrderCreate):
+        db_order = self.place_order(order_data)
+        self.db.commit()
+        index_stock(self.db, [line.VariationID for line in order_data.order_lines])
+        self.db.refresh(db_order)
+        return db_order
+
+    def place_order(self, order_data: OrderCreate):
+        """Tạo đơn, trừ tồn kho và cập nhật rollup nhưng không commit (để gộp vào transaction của caller)"""
+        for line in order_data.order_lines:
+            if line.Quantity <= 0:
+                raise ValueError(f"Invalid quantity {line.Quantity} for variation {line.VariationID}")
+
+        # Reserve stock trước: nếu một dòng không đủ hàng thì cả đơn bị rollback
+        groups = self._reserve_stock(order_data.order_lines)
+
         # Calculate totals
         total_amount = Decimal(0)
         for line in order_data.order_lines:
             total_amount += line.Unit_Price * line.Quantity
 
+        now = datetime.now()
         # Create order
         db_order = POSOrder(
             CustomerID=order_data.CustomerID,
@@ -96,71 +204,105 @@ class OrderService:
             Total_Amount=total_amount,
             Total_Payment=total_amount,
             Status="pending",
-            Creation_date=datetime.now(),
-            Order_Date=datetime.now(),
+            Creation_date=now,
+            Order_Date=now,
         )
         self.db.add(db_order)
         self.db.flush()  # Get order ID
 
-        # Create order lines
-        for line_data in order_data.order_lines:
-            line_total = line_data.Unit_Price * line_data.Quantity
-            order_line = OrderLine(
-                OrderID=db_order.PK_POSOrder,
-                VariationID=line_data.VariationID,
-                Quantity=line_data.Quantity,
-                Unit_Price=line_data.Unit_Price,
-                Price=line_total,
-                Status="pending",
-                Creation_date=datetime.now(),
-            )
-            self.db.add(order_line)
-
-            # Update variation quantity
-            variation = self.db.query(Variation).filter(Variation.PK_Variation == line_data.VariationID).first()
-            if variation:
-                variation.Quantity -= line_data.Quantity
-                variation.Sold += line_data.Quantity
+        # Create order lines - một lệnh INSERT executemany (insertmanyvalues) cho tất cả các dòng
+        self.db.execute(
+            insert(OrderLine),
+            [
+                {
+                    "OrderID": db_order.PK_POSOrder,
+                    "VariationID": line_data.VariationID,
+                    "Quantity": line_data.Quantity,
+                    "Unit_Price": line_data.Unit_Price,
+                    "Price": line_data.Unit_Price * line_data.Quantity,
+                    "Status": "pending",
+                    "CategoryID": groups[line_data.VariationID][0],
+                    "BrandID": groups[line_data.VariationID][1],
+                    "Creation_date": now,
+                }
+                for line_data in order_data.order_lines
+            ],
+        )
 
-        self.db.commit()
-        self.db.refresh(db_order)
+        # Cập nhật sales_daily_rollup trong cùng transaction
+        ReportService(self.db).record_order(db_order.PK_POSOrder, db_order.Order_Date, db_order.Status)
         return db_order
 
     def update_order(self, order_id: int, order_data: OrderUpdate):
-        order = self.db.query(POSOrder).filter(POSOrder.PK_POSOrder == order_id).first()
+        order = self.db.query(POSOrder).filter(POSOrder.PK_POSOrder == order_id).with_for_update().first()
         if not order:
             return None
 
         # Prevent any updates if order is cancelled or completed
-        if order.Status and order.Status.upper() in ["CANCELLED", "COMPLETED"]:
+        if order.Status and order.Status.upper() in FINAL_STATUSES:
             raise ValueError(f"Cannot update order with status '{order.Status}'. Order is already finalized.")
 
+        old_status, old_date = order.Status, order.Order_Date or order.Creation_date
         for key, value in order_data.dict(exclude_unset=True).items():
             setattr(order, key, value)
 
+        reports = ReportService(self.db)
+        new_date = order.Order_Date or order.Creation_date
+        if new_date != old_date:
+            reports.record_order(order_id, old_date, old_status, sign=-1)
+            reports.record_order(order_id, new_date, order.Status)
+        else:
+            reports.move_order(order_id, old_date, old_status, order.Status)
+
+        # Sync order line status if order is cancelled or completed
+        if order.Status and order.Status.upper() in FINAL_STATUSES:
+            self._sync_order_line_status(order_id, order.Status.upper())
+
         self.db.commit()
         self.db.refresh(order)
         return order
 
     def cancel_order(self, order_id: int):
         """Cancel order and restore inventory"""
-        order = self.db.query(POSOrder).filter(POSOrder.PK_POSOrder == order_id).first()
-        if not order or order.Status.upper() in ["CANCELLED", "COMPLETED"]:
+        current = self.db.execute(
+            select(POSOrder.Status, func.coalesce(POSOrder.Order_Date, POSOrder.Creation_date).label("order_date"))
+            .where(POSOrder.PK_POSOrder == order_id)
+            .with_for_update()
+        ).first()
+        if not current:
             return None
 
-        # Restore inventory
-        order_lines = self.db.query(OrderLine).filter(OrderLine.OrderID == order_id).all()
-        for line in order_lines:
-            if line.VariationID:
-                variation = self.db.query(Variation).filter(Variation.PK_Variation == line.VariationID).first()
-                if variation:
-                    variation.Quantity += line.Quantity
-                    variation.Sold -= line.Quantity
-            line.Status = "CANCELLED"
-        order.Status = "CANCELLED"
+        # UPDATE có điều kiện: chỉ một request hủy thắng khi có nhiều request hủy đồng thời
+        cancelled = self.db.execute(
+            update(POSOrder)
+            .where(
+                POSOrder.PK_POSOrder == order_id,
+                func.upper(POSOrder.Status).notin_(FINAL_STATUSES),
+            )
+            .values(Status="CANCELLED")
+            .execution_options(synchronize_session=False)
+        )
+        if cancelled.rowcount == 0:
+            self.db.rollback()
+            return None
+
+        # Restore inventory - một câu UPDATE cho tất cả variation trong đơn
+        returned = (
+            select(func.sum(OrderLine.Quantity))
+            .where(OrderLine.OrderID == order_id, OrderLine.VariationID == Variation.PK_Variation)
+            .scalar_subquery()
+        )
+        self.db.execute(
+            update(Variation)
+            .where(Variation.PK_Variation.in_(select(OrderLine.VariationID).where(OrderLine.OrderID == order_id)))
+            .values(Quantity=Variation.Quantity + returned, Sold=func.coalesce(Variation.Sold, 0) - returned)
+            .execution_options(synchronize_session=False)
+        )
+        self._sync_order_line_status(order_id, "CANCELLED")
+        ReportService(self.db).move_order(order_id, current.order_date, current.Status, "CANCELLED")
         self.db.commit()
-        self.db.refresh(order)
-        return order
+        index_stock(self.db, select(OrderLine.VariationID).where(OrderLine.OrderID == order_id))
+        return self.db.query(POSOrder).filter(POSOrder.PK_POSOrder == order_id).first()
 
     def get_order_lines(self, order_id: int):
         order_lines = self.db.query(OrderLine).filter(OrderLine.OrderID == order_id).all()
@@ -186,24 +328,80 @@ class OrderService:
             result.append(line_dict)
         return result
 
-    def get_order_statistics(self, start_date: datetime = None, end_date: datetime = None):
-        """Get order statistics for reporting"""
-        query = self.db.query(POSOrder)
-
+    def _filter_order_date(self, query, start_date: Optional[datetime], end_date: Optional[datetime]):
         if start_date:
             query = query.filter(POSOrder.Order_Date >= start_date)
         if end_date:
             query = query.filter(POSOrder.Order_Date <= end_date)
+        return query
 
-        orders = query.all()
+    def _bucket_expr(self, granularity: str):
+        """Biểu thức nhóm Order_Date theo ngày/tuần (tuần bắt đầu từ thứ Hai)"""
+        if self.db.get_bind().dialect.name == "postgresql":
+            return func.date_trunc(granularity, POSOrder.Order_Date)
+        if granularity == "week":
+            return func.date(POSOrder.Order_Date, "weekday 0", "-6 days")
+        return func.date(POSOrder.Order_Date)
 
-        total_orders = len(orders)
-        total_revenue = sum(order.Total_Amount for order in orders if order.Status != "CANCELLED")
-        completed_orders = len([o for o in orders if o.Status == "COMPLETED"])
+    @staticmethod
+    def _bucket_label(value) -> Optional[str]:
+        if value is None:
+            return None
+        if isinstance(value, datetime):
+            value = value.date()
+        return value.isoformat() if hasattr(value, "isoformat") else str(value)
 
-        return {
+    def get_order_statistics(
+        self,
+        start_date: datetime = None,
+        end_date: datetime = None,
+        group_by: Optional[StatisticsBucket] = None,
+    ):
+        """Get order statistics for reporting - tính toàn bộ bằng GROUP BY trong SQL"""
+        order_count = func.count(POSOrder.PK_POSOrder)
+        revenue = func.coalesce(
+            func.sum(case((func.coalesce(POSOrder.Status, "") != "CANCELLED", POSOrder.Total_Amount), else_=0)), 0
+        )
+
+        by_status = {}
+        status_rows = self._filter_order_date(
+            self.db.query(POSOrder.Status, order_count, revenue), start_date, end_date
+        ).group_by(POSOrder.Status)
+        for status, count, amount in status_rows:
+            by_status[status] = {"orders": count, "revenue": float(amount)}
+
+        total_orders = sum(item["orders"] for item in by_status.values())
+        completed_orders = by_status.get("COMPLETED", {}).get("orders", 0)
+
+        payment_rows = self._filter_order_date(
+            self.db.query(POSOrder.PaymentMethodID, PaymentMethod.Type, order_count, revenue).outerjoin(
+                PaymentMethod, PaymentMethod.PK_PaymentMethod == POSOrder.PaymentMethodID
+            ),
+            start_date,
+            end_date,
+        ).group_by(POSOrder.PaymentMethodID, PaymentMethod.Type)
+        by_payment_method = [
+            {"payment_method_id": method_id, "type": method_type, "orders": count, "revenue": float(amount)}
+            for method_id, method_type, count, amount in payment_rows
+        ]
+
+        result = {
             "total_orders": total_orders,
-            "total_revenue": float(total_revenue),
+            "total_revenue": float(sum(item["revenue"] for item in by_status.values())),
             "completed_orders": completed_orders,
             "cancelled_orders": total_orders - completed_orders,
+            "by_status": by_status,
+            "by_payment_method": by_payment_method,
         }
+
+        if group_by:
+            bucket = self._bucket_expr(group_by).label("bucket")
+            bucket_rows = self._filter_order_date(
+                self.db.query(bucket, order_count, revenue), start_date, end_date
+            ).group_by(bucket).order_by(bucket)
+            result["buckets"] = [
+                {"bucket": self._bucket_label(value), "orders": count, "revenue": float(amount)}
+                for value, count, amount in bucket_rows
+            ]
+
+        return result
@@ -2,19 +2,22 @@ from typing import Optional
 
 from sqlalchemy.orm import Session
 
+from app.core.pagination import CountMode, keyset_filter, total_count
 from app.model.product_model import Product
 from app.schema.product_schema import ProductCreate
+from app.service.search_index import index_product, unindex_product
 import logging
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
 class ProductService:
+    KEYSET = (Product.PK_Product,)
+
     def __init__(self, db: Session):
         self.db = db
 
-    # ✅ Lấy danh sách sản phẩm (có phân trang và bộ lọc)
-    def get_products(self, skip: int = 0, limit: int = 10, name: Optional[str] = None,
-                    category_id: Optional[int] = None, brand_id: Optional[int] = None):
+    def _filtered_query(self, name: Optional[str] = None, category_id: Optional[int] = None,
+                        brand_id: Optional[int] = None):
         query = self.db.query(Product)
 
         # Apply filters
@@ -24,9 +27,25 @@ class ProductService:
             query = query.filter(Product.CategoryID == category_id)
         if brand_id:
             query = query.filter(Product.BrandID == brand_id)
-        for idx, p in enumerate(query.all(), 1):
-            logger.info(f"[{idx}] ID:{p.PK_Product} {p.Name}")
-        return query.offset(skip).limit(limit).all()
+        return query
+
+    # ✅ Lấy danh sách sản phẩm (có phân trang và bộ lọc) - chỉ một câu SELECT cho trang hiện tại
+    def get_products(self, skip: int = 0, limit: int = 10, name: Optional[str] = None,
+                    category_id: Optional[int] = None, brand_id: Optional[int] = None,
+                    cursor: Optional[str] = None):
+        query = self._filtered_query(name, category_id, brand_id).order_by(Product.PK_Product)
+        if cursor:
+            query = query.filter(keyset_filter(self.KEYSET, cursor))
+        else:
+            query = query.offset(skip)
+        products = query.limit(limit).all()
+        logger.info(f"📦 {len(products)} products (skip={skip}, limit={limit})")
+        return products
+
+    # ✅ Đếm tổng số sản phẩm theo cùng bộ lọc (dùng cho header X-Total-Count)
+    def count_products(self, name: Optional[str] = None, category_id: Optional[int] = None,
+                       brand_id: Optional[int] = None, mode: CountMode = "exact"):
+        return total_count(self._filtered_query(name, category_id, brand_id), mode)
 
     # ✅ Lấy chi tiết sản phẩm
     def get_product_by_id(self, product_id: int):
@@ -43,6 +62,7 @@ class ProductService:
         self.db.add(db_product)
         self.db.commit()
         self.db.refresh(db_product)
+        index_product(db_product)
         return db_product
 
     # ✅ Cập nhật sản phẩm
@@ -55,6 +75,7 @@ class ProductService:
             setattr(product, key, value)
         self.db.commit()
         self.db.refresh(product)
+        index_product(product)
         return product
 
     # ✅ Xóa sản phẩm
@@ -65,4 +86,5 @@ class ProductService:
 
         self.db.delete(product)
         self.db.commit()
+        unindex_product(product_id)
         return product
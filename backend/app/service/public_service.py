@@ -1,20 +1,151 @@
 from typing import Optional
 
+from sqlalchemy import false, func, literal_column, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 import logging
 
+from app.core.pagination import keyset_filter
+from app.core.text import escape_like, fold, words
+from app.database.fulltext import variation_search
 from app.model.brand_model import Brand
 from app.model.category_model import Category
 from app.model.product_model import Product
 from app.model.variation_model import Variation
+from app.service.search_index import PUBLIC_FIELDS
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
+VARIATION_KEYSET = (Variation.PK_Variation,)
+
+
+def _folded(col):
+    return func.f_unaccent(func.lower(col))
+
+
+def _apply_search(stmt, search: str, search_backend: str = "like", dialect: Optional[str] = None):
+    """
+    Lọc theo từ khóa trên tên variation / product.
+    Trả về (stmt, biểu thức ORDER BY theo độ liên quan hoặc None nếu backend không xếp hạng).
+    """
+    if search_backend == "fulltext" and dialect == "postgresql":
+        # Mỗi bảng một subquery để Postgres dùng được GIN index trigram của từng bảng (OR qua JOIN thì không)
+        pattern = f"%{escape_like(fold(search))}%"
+        matched_variation = select(Variation.PK_Variation).where(
+            _folded(Variation.Name).like(pattern, escape="\\")
+        ).correlate(None)
+        matched_product = select(Product.PK_Product).where(
+            _folded(Product.Name).like(pattern, escape="\\")
+        ).correlate(None)
+        stmt = stmt.where(Variation.PK_Variation.in_(matched_variation) | Variation.ProductID.in_(matched_product))
+        relevance = func.greatest(
+            func.word_similarity(fold(search), _folded(Variation.Name)),
+            func.word_similarity(fold(search), _folded(Product.Name)),
+        )
+        return stmt, relevance.desc()
+    if search_backend == "fulltext" and dialect == "sqlite":
+        terms = words(search)
+        if not terms:
+            return stmt.where(false()), None
+        query = " ".join(f'"{term}"*' for term in terms)  # mọi từ, khớp theo tiền tố
+        stmt = stmt.join(variation_search, variation_search.c.rowid == Variation.PK_Variation).where(
+            literal_column("variation_search").op("MATCH")(query)
+        )
+        return stmt, variation_search.c.rank  # bm25, nhỏ hơn = liên quan hơn
+    return stmt.where((Variation.Name.ilike(f"%{search}%")) | (Product.Name.ilike(f"%{search}%"))), None
+
+
+# Các câu truy vấn dùng chung cho PublicProductService (sync) và AsyncPublicProductService.
+# Lấy kèm Product.CategoryID trong cùng một câu SELECT thay vì lazy-load variation.product từng dòng.
+def _variations_stmt(
+    category_id: Optional[int] = None,
+    brand_id: Optional[int] = None,
+    search: Optional[str] = None,
+    search_backend: str = "like",
+    dialect: Optional[str] = None,
+):
+    stmt = (
+        select(Variation, Product.CategoryID)
+        .join(Product)
+        .where(
+            Variation.Quantity > 0  # Chỉ hiện có hàng
+        )
+    )
+
+    if category_id:
+        stmt = stmt.where(Product.CategoryID == category_id)
+    if brand_id:
+        stmt = stmt.where(Product.BrandID == brand_id)
+    if search:
+        stmt, _ = _apply_search(stmt, search, search_backend, dialect)
+    return stmt
+
+
+def _variations_page_stmt(
+    skip: int,
+    limit: int,
+    category_id: Optional[int] = None,
+    brand_id: Optional[int] = None,
+    search: Optional[str] = None,
+    cursor: Optional[str] = None,
+    search_backend: str = "like",
+    dialect: Optional[str] = None,
+):
+    # giữ thứ tự theo PK (không xếp theo độ liên quan) để phân trang bằng cursor
+    stmt = _variations_stmt(category_id, brand_id, search, search_backend, dialect).order_by(Variation.PK_Variation)
+    if cursor:
+        stmt = stmt.where(keyset_filter(VARIATION_KEYSET, cursor))
+    else:
+        stmt = stmt.offset(skip)
+    return stmt.limit(limit)
+
+
+def _search_stmt(
+    keyword: str,
+    skip: int,
+    limit: int,
+    category_id: Optional[int] = None,
+    brand_id: Optional[int] = None,
+    search_backend: str = "like",
+    dialect: Optional[str] = None,
+):
+    stmt, relevance = _apply_search(_variations_stmt(category_id, brand_id), keyword, search_backend, dialect)
+    if relevance is not None:
+        stmt = stmt.order_by(relevance, Variation.PK_Variation)
+    return stmt.offset(skip).limit(limit)
+
+
+def _featured_stmt(limit: int):
+    return (
+        select(Variation, Product.CategoryID)
+        .outerjoin(Product)
+        .where(Variation.Quantity > 0)
+        .order_by(Variation.Sold.desc())
+        .limit(limit)
+    )
+
+
+def _with_category(rows):
+    """Populate CategoryID from Product"""
+    variations = []
+    for variation, category_id in rows:
+        variation.CategoryID = category_id
+        variations.append(variation)
+    return variations
+
+
+def _log_variations(variations):
+    logger.info(f"🛍️  {len(variations)} variations (public)")
+    for idx, v in enumerate(variations, 1):
+        logger.info(f"[{idx}] ID:{v.PK_Variation} {v.Name} - {v.Price:,.0f}đ - Stock:{v.Quantity}")
+
 
 class PublicProductService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, search_backend: str = "like"):
         self.db = db
+        self.search_backend = search_backend  # like | fulltext (cần chạy add_fulltext_search.py) | memory
+        self.dialect = db.get_bind().dialect.name
 
     def get_variations(
         self,
@@ -23,35 +154,14 @@ class PublicProductService:
         category_id: Optional[int] = None,
         brand_id: Optional[int] = None,
         search: Optional[str] = None,
+        cursor: Optional[str] = None,
     ):
         """Lấy danh sách biến thể sản phẩm (cho user xem)"""
-        query = (
-            self.db.query(Variation)
-            .join(Product)
-            .filter(
-                Variation.Quantity > 0  # Chỉ hiện có hàng
-            )
+        stmt = _variations_page_stmt(
+            skip, limit, category_id, brand_id, search, cursor, self.search_backend, self.dialect
         )
-
-        if category_id:
-            query = query.filter(Product.CategoryID == category_id)
-        if brand_id:
-            query = query.filter(Product.BrandID == brand_id)
-        if search:
-            query = query.filter((Variation.Name.ilike(f"%{search}%")) | (Product.Name.ilike(f"%{search}%")))
-
-        variations = query.offset(skip).limit(limit).all()
-
-        # Log
-        logger.info(f"🛍️  {len(variations)} variations (public)")
-        for idx, v in enumerate(variations, 1):
-            logger.info(f"[{idx}] ID:{v.PK_Variation} {v.Name} - {v.Price:,.0f}đ - Stock:{v.Quantity}")
-
-        # Populate CategoryID from Product
-        for variation in variations:
-            if variation.product:
-                variation.CategoryID = variation.product.CategoryID
-
+        variations = _with_category(self.db.execute(stmt).all())
+        _log_variations(variations)
         return variations
 
     def get_products(
@@ -94,35 +204,70 @@ class PublicProductService:
         """Lấy danh sách thương hiệu"""
         return self.db.query(Brand).all()
 
-    def search_variations(self, keyword: str, skip: int = 0, limit: int = 20):
-        """Tìm kiếm biến thể sản phẩm"""
-        variations = (
-            self.db.query(Variation)
-            .join(Product)
-            .filter(
-                (Variation.Name.ilike(f"%{keyword}%")) | (Product.Name.ilike(f"%{keyword}%")), Variation.Quantity > 0
-            )
-            .offset(skip)
-            .limit(limit)
-            .all()
-        )
-
-        # Populate CategoryID from Product
-        for variation in variations:
-            if variation.product:
-                variation.CategoryID = variation.product.CategoryID
-
-        return variations
+    def search_variations(
+        self,
+        keyword: str,
+        skip: int = 0,
+        limit: int = 20,
+        category_id: Optional[int] = None,
+        brand_id: Optional[int] = None,
+    ):
+        """Tìm kiếm biến thể sản phẩm (fulltext: sắp xếp theo độ liên quan)"""
+        stmt = _search_stmt(keyword, skip, limit, category_id, brand_id, self.search_backend, self.dialect)
+        return _with_category(self.db.execute(stmt).all())
 
     def get_featured_variations(self, limit: int = 10):
         """Lấy biến thể sản phẩm nổi bật (bán chạy)"""
-        variations = (
-            self.db.query(Variation).filter(Variation.Quantity > 0).order_by(Variation.Sold.desc()).limit(limit).all()
-        )
+        return _with_category(self.db.execute(_featured_stmt(limit)).all())
+
+    def iter_search_rows(self, batch_size: int = 10000):
+        """Mọi variation (kể cả hết hàng) kèm tên / danh mục / thương hiệu của product, đọc theo lô (cho SearchIndex)"""
+        stmt = select(
+            *(getattr(Variation, field) for field in PUBLIC_FIELDS),
+            Product.Name.label("ProductName"),
+            Product.CategoryID,
+            Product.BrandID,
+        ).outerjoin(Product)
+        return self.db.execute(stmt.execution_options(yield_per=batch_size))
+
 
-        # Populate CategoryID from Product
-        for variation in variations:
-            if variation.product:
-                variation.CategoryID = variation.product.CategoryID
+class AsyncPublicProductService:
+    """Phiên bản async của các API catalog đọc nhiều (/products/, /products/search, /products/featured)"""
 
+    def __init__(self, db: AsyncSession, search_backend: str = "like"):
+        self.db = db
+        self.search_backend = search_backend
+        self.dialect = db.get_bind().dialect.name
+
+    async def get_variations(
+        self,
+        skip: int = 0,
+        limit: int = 20,
+        category_id: Optional[int] = None,
+        brand_id: Optional[int] = None,
+        search: Optional[str] = None,
+        cursor: Optional[str] = None,
+    ):
+        """Lấy danh sách biến thể sản phẩm (cho user xem)"""
+        stmt = _variations_page_stmt(
+            skip, limit, category_id, brand_id, search, cursor, self.search_backend, self.dialect
+        )
+        variations = _with_category((await self.db.execute(stmt)).all())
+        _log_variations(variations)
         return variations
+
+    async def search_variations(
+        self,
+        keyword: str,
+        skip: int = 0,
+        limit: int = 20,
+        category_id: Optional[int] = None,
+        brand_id: Optional[int] = None,
+    ):
+        """Tìm kiếm biến thể sản phẩm (fulltext: sắp xếp theo độ liên quan)"""
+        stmt = _search_stmt(keyword, skip, limit, category_id, brand_id, self.search_backend, self.dialect)
+        return _with_category((await self.db.execute(stmt)).all())
+
+    async def get_featured_variations(self, limit: int = 10):
+        """Lấy biến thể sản phẩm nổi bật (bán chạy)"""
+        return _with_category((await self.db.execute(_featured_stmt(limit))).all())
@@ -0,0 +1,198 @@
+import logging
+from datetime import date, datetime
+from typing import Optional
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from app.database.upsert import dialect_insert
+from app.model.brand_model import Brand
+from app.model.category_model import Category
+from app.model.orderline_model import OrderLine
+from app.model.posorder_model import POSOrder
+from app.model.product_model import Product
+from app.model.sales_rollup_model import SalesDailyRollup
+from app.model.variation_model import Variation
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_KEY = ("sale_date", "categoryid", "brandid", "status")
+ROLLUP_MEASURES = ("order_count", "line_count", "quantity", "revenue")
+
+
+def _normalize_status(status: Optional[str]) -> str:
+    return (status or "").upper()
+
+
+def _to_date(value) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, str):
+        return date.fromisoformat(value[:10])
+    return value
+
+
+class ReportService:
+    """Bảng tổng hợp sales_daily_rollup: cập nhật tăng dần khi tạo/hủy/sửa đơn và phục vụ /admin/reports/*"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    # ------------------------------------------------------------------
+    # Ghi: gọi trong cùng transaction với OrderService (không commit)
+    # ------------------------------------------------------------------
+    @staticmethod
+    def variation_group_columns():
+        """(categoryid, brandid) hiện tại của một Variation - được chụp vào orderline khi tạo đơn"""
+        product = Product.PK_Product == Variation.ProductID
+        return (
+            func.coalesce(select(Product.CategoryID).where(product).scalar_subquery(), 0),
+            func.coalesce(select(Product.BrandID).where(product).scalar_subquery(), 0),
+        )
+
+    def _line_groups_stmt(self):
+        # Dùng nhóm đã chụp trên orderline: đổi danh mục / xóa sản phẩm sau khi đặt không làm lệch phép trừ lúc hủy.
+        # Dòng tạo trước khi có snapshot mới lấy theo product hiện tại.
+        category = func.coalesce(OrderLine.CategoryID, Product.CategoryID, 0)
+        brand = func.coalesce(OrderLine.BrandID, Product.BrandID, 0)
+        return (
+            select(
+                category.label("categoryid"),
+                brand.label("brandid"),
+                func.count(func.distinct(OrderLine.OrderID)).label("order_count"),
+                func.count(OrderLine.PK_OrderLine).label("line_count"),
+                func.coalesce(func.sum(OrderLine.Quantity), 0).label("quantity"),
+                func.coalesce(func.sum(OrderLine.Price), 0).label("revenue"),
+            )
+            .select_from(OrderLine)
+            .outerjoin(Variation, Variation.PK_Variation == OrderLine.VariationID)
+            .outerjoin(Product, Product.PK_Product == Variation.ProductID)
+            .group_by(category, brand)
+        )
+
+    def _upsert(self, rows: list):
+        if not rows:
+            return
+        table = SalesDailyRollup.__table__
+        stmt = dialect_insert(self.db, table).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c[name] for name in ROLLUP_KEY],
+            set_={name: table.c[name] + stmt.excluded[name] for name in ROLLUP_MEASURES},
+        )
+        self.db.execute(stmt)
+
+    def record_order(self, order_id: int, order_date, status: Optional[str], sign: int = 1):
+        """Cộng (sign=1) hoặc trừ (sign=-1) các dòng của đơn vào rollup của trạng thái `status`"""
+        sale_date = _to_date(order_date)
+        if sale_date is None:
+            return  # giống rebuild(): đơn không có ngày không được tính
+        groups = self.db.execute(self._line_groups_stmt().where(OrderLine.OrderID == order_id)).all()
+        self._upsert(
+            [
+                {
+                    "sale_date": sale_date,
+                    "categoryid": group.categoryid,
+                    "brandid": group.brandid,
+                    "status": _normalize_status(status),
+                    "order_count": sign * group.order_count,
+                    "line_count": sign * group.line_count,
+                    "quantity": sign * group.quantity,
+                    "revenue": sign * group.revenue,
+                }
+                for group in groups
+            ]
+        )
+
+    def move_order(self, order_id: int, order_date, old_status: Optional[str], new_status: Optional[str]):
+        """Chuyển số liệu của đơn từ trạng thái cũ sang trạng thái mới"""
+        if _normalize_status(old_status) == _normalize_status(new_status):
+            return
+        self.record_order(order_id, order_date, old_status, sign=-1)
+        self.record_order(order_id, order_date, new_status)
+
+    # ------------------------------------------------------------------
+    # Backfill: dựng lại toàn bộ bảng từ posorder/orderline theo từng khối PK
+    # ------------------------------------------------------------------
+    def rebuild(self, chunk_size: int = 1000) -> int:
+        self.db.execute(delete(SalesDailyRollup))
+        self.db.commit()
+
+        order_date = func.coalesce(POSOrder.Order_Date, POSOrder.Creation_date)
+        sale_date = func.date(order_date)
+        status = func.upper(func.coalesce(POSOrder.Status, ""))
+        grouped = (
+            self._line_groups_stmt()
+            .add_columns(sale_date.label("sale_date"), status.label("status"))
+            .join(POSOrder, POSOrder.PK_POSOrder == OrderLine.OrderID)
+            .where(order_date.is_not(None))
+            .group_by(sale_date, status)
+        )
+
+        max_pk = self.db.execute(select(func.max(POSOrder.PK_POSOrder))).scalar() or 0
+        processed = 0
+        for start in range(0, max_pk + 1, chunk_size):
+            rows = self.db.execute(
+                grouped.where(OrderLine.OrderID >= start, OrderLine.OrderID < start + chunk_size)
+            ).mappings().all()
+            self._upsert([{**row, "sale_date": _to_date(row["sale_date"])} for row in rows])
+            self.db.commit()
+            processed = min(start + chunk_size - 1, max_pk)
+            logger.info(f"sales_daily_rollup backfill: orders up to #{processed}/{max_pk}")
+        return processed
+
+    # ------------------------------------------------------------------
+    # Đọc: báo cáo chỉ đọc từ rollup
+    # ------------------------------------------------------------------
+    def _report_filter(self, stmt, start_date: Optional[date], end_date: Optional[date], status: Optional[str]):
+        if start_date:
+            stmt = stmt.where(SalesDailyRollup.Sale_Date >= start_date)
+        if end_date:
+            stmt = stmt.where(SalesDailyRollup.Sale_Date <= end_date)
+        if status:
+            stmt = stmt.where(SalesDailyRollup.Status == _normalize_status(status))
+        else:
+            stmt = stmt.where(SalesDailyRollup.Status != "CANCELLED")
+        return stmt
+
+    @staticmethod
+    def _measures():
+        return (
+            func.sum(SalesDailyRollup.Order_Count).label("orders"),
+            func.sum(SalesDailyRollup.Quantity).label("quantity"),
+            func.sum(SalesDailyRollup.Revenue).label("revenue"),
+        )
+
+    def daily_sales(self, start_date: date = None, end_date: date = None, status: str = None):
+        """Doanh thu theo ngày (orders = số đơn theo từng danh mục/thương hiệu, có thể lớn hơn số đơn thực)"""
+        stmt = self._report_filter(
+            select(SalesDailyRollup.Sale_Date.label("date"), *self._measures()), start_date, end_date, status
+        ).group_by(SalesDailyRollup.Sale_Date).order_by(SalesDailyRollup.Sale_Date)
+        return self.db.execute(stmt).mappings().all()
+
+    def sales_by_category(self, start_date: date = None, end_date: date = None, status: str = None):
+        """Doanh thu theo danh mục (orders = số đơn có sản phẩm thuộc danh mục)"""
+        stmt = self._report_filter(
+            select(
+                SalesDailyRollup.CategoryID.label("category_id"),
+                Category.Name.label("category_name"),
+                *self._measures(),
+            ).outerjoin(Category, Category.PK_Category == SalesDailyRollup.CategoryID),
+            start_date,
+            end_date,
+            status,
+        ).group_by(SalesDailyRollup.CategoryID, Category.Name).order_by(func.sum(SalesDailyRollup.Revenue).desc())
+        return self.db.execute(stmt).mappings().all()
+
+    def sales_by_brand(self, start_date: date = None, end_date: date = None, status: str = None):
+        """Doanh thu theo thương hiệu (orders = số đơn có sản phẩm thuộc thương hiệu)"""
+        stmt = self._report_filter(
+            select(
+                SalesDailyRollup.BrandID.label("brand_id"),
+                Brand.Name.label("brand_name"),
+                *self._measures(),
+            ).outerjoin(Brand, Brand.PK_Brand == SalesDailyRollup.BrandID),
+            start_date,
+            end_date,
+            status,
+        ).group_by(SalesDailyRollup.BrandID, Brand.Name).order_by(func.sum(SalesDailyRollup.Revenue).desc())
+        return self.db.execute(stmt).mappings().all()
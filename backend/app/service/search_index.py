@@ -0,0 +1,409 @@
+import bisect
+import heapq
+import logging
+import threading
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.text import words
+from app.model.variation_model import Variation
+
+logger = logging.getLogger(__name__)
+
+# Các trường của ProductVariationPublic được giữ trong index để trả về /products/search không cần DB
+PUBLIC_FIELDS = (
+    "PK_Variation", "SKU", "Name", "Price", "Quantity", "Color", "Material", "Size", "Description", "Status",
+    "ProductID",
+)
+
+# Điểm của một từ khóa: khớp nguyên từ > khớp tiền tố > sai một ký tự; nhân với trọng số của trường
+EXACT, PREFIX, TYPO = 3, 2, 1
+MIN_TYPO_LENGTH = 4  # từ ngắn hơn không sửa lỗi chính tả (quá nhiều ứng viên)
+
+
+def _typo_indexed(term: str) -> bool:
+    # số (mã SKU, size) không sửa lỗi chính tả: vừa vô nghĩa vừa làm phình bảng deletes
+    return len(term) >= MIN_TYPO_LENGTH - 1 and term.isalpha()
+
+
+class IndexedProduct(NamedTuple):
+    Name: Optional[str]
+    CategoryID: Optional[int]
+    BrandID: Optional[int]
+
+
+def _deletions(term: str) -> set:
+    return {term[:i] + term[i + 1:] for i in range(len(term))}
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """Khoảng cách sửa (thêm / bớt / thay / đảo hai ký tự liền nhau) <= 1"""
+    if a == b:
+        return True
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) == len(b):
+        diff = [i for i in range(len(a)) if a[i] != b[i]]
+        return len(diff) == 1 or (
+            len(diff) == 2 and diff[1] == diff[0] + 1 and a[diff[0]] == b[diff[1]] and a[diff[1]] == b[diff[0]]
+        )
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    return a[i:] == b[i + 1:]
+
+
+class _IndexState:
+    """Dữ liệu của index; không thread-safe (SearchIndex giữ lock)"""
+
+    def __init__(self):
+        self.variations: Dict[int, dict] = {}
+        self.products: Dict[int, IndexedProduct] = {}
+        self.product_variations: Dict[int, set] = {}
+        self.postings: Dict[str, Dict[int, int]] = {}  # từ -> {variation_id: trọng số trường}
+        self.doc_terms: Dict[int, Dict[str, int]] = {}
+        self.terms: List[str] = []  # từ vựng cho tìm tiền tố, sắp xếp lại khi cần (_terms_sorted)
+        self._terms_sorted = True
+        self.deletes: Dict[str, set] = {}  # từ bỏ một ký tự -> các từ gốc, cho sửa lỗi chính tả
+
+    def _terms_of(self, doc: dict) -> Dict[str, int]:
+        product = self.products.get(doc["ProductID"])
+        fields = [
+            (doc.get("Name"), 2),
+            (product.Name if product else None, 2),
+            (doc.get("SKU"), 3),
+            (doc.get("Color"), 1),
+            (doc.get("Material"), 1),
+            (doc.get("Size"), 1),
+        ]
+        terms: Dict[str, int] = {}
+        for value, weight in fields:
+            for term in words(value or ""):
+                terms[term] = max(terms.get(term, 0), weight)
+        return terms
+
+    def _add_term(self, term: str):
+        self.postings[term] = {}
+        self.terms.append(term)  # insort từng từ là O(n^2) khi dựng lại toàn bộ index
+        self._terms_sorted = False
+        if _typo_indexed(term):
+            for deletion in _deletions(term):
+                self.deletes.setdefault(deletion, set()).add(term)
+
+    def _remove_term(self, term: str):
+        del self.postings[term]
+        del self.terms[bisect.bisect_left(self._sorted_terms(), term)]
+        if _typo_indexed(term):
+            for deletion in _deletions(term):
+                originals = self.deletes.get(deletion)
+                originals.discard(term)
+                if not originals:
+                    del self.deletes[deletion]
+
+    def _unindex(self, variation_id: int):
+        for term in self.doc_terms.pop(variation_id, {}):
+            posting = self.postings[term]
+            posting.pop(variation_id, None)
+            if not posting:
+                self._remove_term(term)
+
+    def _index(self, variation_id: int):
+        terms = self._terms_of(self.variations[variation_id])
+        for term, weight in terms.items():
+            if term not in self.postings:
+                self._add_term(term)
+            self.postings[term][variation_id] = weight
+        self.doc_terms[variation_id] = terms
+
+    def upsert_variation(self, doc: dict):
+        variation_id = doc["PK_Variation"]
+        old = self.variations.get(variation_id)
+        if old is not None:
+            self._unindex(variation_id)
+            self.product_variations.get(old["ProductID"], set()).discard(variation_id)
+        self.variations[variation_id] = doc
+        self.product_variations.setdefault(doc["ProductID"], set()).add(variation_id)
+        self._index(variation_id)
+
+    def remove_variation(self, variation_id: int):
+        doc = self.variations.pop(variation_id, None)
+        if doc is not None:
+            self._unindex(variation_id)
+            self.product_variations.get(doc["ProductID"], set()).discard(variation_id)
+
+    def update_stock(self, quantities: Dict[int, int]):
+        """Chỉ đổi Quantity (không đổi từ khóa): tồn kho thay đổi khi đặt / hủy đơn"""
+        for variation_id, quantity in quantities.items():
+            doc = self.variations.get(variation_id)
+            if doc is not None:
+                self.variations[variation_id] = dict(doc, Quantity=quantity)
+
+    def upsert_product(self, product_id: int, product: IndexedProduct):
+        old = self.products.get(product_id)
+        self.products[product_id] = product
+        if old is None or old.Name != product.Name:
+            for variation_id in self.product_variations.get(product_id, ()):
+                self._unindex(variation_id)
+                self._index(variation_id)
+
+    def remove_product(self, product_id: int):
+        # variation bị xóa theo (ondelete CASCADE)
+        for variation_id in list(self.product_variations.pop(product_id, ())):
+            self.remove_variation(variation_id)
+        self.products.pop(product_id, None)
+
+    def _sorted_terms(self) -> List[str]:
+        if not self._terms_sorted:
+            self.terms.sort()
+            self._terms_sorted = True
+        return self.terms
+
+    def _with_prefix(self, prefix: str):
+        terms = self._sorted_terms()
+        for position in range(bisect.bisect_left(terms, prefix), len(terms)):
+            if not terms[position].startswith(prefix):
+                break
+            yield terms[position]
+
+    def _typo_candidates(self, term: str) -> set:
+        deletions = _deletions(term)
+        candidates = set(self.deletes.get(term, ()))  # thiếu một ký tự
+        for deletion in deletions:
+            if deletion in self.postings:  # thừa một ký tự
+                candidates.add(deletion)
+            candidates.update(self.deletes.get(deletion, ()))  # sai / đảo ký tự
+        return {candidate for candidate in candidates if _within_one_edit(term, candidate)}
+
+    def match(self, term: str) -> Dict[int, int]:
+        """{variation_id: điểm} của các variation khớp `term` (nguyên từ, tiền tố, hoặc sai một ký tự)"""
+        scores: Dict[int, int] = {}
+
+        def collect(matched_term: str, score: int):
+            posting = self.postings[matched_term]
+            if not scores:
+                scores.update({variation_id: score * weight for variation_id, weight in posting.items()})
+                return
+            for variation_id, weight in posting.items():
+                if score * weight > scores.get(variation_id, 0):
+                    scores[variation_id] = score * weight
+
+        for matched_term in self._with_prefix(term):
+            collect(matched_term, EXACT if matched_term == term else PREFIX)
+        if not scores and len(term) >= MIN_TYPO_LENGTH:
+            for matched_term in self._typo_candidates(term):
+                collect(matched_term, TYPO)
+        return scores
+
+
+class SearchIndex:
+    """
+    Inverted index trong bộ nhớ process cho /products/search (SEARCH_BACKEND=memory).
+    Đánh index tên variation / product, SKU, màu, chất liệu, size sau khi bỏ dấu; mỗi từ khóa khớp nguyên từ,
+    tiền tố hoặc sai một ký tự, mọi từ khóa phải khớp. Cập nhật ngay khi ProductService / VariationService
+    thay đổi dữ liệu và khi đặt / hủy đơn (tồn kho), nạp lại toàn bộ mỗi `refresh_interval` giây
+    (thay đổi ngoài service).
+    """
+
+    def __init__(self, loader: Callable[[], Iterable[tuple]], refresh_interval: float = 300):
+        self._loader = loader  # -> (variation_doc, product_id, IndexedProduct)
+        self.refresh_interval = refresh_interval
+        self._state = _IndexState()
+        self._pending: Optional[list] = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _apply(self, op: str, *args):
+        with self._lock:
+            getattr(self._state, op)(*args)
+            if self._pending is not None:  # đang rebuild: áp dụng lại lên index mới
+                self._pending.append((op, args))
+
+    def upsert_variation(self, doc: dict):
+        self._apply("upsert_variation", doc)
+
+    def remove_variation(self, variation_id: int):
+        self._apply("remove_variation", variation_id)
+
+    def update_stock(self, quantities: Dict[int, int]):
+        self._apply("update_stock", quantities)
+
+    def upsert_product(self, product_id: int, product: IndexedProduct):
+        self._apply("upsert_product", product_id, product)
+
+    def remove_product(self, product_id: int):
+        self._apply("remove_product", product_id)
+
+    def rebuild(self) -> int:
+        """Nạp lại toàn bộ từ DB rồi thay index cũ; trả về số variation"""
+        with self._lock:
+            self._pending = []
+        try:
+            state = _IndexState()
+            for doc, product_id, product in self._loader():
+                if product_id is not None and product_id not in state.products:
+                    state.products[product_id] = product
+                state.upsert_variation(doc)
+        except Exception:
+            with self._lock:
+                self._pending = None
+            raise
+        with self._lock:
+            for op, args in self._pending:
+                getattr(state, op)(*args)
+            self._pending = None
+            self._state = state
+            size = len(state.variations)
+        logger.info(f"Search index rebuilt: {size} variations")
+        return size
+
+    def search(
+        self,
+        keyword: str,
+        skip: int = 0,
+        limit: int = 20,
+        category_id: Optional[int] = None,
+        brand_id: Optional[int] = None,
+    ) -> List[dict]:
+        """Variation còn hàng khớp mọi từ trong `keyword`, xếp theo điểm rồi theo id"""
+        terms = words(keyword)
+        if not terms:
+            return []
+        with self._lock:
+            state = self._state
+            matches = sorted((state.match(term) for term in dict.fromkeys(terms)), key=len)
+            scores = matches[0]  # giao từ tập nhỏ nhất
+            for matched in matches[1:]:
+                scores = {
+                    variation_id: score + matched[variation_id]
+                    for variation_id, score in scores.items()
+                    if variation_id in matched
+                }
+            if not scores:
+                return []
+
+            ranked = []
+            for variation_id, score in scores.items():
+                doc = state.variations[variation_id]
+                product = state.products.get(doc["ProductID"]) or IndexedProduct(None, None, None)
+                if (doc.get("Quantity") or 0) <= 0:  # chỉ hiện có hàng, như truy vấn DB
+                    continue
+                if category_id and product.CategoryID != category_id:
+                    continue
+                if brand_id and product.BrandID != brand_id:
+                    continue
+                ranked.append((-score, variation_id, product.CategoryID))
+            top = heapq.nsmallest(skip + limit, ranked)[skip:]
+            return [dict(state.variations[variation_id], CategoryID=category) for _, variation_id, category in top]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "variations": len(self._state.variations),
+                "products": len(self._state.products),
+                "terms": len(self._state.terms),
+            }
+
+    def _run(self):
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.rebuild()
+            except Exception:
+                logger.exception("Search index rebuild failed, keeping the previous index")
+
+    def start(self):
+        self.rebuild()
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="search-index-refresh", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+def variation_doc(variation) -> dict:
+    return {field: getattr(variation, field) for field in PUBLIC_FIELDS}
+
+
+def load_from_database(session_factory=None) -> Callable[[], Iterable[tuple]]:
+    """Loader đọc catalog qua PublicProductService.iter_search_rows"""
+
+    def load():
+        from app.service.public_service import PublicProductService
+
+        factory = session_factory
+        if factory is None:
+            from app.database.session import SessionLocal
+
+            factory = SessionLocal
+        with factory() as db:
+            for row in PublicProductService(db).iter_search_rows():
+                yield variation_doc(row), row.ProductID, IndexedProduct(row.ProductName, row.CategoryID, row.BrandID)
+
+    return load
+
+
+_search_index: Optional[SearchIndex] = None
+
+
+def get_search_index() -> Optional[SearchIndex]:
+    """Index đang dùng, None khi SEARCH_BACKEND khác memory"""
+    return _search_index
+
+
+def start_search_index(backend: str, refresh_interval: float) -> Optional[SearchIndex]:
+    global _search_index
+    if backend == "memory" and _search_index is None:
+        _search_index = SearchIndex(load_from_database(), refresh_interval)
+        _search_index.start()
+        logger.info(f"Search backend: memory (rebuilt every {refresh_interval}s)")
+    return _search_index
+
+
+def stop_search_index():
+    global _search_index
+    if _search_index is not None:
+        _search_index.stop()
+        _search_index = None
+
+
+# Gọi sau khi commit thay đổi product / variation; không làm gì khi không dùng SEARCH_BACKEND=memory
+def index_variation(variation):
+    if _search_index is not None:
+        if variation.product is not None:  # product có thể chưa có trong index (chưa có variation nào)
+            index_product(variation.product)
+        _search_index.upsert_variation(variation_doc(variation))
+
+
+def unindex_variation(variation_id: int):
+    if _search_index is not None:
+        _search_index.remove_variation(variation_id)
+
+
+def index_product(product):
+    if _search_index is not None:
+        _search_index.upsert_product(
+            product.PK_Product, IndexedProduct(product.Name, product.CategoryID, product.BrandID)
+        )
+
+
+def unindex_product(product_id: int):
+    if _search_index is not None:
+        _search_index.remove_product(product_id)
+
+
+def index_stock(db: Session, variation_ids):
+    """Gọi sau khi commit đơn hàng: tồn kho được đổi bằng UPDATE hàng loạt, không qua VariationService"""
+    if _search_index is not None:
+        rows = db.execute(
+            select(Variation.PK_Variation, Variation.Quantity).where(Variation.PK_Variation.in_(variation_ids))
+        ).all()
+        _search_index.update_stock(dict(rows))
@@ -1,16 +1,14 @@
 from datetime import datetime
 
-from argon2 import PasswordHasher
 from sqlalchemy.orm import Session
 
+from app.auth.account_cache import invalidate_account
 from app.auth.auth_service import AuthService
 from app.model.account_model import Account
 from app.model.customer_model import Customer
 from app.model.role_model import Role
 from app.schema.user_schema import UpdateProfile, UserRegister
 
-pwd_hasher = PasswordHasher()
-
 
 class UserService:
     def __init__(self, db: Session):
@@ -35,7 +33,7 @@ class UserService:
             self.db.flush()
 
         # Create account
-        hashed_password = pwd_hasher.hash(user_data.password)
+        hashed_password = AuthService.hash_password(user_data.password)
         account = Account(
             Username=user_data.username, Password=hashed_password, RoleID=customer_role.PK_Role, Status="ACTIVE"
         )
@@ -86,14 +84,14 @@ class UserService:
             return False
 
         # Verify old password
-        try:
-            pwd_hasher.verify(account.Password, old_password)
-        except Exception:
+        if not AuthService.verify_password(old_password, account.Password):
             raise ValueError("Old password is incorrect")
 
         # Update password
-        account.Password = pwd_hasher.hash(new_password)
+        account.Password = AuthService.hash_password(new_password)
+        AuthService.revoke_tokens(account)
         self.db.commit()
+        invalidate_account(account.Username)
         return True
 
     def verify_user_identity(self, username: str, phone: str):
@@ -115,6 +113,8 @@ class UserService:
             raise ValueError("User not found or phone number doesn't match")
 
         # Update password
-        account.Password = pwd_hasher.hash(new_password)
+        account.Password = AuthService.hash_password(new_password)
+        AuthService.revoke_tokens(account)
         self.db.commit()
+        invalidate_account(account.Username)
         return True
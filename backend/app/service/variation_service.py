@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 
 from app.model.variation_model import Variation
 from app.schema.variation_schema import VariationCreate, VariationUpdate
+from app.service.search_index import index_variation, unindex_variation
 import logging
 
 logger = logging.getLogger(__name__)
@@ -52,6 +53,7 @@ class VariationService:
         self.db.add(db_variation)
         self.db.commit()
         self.db.refresh(db_variation)
+        index_variation(db_variation)
         return db_variation
 
     def update_variation(self, variation_id: int, variation_data: VariationUpdate):
@@ -70,6 +72,7 @@ class VariationService:
 
         self.db.commit()
         self.db.refresh(variation)
+        index_variation(variation)
         return variation
 
     def delete_variation(self, variation_id: int):
@@ -79,6 +82,7 @@ class VariationService:
 
         self.db.delete(variation)
         self.db.commit()
+        unindex_variation(variation_id)
         return variation
 
     def update_quantity(self, variation_id: int, quantity_change: int):
@@ -93,4 +97,5 @@ class VariationService:
 
         self.db.commit()
         self.db.refresh(variation)
+        index_variation(variation)
         return variation
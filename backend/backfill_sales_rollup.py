@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Backfill bảng sales_daily_rollup từ posorder/orderline.
+
+Xóa toàn bộ rollup rồi dựng lại theo từng khối PK_POSOrder (mỗi khối một transaction).
+Sau khi chạy, OrderService tự cập nhật rollup khi tạo/sửa/hủy đơn. Nên chạy khi không có
+đơn hàng mới / thay đổi trạng thái, vì thay đổi trong lúc backfill có thể bị tính hai lần.
+
+    python backfill_sales_rollup.py --chunk-size 5000
+"""
+import argparse
+import os
+import sys
+
+# Add the current directory to the path so we can import from app
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.database.base_class import Base
+from app.database.session import SessionLocal, engine
+from app.model.sales_rollup_model import SalesDailyRollup
+from app.service.report_service import ReportService
+
+
+def run_backfill(chunk_size: int):
+    """Tạo bảng (nếu chưa có) và dựng lại sales_daily_rollup"""
+    Base.metadata.create_all(bind=engine, tables=[SalesDailyRollup.__table__])
+    db = SessionLocal()
+    try:
+        processed = ReportService(db).rebuild(chunk_size=chunk_size)
+        print(f"sales_daily_rollup rebuilt (orders up to #{processed})")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+    run_backfill(args.chunk_size)
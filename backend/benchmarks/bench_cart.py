@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark: thêm vào giỏ (POST /cart/) và đọc giỏ (GET /cart/).
+
+legacy: cartitem + cart_variation (SELECT variation, SELECT join để tìm item cũ, INSERT 2 bảng;
+        GET chạy 2 query cho mỗi item)
+new:    cartitem.variation_id + INSERT ... ON CONFLICT DO UPDATE; GET là một câu SELECT (CartService.get_cart_view)
+Mặc định dùng SQLite tạm; đặt BENCH_DATABASE_URL để chạy trên PostgreSQL.
+
+    python benchmarks/bench_cart.py --items 10 100
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import create_engine, delete, insert
+from sqlalchemy.orm import sessionmaker
+
+import app.model  # noqa: F401  đăng ký toàn bộ model cho create_all
+from app.database.base_class import Base
+from app.model.cart_variation_model import CartVariation
+from app.model.cartitem_model import CartItem
+from app.model.customer_model import Customer
+from app.model.variation_model import Variation
+from app.schema.cart_schema import CartItemAdd
+from app.service.cart_service import CartService
+
+STOCK = 1_000_000
+
+
+def legacy_add_to_cart(db, customer_id, variation_id, quantity):
+    """Cách cũ: SELECT variation, tìm item qua cart_variation, INSERT cartitem + cart_variation"""
+    variation = db.query(Variation).filter(Variation.PK_Variation == variation_id).first()
+    if variation.Quantity < quantity:
+        raise ValueError("Not enough stock")
+    existing = (
+        db.query(CartItem)
+        .filter(CartItem.Customer_id == customer_id, CartItem.Status == "active")
+        .join(CartVariation, CartVariation.CartItemID == CartItem.PK_CartItem)
+        .filter(CartVariation.VariationID == variation_id)
+        .first()
+    )
+    if existing:
+        existing.Quantity += quantity
+        db.commit()
+        return existing
+    cart_item = CartItem(Customer_id=customer_id, Quantity=quantity, Status="active")
+    db.add(cart_item)
+    db.flush()
+    db.add(CartVariation(CartItemID=cart_item.PK_CartItem, VariationID=variation_id))
+    db.commit()
+    return cart_item
+
+
+def legacy_get_cart(db, customer_id):
+    """Cách cũ của GET /cart/: 2 query cho mỗi item"""
+    result = []
+    items = db.query(CartItem).filter(CartItem.Customer_id == customer_id, CartItem.Status == "active").all()
+    for item in items:
+        cart_var = db.query(CartVariation).filter(CartVariation.CartItemID == item.PK_CartItem).first()
+        variation = db.query(Variation).filter(Variation.PK_Variation == cart_var.VariationID).first()
+        result.append((item.PK_CartItem, variation.Name, variation.Price, item.Quantity))
+    return result
+
+
+def measure(fn, repeat):
+    start = time.perf_counter()
+    for i in range(repeat):
+        fn(i)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    url = os.environ.get("BENCH_DATABASE_URL", "sqlite:///bench_cart.db")
+    engine = create_engine(url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+
+    with Session() as db:
+        db.add_all([Customer(Name="legacy"), Customer(Name="new")])
+        variations = [
+            {"SKU": f"BENCH-{i}", "Name": f"Variation {i}", "Price": 1000, "Quantity": STOCK}
+            for i in range(max(args.items))
+        ]
+        db.execute(insert(Variation), variations)
+        db.commit()
+
+    print(f"{'items':>6} | {'legacy add ms':>14} {'new add ms':>11} | {'legacy get ms':>14} {'new get ms':>11}")
+    for items in args.items:
+        db = Session()
+        for table in (CartVariation, CartItem):
+            db.execute(delete(table))
+        db.commit()
+
+        # Lấp đầy giỏ (mỗi variation một dòng) rồi đo thêm vào các variation đã có trong giỏ
+        legacy_add = measure(lambda i: legacy_add_to_cart(db, 1, i % items + 1, 1), max(items, args.repeat))
+        new_add = measure(
+            lambda i: CartService(db).add_to_cart(2, CartItemAdd(variation_id=i % items + 1, quantity=1)),
+            max(items, args.repeat),
+        )
+        legacy_get = measure(lambda i: legacy_get_cart(db, 1), args.repeat)
+        new_get = measure(lambda i: CartService(db).get_cart_view(2), args.repeat)
+        db.close()
+        print(f"{items:>6} | {legacy_add:>14.2f} {new_add:>11.2f} | {legacy_get:>14.2f} {new_get:>11.2f}")
+
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+    if url.startswith("sqlite:///bench_"):
+        os.remove(url.replace("sqlite:///", ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark: OrderService.create_order với đơn 1, 50 và 500 dòng.
+
+So sánh cách cũ (db.add từng OrderLine + SELECT Variation từng dòng) với cách hiện tại
+(một SELECT ... IN, một UPDATE cho tồn kho, một INSERT executemany cho order lines).
+Mặc định dùng SQLite tạm; đặt BENCH_DATABASE_URL để chạy trên PostgreSQL.
+
+    python benchmarks/bench_create_order.py --lines 1 50 500
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+from decimal import Decimal
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import create_engine, event, insert
+from sqlalchemy.orm import sessionmaker
+
+import app.model  # noqa: F401  đăng ký toàn bộ model cho create_all
+from app.database.base_class import Base
+from app.model.orderline_model import OrderLine
+from app.model.posorder_model import POSOrder
+from app.model.variation_model import Variation
+from app.schema.order_schema import OrderCreate, OrderLineCreate
+from app.service.order_service import OrderService
+
+STOCK = 1_000_000
+
+
+def legacy_create_order(db, order_data):
+    """Cách cũ: add từng dòng, datetime.now() và SELECT Variation cho mỗi dòng"""
+    total_amount = sum((line.Unit_Price * line.Quantity for line in order_data.order_lines), Decimal(0))
+    db_order = POSOrder(
+        PaymentMethodID=order_data.PaymentMethodID,
+        Type_Order=order_data.Type_Order,
+        Total_Amount=total_amount,
+        Total_Payment=total_amount,
+        Status="pending",
+        Creation_date=datetime.now(),
+        Order_Date=datetime.now(),
+    )
+    db.add(db_order)
+    db.flush()
+    for line_data in order_data.order_lines:
+        db.add(
+            OrderLine(
+                OrderID=db_order.PK_POSOrder,
+                VariationID=line_data.VariationID,
+                Quantity=line_data.Quantity,
+                Unit_Price=line_data.Unit_Price,
+                Price=line_data.Unit_Price * line_data.Quantity,
+                Status="pending",
+                Creation_date=datetime.now(),
+            )
+        )
+        variation = db.query(Variation).filter(Variation.PK_Variation == line_data.VariationID).first()
+        if variation:
+            variation.Quantity -= line_data.Quantity
+            variation.Sold += line_data.Quantity
+    db.commit()
+    db.refresh(db_order)
+    return db_order
+
+
+def measure(engine, fn, repeat):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    elapsed = (time.perf_counter() - start) / repeat
+    event.remove(engine, "before_cursor_execute", count)
+    return elapsed * 1000, len(statements) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type=int, nargs="+", default=[1, 50, 500])
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    url = os.environ.get("BENCH_DATABASE_URL", "sqlite:///bench_create_order.db")
+    engine = create_engine(url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+
+    variation_count = max(args.lines)
+    with Session() as db:
+        db.execute(
+            insert(Variation),
+            [{"SKU": f"BENCH-{i}", "Price": 1000, "Quantity": STOCK, "Sold": 0} for i in range(variation_count)],
+        )
+        db.commit()
+
+    print(f"{'lines':>6} | {'legacy ms':>10} {'legacy stmts':>13} | {'bulk ms':>8} {'bulk stmts':>11}")
+    for line_count in args.lines:
+        order = OrderCreate(
+            PaymentMethodID=1,
+            order_lines=[
+                OrderLineCreate(VariationID=i, Quantity=1, Unit_Price=Decimal(1000)) for i in range(1, line_count + 1)
+            ],
+        )
+        db = Session()
+        legacy = measure(engine, lambda: legacy_create_order(db, order), args.repeat)
+        bulk = measure(engine, lambda: OrderService(db).create_order(order), args.repeat)
+        db.close()
+        print(f"{line_count:>6} | {legacy[0]:>10.2f} {legacy[1]:>13.0f} | {bulk[0]:>8.2f} {bulk[1]:>11.0f}")
+
+    Base.metadata.drop_all(engine)
+    engine.dispose()
+    if url.startswith("sqlite:///bench_"):
+        os.remove(url.replace("sqlite:///", ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: chi phí get_token_payload (dependency auth) cho mỗi request.
+
+cold:   JWT_CACHE_SIZE=0 - mỗi request chạy jwt.decode (HMAC + JSON + kiểm tra claim)
+cached: cùng token được gửi lại (như trong một phiên đăng nhập) - lấy claims từ cache theo sha256(token)
+
+    python benchmarks/bench_jwt_decode.py --requests 20000 --sessions 100
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "bench")
+
+from jose import jwt
+
+from app.auth import token_cache
+from app.auth.dependencies import get_token_payload
+from app.auth.token_cache import TokenCache
+from app.core.config import settings
+
+
+def run(tokens, requests: int, cache_size: int) -> TokenCache:
+    token_cache._token_cache = TokenCache(settings.SECRET_KEY, settings.ALGORITHM, cache_size)
+    started = time.perf_counter()
+    for i in range(requests):
+        get_token_payload(tokens[i % len(tokens)])
+    elapsed = time.perf_counter() - started
+    stats = token_cache._token_cache.stats()
+    print(
+        f"{'cold' if cache_size == 0 else 'cached':<7} {elapsed / requests * 1e6:8.2f} us/request"
+        f"  hits {stats['hits']:>7}  misses {stats['misses']:>7}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--sessions", type=int, default=100, help="số token khác nhau (phiên đăng nhập)")
+    args = parser.parse_args()
+
+    exp = int(time.time()) + 3600
+    tokens = [
+        jwt.encode(
+            {"sub": f"user{i}", "role_id": 2, "customer_id": i, "employee_id": None, "ver": 0, "exp": exp},
+            settings.SECRET_KEY,
+            algorithm=settings.ALGORITHM,
+        )
+        for i in range(args.sessions)
+    ]
+    run(tokens, args.requests, 0)
+    run(tokens, args.requests, 10000)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark: admin product list (ProductService.get_products) khi bảng product lớn dần.
+
+So sánh cách cũ (query.all() để log rồi mới offset/limit) với câu SELECT phân trang duy nhất.
+Mặc định dùng SQLite tạm; đặt BENCH_DATABASE_URL để chạy trên PostgreSQL.
+
+    python benchmarks/bench_list_pagination.py --sizes 1000 10000 100000
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.database.base_class import Base
+from app.model.product_model import Product
+from app.service.product_service import ProductService
+
+
+def legacy_get_products(db, skip, limit):
+    """Cách cũ: tải toàn bộ bảng rồi chạy lại query với offset/limit"""
+    query = db.query(Product)
+    for _ in query.all():
+        pass
+    return query.offset(skip).limit(limit).all()
+
+
+def measure(fn, repeat):
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    elapsed = (time.perf_counter() - start) / repeat
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed * 1000, peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    url = os.environ.get("BENCH_DATABASE_URL", "sqlite:///bench_list_pagination.db")
+    engine = create_engine(url)
+    Base.metadata.drop_all(engine, tables=[Product.__table__])
+    Base.metadata.create_all(engine, tables=[Product.__table__])
+    Session = sessionmaker(bind=engine)
+
+    print(f"{'rows':>8} | {'legacy ms':>10} {'legacy KiB':>11} | {'paged ms':>9} {'paged KiB':>10}")
+    inserted = 0
+    for size in sorted(args.sizes):
+        with engine.begin() as conn:
+            rows = [{"Name": f"Product {i}"} for i in range(inserted, size)]
+            for start in range(0, len(rows), 10_000):
+                conn.execute(insert(Product), rows[start:start + 10_000])
+        inserted = size
+
+        db = Session()
+        skip = size // 2
+        legacy = measure(lambda: legacy_get_products(db, skip, args.limit), args.repeat)
+        db.expunge_all()
+        paged = measure(lambda: ProductService(db).get_products(skip=skip, limit=args.limit), args.repeat)
+        db.close()
+        print(f"{size:>8} | {legacy[0]:>10.2f} {legacy[1]:>11.0f} | {paged[0]:>9.2f} {paged[1]:>10.0f}")
+
+    Base.metadata.drop_all(engine, tables=[Product.__table__])
+    engine.dispose()
+    if url.startswith("sqlite:///bench_"):
+        os.remove(url.replace("sqlite:///", ""))
+
+
+if __name__ == "__main__":
+    main()
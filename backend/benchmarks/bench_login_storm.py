@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Benchmark: độ trễ catalog (GET /products/) khi có login storm (POST /user/auth/login).
+
+Chạy app thật (uvicorn, một worker) trên SQLite tạm, đo p50/p99 của catalog khi chạy một mình
+rồi khi có --logins thread liên tục đăng nhập. So sánh Argon2 chạy trong request (--hash-workers 0)
+với process pool (--hash-workers N, PASSWORD_HASH_MAX_PENDING = --max-pending):
+
+    python benchmarks/bench_login_storm.py --hash-workers 0
+    python benchmarks/bench_login_storm.py --hash-workers 2 --max-pending 8
+"""
+import argparse
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hash-workers", type=int, default=2, help="0 = hash trong thread của request")
+    parser.add_argument("--max-pending", type=int, default=8)
+    parser.add_argument("--catalog-clients", type=int, default=4)
+    parser.add_argument("--logins", type=int, default=32, help="số thread đăng nhập liên tục")
+    parser.add_argument("--seconds", type=float, default=10)
+    return parser.parse_args()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(samples, pct):
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def hammer(url, stop, method="get", data=None):
+    """Gửi request liên tục tới khi `stop` được set; trả về (độ trễ ms, status) của từng request"""
+    import httpx
+
+    results = []
+    with httpx.Client(timeout=60) as client:
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                status = getattr(client, method)(url, **({"data": data} if data else {})).status_code
+            except httpx.HTTPError:
+                status = "error"
+            results.append(((time.perf_counter() - started) * 1000, status))
+    return results
+
+
+def run_phase(base_url, args, with_logins: bool):
+    stop = threading.Event()
+    catalog, logins = [], []
+
+    def worker(target, **kwargs):
+        target.extend(hammer(stop=stop, **kwargs))
+
+    threads = [
+        threading.Thread(target=worker, args=(catalog,), kwargs={"url": f"{base_url}/products/?limit=20"})
+        for _ in range(args.catalog_clients)
+    ]
+    if with_logins:
+        threads += [
+            threading.Thread(
+                target=worker,
+                args=(logins,),
+                kwargs={
+                    "url": f"{base_url}/user/auth/login",
+                    "method": "post",
+                    "data": {"username": "storm", "password": "storm-password"},
+                },
+            )
+            for _ in range(args.logins)
+        ]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return catalog, logins
+
+
+def report(name, results):
+    latencies = [ms for ms, _ in results]
+    codes = {}
+    for _, code in results:
+        codes[code] = codes.get(code, 0) + 1
+    print(
+        f"{name:<22} {len(results):>7} req  p50 {statistics.median(latencies) if latencies else float('nan'):8.1f} ms"
+        f"  p99 {percentile(latencies, 99):8.1f} ms  status {codes}"
+    )
+
+
+def main():
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix="bench_login_")
+    os.environ.update(
+        DATABASE_URL=f"sqlite:///{workdir}/bench.db",
+        SECRET_KEY="bench",
+        PASSWORD_HASH_WORKERS=str(args.hash_workers),
+        PASSWORD_HASH_MAX_PENDING=str(args.max_pending),
+    )
+    os.chdir(workdir)
+    os.makedirs("static", exist_ok=True)
+
+    import uvicorn
+
+    from app.database.session import SessionLocal
+    from app.main import app
+    from app.model.product_model import Product
+    from app.model.role_model import Role
+    from app.model.variation_model import Variation
+    from app.schema.user_schema import UserRegister
+    from app.service.user_service import UserService
+
+    with SessionLocal() as db:
+        db.add_all([Role(Name="admin"), Role(Name="customer")])
+        for i in range(200):
+            product = Product(Name=f"Product {i}")
+            db.add(product)
+            db.flush()
+            db.add(
+                Variation(
+                    ProductID=product.PK_Product, SKU=f"SKU-{i}", Name="M", Price=100 + i, Quantity=10, Status="ACTIVE"
+                )
+            )
+        db.commit()
+        UserService(db).register_user(
+            UserRegister(username="storm", password="storm-password", name="Storm", phone="0900", address="x")
+        )
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    base_url = f"http://127.0.0.1:{port}"
+
+    print(
+        f"hash workers={args.hash_workers} max pending={args.max_pending} "
+        f"catalog clients={args.catalog_clients} login threads={args.logins} {args.seconds}s/phase"
+    )
+    catalog, _ = run_phase(base_url, args, with_logins=False)
+    report("catalog (idle)", catalog)
+    catalog, logins = run_phase(base_url, args, with_logins=True)
+    report("catalog (login storm)", catalog)
+    report("login", logins)
+
+    server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
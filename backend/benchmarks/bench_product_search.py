@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark: /products/search (PublicProductService.search_variations) trên catalog tổng hợp lớn.
+
+So sánh SEARCH_BACKEND=like (ILIKE '%từ khóa%', quét toàn bảng), SEARCH_BACKEND=fulltext
+(GIN trigram trên PostgreSQL / FTS5 trên SQLite) và SEARCH_BACKEND=memory (inverted index trong process).
+Mặc định dùng SQLite tạm; đặt BENCH_DATABASE_URL để chạy trên PostgreSQL (cần quyền tạo extension
+pg_trgm / unaccent).
+
+    python benchmarks/bench_product_search.py --rows 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.database.base_class import Base
+from app.database.fulltext import install_fulltext
+from app.model.brand_model import Brand
+from app.model.category_model import Category
+from app.model.product_model import Product
+from app.model.variation_model import Variation
+from app.service.public_service import PublicProductService
+from app.service.search_index import SearchIndex, load_from_database
+
+KINDS = ["Áo thun", "Áo sơ mi", "Áo khoác", "Quần jean", "Quần kaki", "Đầm", "Chân váy", "Giày thể thao", "Túi xách"]
+STYLES = ["cổ tròn", "cổ tim", "ống suông", "ôm", "oversize", "dáng dài", "họa tiết", "trơn", "kẻ sọc"]
+COLORS = ["trắng", "đen", "đỏ", "xanh dương", "xanh lá", "vàng", "hồng", "nâu", "xám"]
+SIZES = ["XS", "S", "M", "L", "XL", "XXL"]
+KEYWORDS = ["áo thun", "dam", "quan jean do", "khoác xám", "tui xach nau oversize", "không có"]
+TABLES = [Category.__table__, Brand.__table__, Product.__table__, Variation.__table__]
+
+
+def seed(engine, rows: int, variations_per_product: int = 10):
+    """ORM bulk insert (khóa theo tên thuộc tính: Name, SKU, ...)"""
+    rnd = random.Random(42)
+    with sessionmaker(bind=engine).begin() as db:
+        db.execute(insert(Category), [{"Name": "Thời trang"}])
+        db.execute(insert(Brand), [{"Name": "Local"}])
+        products = rows // variations_per_product
+        for start in range(0, products, 10_000):
+            db.execute(
+                insert(Product),
+                [
+                    {"PK_Product": i + 1, "Name": f"{rnd.choice(KINDS)} {rnd.choice(STYLES)}", "CategoryID": 1}
+                    for i in range(start, min(start + 10_000, products))
+                ],
+            )
+        for start in range(0, rows, 10_000):
+            db.execute(
+                insert(Variation),
+                [
+                    {
+                        "ProductID": i // variations_per_product + 1,
+                        "SKU": f"SKU-{i}",
+                        "Name": " ".join(rnd.choice(words) for words in (KINDS, STYLES, COLORS, SIZES)),
+                        "Price": 100000,
+                        "Quantity": rnd.randint(0, 20),
+                        "Status": "ACTIVE",
+                    }
+                    for i in range(start, min(start + 10_000, rows))
+                ],
+            )
+
+
+def measure(search, keyword: str, repeat: int):
+    durations, found = [], 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        found = len(search(keyword, limit=20))
+        durations.append((time.perf_counter() - started) * 1000)
+    return statistics.median(durations), found
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000, help="số variation")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    url = os.environ.get("BENCH_DATABASE_URL", "sqlite:///bench_product_search.db")
+    engine = create_engine(url)
+    Base.metadata.drop_all(engine, tables=TABLES[::-1])
+    Base.metadata.create_all(engine, tables=TABLES)
+
+    started = time.perf_counter()
+    seed(engine, args.rows)
+    print(f"seeded {args.rows} variations in {time.perf_counter() - started:.1f}s")
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        install_fulltext(conn)
+    print(f"built {engine.dialect.name} search index in {time.perf_counter() - started:.1f}s")
+
+    started = time.perf_counter()
+    index = SearchIndex(load_from_database(sessionmaker(bind=engine)))
+    index.rebuild()
+    print(f"built memory search index in {time.perf_counter() - started:.1f}s ({index.stats()['terms']} terms)")
+
+    db = sessionmaker(bind=engine)()
+    backends = {
+        "like": PublicProductService(db, "like").search_variations,
+        "fulltext": PublicProductService(db, "fulltext").search_variations,
+        "memory": index.search,
+    }
+    print(f"{'keyword':<24} | " + " | ".join(f"{name + ' ms':>11} {'rows':>4}" for name in backends))
+    for keyword in KEYWORDS:
+        cells = []
+        for search in backends.values():
+            elapsed, found = measure(search, keyword, args.repeat)
+            db.expunge_all()
+            cells.append(f"{elapsed:>11.2f} {found:>4}")
+        print(f"{keyword:<24} | " + " | ".join(cells))
+    db.close()
+
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP TABLE IF EXISTS variation_search")
+    Base.metadata.drop_all(engine, tables=TABLES[::-1])
+    engine.dispose()
+    if url.startswith("sqlite:///bench_"):
+        os.remove(url.replace("sqlite:///", ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Load test: flood đăng nhập sai mật khẩu (credential stuffing) vào POST /auth/login.
+
+Chạy app (uvicorn, một worker, SQLite tạm) trong process con, bắn --rps request/giây với username lấy ngẫu nhiên
+trong --accounts tài khoản có thật và IP giả qua X-Forwarded-For (TRUSTED_PROXIES=127.0.0.1), rồi in mỗi giây:
+số request, phân bố status và CPU của server (process chính + process Argon2).
+So sánh với --no-limit (LOGIN_RATE_LIMIT_BACKEND=none): CPU server bị Argon2 chiếm hết.
+
+    python benchmarks/load_login_flood.py --rps 1000 --seconds 20
+    python benchmarks/load_login_flood.py --rps 1000 --seconds 20 --no-limit
+"""
+import argparse
+import asyncio
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rps", type=int, default=1000)
+    parser.add_argument("--seconds", type=int, default=20)
+    parser.add_argument("--accounts", type=int, default=20, help="số tài khoản có thật bị tấn công")
+    parser.add_argument("--ips", type=int, default=500, help="số IP giả khác nhau")
+    parser.add_argument("--connections", type=int, default=200)
+    parser.add_argument("--no-limit", action="store_true", help="tắt giới hạn đăng nhập để so sánh")
+    return parser.parse_args()
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def process_tree_cpu(pid: int) -> float:
+    """Tổng CPU (giây) của process và các process con đang chạy (Linux /proc)"""
+    total = 0.0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f"/proc/{current}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            total += (int(fields[11]) + int(fields[12])) / CLOCK_TICKS  # utime + stime
+            for task in os.listdir(f"/proc/{current}/task"):  # process con có thể được fork từ thread bất kỳ
+                with open(f"/proc/{current}/task/{task}/children") as f:
+                    pending.extend(int(child) for child in f.read().split())
+        except FileNotFoundError:
+            continue
+    return total
+
+
+def seed(env: dict, accounts: int):
+    script = f"""
+import app.main  # tạo bảng
+from app.database.session import SessionLocal
+from app.model.role_model import Role
+from app.schema.user_schema import UserRegister
+from app.service.user_service import UserService
+
+with SessionLocal() as db:
+    db.add_all([Role(Name="admin"), Role(Name="customer")])
+    db.commit()
+    for i in range({accounts}):
+        UserService(db).register_user(UserRegister(username=f"victim{{i}}", password="correct-horse", name="Victim"))
+"""
+    subprocess.run([sys.executable, "-c", script], env=env, cwd=env["BENCH_WORKDIR"], check=True)
+
+
+async def flood(base_url: str, args, server_pid: int):
+    import httpx
+
+    counts, latest = {}, {}
+    sent = 0
+    limits = httpx.Limits(max_connections=args.connections, max_keepalive_connections=args.connections)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+
+        async def attempt():
+            headers = {"X-Forwarded-For": f"10.{random.randrange(256)}.0.{random.randrange(args.ips) % 256}"}
+            body = {"username": f"victim{random.randrange(args.accounts)}", "password": "wrong-password"}
+            try:
+                status = (await client.post("/auth/login", json=body, headers=headers)).status_code
+            except httpx.HTTPError:
+                status = "error"
+            latest[status] = latest.get(status, 0) + 1
+
+        tasks = set()
+        started = time.monotonic()
+        cpu_start = cpu_before = process_tree_cpu(server_pid)
+        wall_before = started
+        print(f"{'sec':>4} {'sent':>6} {'server CPU':>11}  status")
+        for second in range(args.seconds):
+            tick = started + second
+            for n in range(args.rps):
+                delay = tick + n / args.rps - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                task = asyncio.create_task(attempt())
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                sent += 1
+            cpu_now, wall_now = process_tree_cpu(server_pid), time.monotonic()
+            cpu_percent = (cpu_now - cpu_before) / (wall_now - wall_before) * 100
+            print(f"{second + 1:>4} {sent:>6} {cpu_percent:>10.0f}%  {dict(sorted(latest.items(), key=str))}")
+            cpu_before, wall_before = cpu_now, wall_now
+            for status, count in latest.items():
+                counts[status] = counts.get(status, 0) + count
+            latest.clear()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    for status, count in latest.items():
+        counts[status] = counts.get(status, 0) + count
+    elapsed = time.monotonic() - started
+    print(
+        f"sent {sent} requests in {elapsed:.1f}s (target {args.rps} rps), "
+        f"server CPU {process_tree_cpu(server_pid) - cpu_start:.1f}s ({os.cpu_count()} cores)"
+    )
+    return counts
+
+
+def main():
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix="load_login_")
+    os.makedirs(os.path.join(workdir, "static"), exist_ok=True)
+    env = dict(
+        os.environ,
+        PYTHONPATH=BACKEND_DIR,
+        BENCH_WORKDIR=workdir,
+        DATABASE_URL=f"sqlite:///{workdir}/load.db",
+        SECRET_KEY="load-test",
+        LOGIN_RATE_LIMIT_BACKEND="none" if args.no_limit else "memory",
+        TRUSTED_PROXIES="127.0.0.1",
+    )
+    seed(env, args.accounts)
+
+    port = free_port()
+    server = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--port", str(port), "--log-level", "warning",
+            "--no-proxy-headers",
+        ],
+        env=env,
+        cwd=workdir,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        base_url = f"http://127.0.0.1:{port}"
+        for _ in range(100):
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+                break
+            except OSError:
+                time.sleep(0.1)
+        print(f"rate limit: {'off' if args.no_limit else 'on'}, {args.rps} rps for {args.seconds}s, "
+              f"{args.accounts} accounts, {args.ips} IPs")
+        counts = asyncio.run(flood(base_url, args, server.pid))
+        print(f"total: {dict(sorted(counts.items(), key=str))}")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
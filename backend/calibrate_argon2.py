@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Chọn tham số Argon2 (ARGON2_TIME_COST / ARGON2_MEMORY_COST / ARGON2_PARALLELISM) theo phần cứng của host.
+
+Cách chọn (theo RFC 9106): giữ parallelism cố định, dùng memory lớn nhất (<= --max-memory-kib) mà một hash
+với time_cost=1 vẫn nằm trong --target-ms, sau đó tăng time_cost tới khi chạm ngân sách.
+Chạy trên máy production (cùng loại CPU) rồi ghi kết quả vào .env (hoặc dùng --env-file để ghi tự động).
+Hash cũ vẫn đăng nhập được và được hash lại bằng tham số mới ở lần đăng nhập tiếp theo.
+
+    python calibrate_argon2.py --target-ms 100
+    python calibrate_argon2.py --target-ms 100 --env-file .env
+"""
+import argparse
+import os
+import re
+import statistics
+import time
+
+from argon2 import PasswordHasher
+
+MIN_MEMORY_KIB = 19456  # 19 MiB - mức tối thiểu OWASP khuyến nghị cho Argon2id
+
+
+def measure_ms(time_cost: int, memory_cost: int, parallelism: int, samples: int) -> float:
+    """Thời gian hash trung vị (ms)"""
+    hasher = PasswordHasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+    hasher.hash("calibration-warmup")
+    durations = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        hasher.hash("calibration-password")
+        durations.append((time.perf_counter() - started) * 1000)
+    return statistics.median(durations)
+
+
+def calibrate(target_ms: float, parallelism: int, max_memory_kib: int, samples: int = 5, measure=measure_ms):
+    memory_cost = max_memory_kib
+    elapsed = measure(1, memory_cost, parallelism, samples)
+    while elapsed > target_ms and memory_cost // 2 >= MIN_MEMORY_KIB:
+        memory_cost //= 2
+        elapsed = measure(1, memory_cost, parallelism, samples)
+
+    time_cost = 1
+    while True:
+        next_elapsed = measure(time_cost + 1, memory_cost, parallelism, samples)
+        if next_elapsed > target_ms:
+            break
+        time_cost, elapsed = time_cost + 1, next_elapsed
+    return time_cost, memory_cost, elapsed
+
+
+def write_env_file(path: str, values: dict):
+    """Cập nhật (hoặc thêm) các dòng KEY=value trong file .env"""
+    content = open(path).read() if os.path.exists(path) else ""
+    for key, value in values.items():
+        line = f"{key}={value}"
+        if re.search(rf"^{key}=.*$", content, flags=re.MULTILINE):
+            content = re.sub(rf"^{key}=.*$", line, content, flags=re.MULTILINE)
+        else:
+            content += ("" if content.endswith("\n") or not content else "\n") + line + "\n"
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target-ms", type=float, default=100, help="thời gian tối đa cho một lần hash/verify")
+    parser.add_argument("--parallelism", type=int, default=PasswordHasher().parallelism)
+    parser.add_argument("--max-memory-kib", type=int, default=PasswordHasher().memory_cost)
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--env-file", help="ghi kết quả vào file .env này")
+    args = parser.parse_args()
+
+    time_cost, memory_cost, elapsed = calibrate(args.target_ms, args.parallelism, args.max_memory_kib, args.samples)
+    if elapsed > args.target_ms:
+        print(f"Warning: minimum parameters still take {elapsed:.1f} ms (> {args.target_ms} ms) on this host")
+
+    values = {
+        "ARGON2_TIME_COST": time_cost,
+        "ARGON2_MEMORY_COST": memory_cost,
+        "ARGON2_PARALLELISM": args.parallelism,
+    }
+    print(f"Argon2id hash time: {elapsed:.1f} ms (target {args.target_ms} ms)")
+    for key, value in values.items():
+        print(f"{key}={value}")
+    if args.env_file:
+        write_env_file(args.env_file, values)
+        print(f"Written to {args.env_file}")
+
+
+if __name__ == "__main__":
+    main()
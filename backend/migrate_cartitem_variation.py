@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Migration script: chuyển variation từ bảng cart_variation sang cột cartitem.variation_id.
+
+1. Thêm cột cartitem.variation_id (nếu chưa có)
+2. Backfill từ cart_variation
+3. Gộp các dòng trùng (customer_id, variation_id, status) - cộng số lượng vào dòng có PK nhỏ nhất
+4. Tạo unique index uq_cartitem_customer_variation_status (cần cho INSERT ... ON CONFLICT khi thêm vào giỏ)
+
+Chạy lại nhiều lần không sao. Bảng cart_variation được giữ nguyên.
+"""
+import os
+import sys
+
+from sqlalchemy import inspect, text
+
+# Add the current directory to the path so we can import from app
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.database.session import engine
+
+
+def run_migration():
+    """Backfill cartitem.variation_id và tạo unique index"""
+    columns = {column["name"] for column in inspect(engine).get_columns("cartitem")}
+
+    with engine.begin() as conn:
+        if "variation_id" not in columns:
+            print("Adding variation_id column to cartitem table...")
+            conn.execute(text("""
+                ALTER TABLE cartitem
+                ADD COLUMN variation_id INTEGER REFERENCES variation(pk_variation)
+            """))
+
+        result = conn.execute(text("""
+            UPDATE cartitem
+            SET variation_id = (
+                SELECT cv.variation_id FROM cart_variation cv WHERE cv.cartitem_id = cartitem.pk_cartitem
+            )
+            WHERE variation_id IS NULL
+            AND EXISTS (SELECT 1 FROM cart_variation cv WHERE cv.cartitem_id = cartitem.pk_cartitem)
+        """))
+        print(f"Backfilled variation_id for {result.rowcount} cart items")
+
+        conn.execute(text("""
+            UPDATE cartitem
+            SET quantity = (
+                SELECT sum(c2.quantity) FROM cartitem c2
+                WHERE c2.customer_id = cartitem.customer_id
+                AND c2.variation_id = cartitem.variation_id
+                AND c2.status = cartitem.status
+            )
+            WHERE pk_cartitem IN (
+                SELECT min(pk_cartitem) FROM cartitem
+                WHERE variation_id IS NOT NULL
+                AND customer_id IS NOT NULL
+                AND status IS NOT NULL
+                GROUP BY customer_id, variation_id, status
+                HAVING count(*) > 1
+            )
+        """))
+        result = conn.execute(text("""
+            DELETE FROM cartitem
+            WHERE variation_id IS NOT NULL
+            AND customer_id IS NOT NULL
+            AND status IS NOT NULL
+            AND pk_cartitem NOT IN (
+                SELECT min(pk_cartitem) FROM cartitem
+                WHERE variation_id IS NOT NULL
+                GROUP BY customer_id, variation_id, status
+            )
+        """))
+        print(f"Merged {result.rowcount} duplicate cart items")
+        conn.execute(text("DELETE FROM cart_variation WHERE cartitem_id NOT IN (SELECT pk_cartitem FROM cartitem)"))
+
+        conn.execute(text("""
+            CREATE UNIQUE INDEX IF NOT EXISTS uq_cartitem_customer_variation_status
+            ON cartitem (customer_id, variation_id, status)
+        """))
+        print("Migration completed successfully!")
+
+
+if __name__ == "__main__":
+    run_migration()
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+"""
+Migration script: đồng bộ trạng thái OrderLine cho các đơn đã CANCELLED / COMPLETED.
+
+Trước đây trạng thái được đồng bộ khi đọc đơn (get_order_by_id); nay việc này nằm trong
+update_order / cancel_order nên cần chạy script này một lần cho dữ liệu cũ.
+"""
+import os
+import sys
+
+from sqlalchemy import text
+
+# Add the current directory to the path so we can import from app
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.database.session import engine
+
+
+def run_migration():
+    """Set orderline.status = upper(posorder.status) cho các đơn đã kết thúc"""
+    with engine.begin() as conn:
+        result = conn.execute(text("""
+            UPDATE orderline
+            SET status = (SELECT upper(p.status) FROM posorder p WHERE p.pk_posorder = orderline.orderid)
+            WHERE orderid IN (
+                SELECT pk_posorder FROM posorder WHERE upper(status) IN ('CANCELLED', 'COMPLETED')
+            )
+            AND coalesce(upper(status), '') <> (
+                SELECT upper(p.status) FROM posorder p WHERE p.pk_posorder = orderline.orderid
+            )
+        """))
+        print(f"Synced status for {result.rowcount} order lines")
+
+
+if __name__ == "__main__":
+    run_migration()
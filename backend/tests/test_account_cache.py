@@ -0,0 +1,117 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from typing import Optional
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.auth import account_cache
+from app.auth.account_cache import AccountCache
+from app.database.base_class import Base
+from app.model.account_model import Account
+from app.model.customer_model import Customer
+from app.model.employee_model import Employee
+from app.model.role_model import Role
+from app.schema.customer_schema import CustomerCreate, CustomerUpdate
+from app.service.customer_service import CustomerService
+from app.service.employee_service import EmployeeService
+
+
+@pytest.fixture(scope="function")
+def engine():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(scope="function")
+def session(engine):
+    sess = sessionmaker(bind=engine)()
+    sess.add(Role(Name="customer"))
+    sess.add_all(
+        [
+            Account(Username="alice", Password="x", RoleID=1, Status="ACTIVE"),
+            Account(Username="bob", Password="x", RoleID=1, Status="ACTIVE"),
+        ]
+    )
+    sess.flush()
+    sess.add_all([Customer(AccountID=1, Name="Alice", Phone="0900"), Employee(AccountID=2, Name="Bob")])
+    sess.commit()
+    yield sess
+    sess.close()
+
+
+@pytest.fixture(scope="function")
+def cache(monkeypatch):
+    cache = AccountCache(maxsize=10, ttl=60)
+    monkeypatch.setattr(account_cache, "_account_cache", cache)
+    return cache
+
+
+@pytest.fixture(scope="function")
+def statements(engine):
+    executed = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    yield executed
+    event.remove(engine, "before_cursor_execute", count)
+
+
+def test_account_and_customer_loaded_once(session, cache, statements):
+    account = cache.get(session, "alice")
+    assert (account.PK_Account, account.RoleID, account.Status, account.CustomerID) == (1, 1, "ACTIVE", 1)
+    assert cache.get(session, "bob").CustomerID is None
+    assert len(statements) == 2
+
+    assert cache.get(session, "alice") == account
+    assert len(statements) == 2
+    assert cache.get(session, "nobody") is None
+
+
+def test_deactivate_employee_invalidates(session, cache):
+    assert cache.get(session, "bob").Status == "ACTIVE"
+    EmployeeService(session).deactivate_employee(1)
+    assert cache.get(session, "bob").Status == "INACTIVE"
+    EmployeeService(session).reactivate_employee(1)
+    assert cache.get(session, "bob").Status == "ACTIVE"
+
+
+def test_customer_changes_invalidate(session, cache):
+    assert cache.get(session, "bob").CustomerID is None
+    customer = CustomerService(session).create_customer(CustomerCreate(AccountID=2, Name="Bob"))
+    assert cache.get(session, "bob").CustomerID == customer.PK_Customer
+
+    cache.get(session, "alice")
+    CustomerService(session).deactivate_customer(1)
+    assert "alice" not in cache._accounts._data
+
+
+class CustomerRelink(CustomerUpdate):
+    # CustomerUpdate của API chưa cho đổi AccountID; service vẫn phải xử lý khi caller truyền vào
+    AccountID: Optional[int] = None
+
+
+def test_customer_account_change_invalidates_both_accounts(session, cache):
+    assert cache.get(session, "alice").CustomerID == 1
+    assert cache.get(session, "bob").CustomerID is None
+    CustomerService(session).update_customer(1, CustomerRelink(AccountID=2))
+
+    alice, bob = cache.get(session, "alice"), cache.get(session, "bob")
+    assert (alice.CustomerID, bob.CustomerID) == (None, 1)
+    assert (alice.TokenVersion, bob.TokenVersion) == (1, 0)  # token cũ của alice mang customer_id=1
+
+
+def test_account_changes_bump_token_version(session, cache):
+    assert cache.get(session, "bob").TokenVersion == 0
+    EmployeeService(session).deactivate_employee(1)
+    assert cache.get(session, "bob").TokenVersion == 1
+    EmployeeService(session).reactivate_employee(1)
+    assert cache.get(session, "bob").TokenVersion == 1
@@ -0,0 +1,172 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.database.base_class import Base
+from app.model.cartitem_model import CartItem
+from app.model.customer_model import Customer
+from app.model.images_model import Images
+from app.model.orderline_model import OrderLine
+from app.model.posorder_model import POSOrder
+from app.model.product_model import Product
+from app.model.variation_model import Variation
+from app.schema.cart_schema import CartItemAdd
+from app.service.cart_service import CartService
+
+
+@pytest.fixture(scope="function")
+def engine():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(scope="function")
+def session(engine):
+    sess = sessionmaker(bind=engine)()
+    sess.add_all([Customer(Name="Cust1"), Product(Name="Giày")])
+    sess.commit()
+    yield sess
+    sess.close()
+
+
+@pytest.fixture(scope="function")
+def statements(engine):
+    executed = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    yield executed
+    event.remove(engine, "before_cursor_execute", count)
+
+
+def fill_cart(session, items):
+    for i in range(items):
+        variation = Variation(ProductID=1, SKU=f"SKU-{i}", Name=f"Size {i}", Price=Decimal(100 + i), Quantity=i)
+        session.add(variation)
+        session.flush()
+        session.add(CartItem(Customer_id=1, VariationID=variation.PK_Variation, Quantity=1, Status="active"))
+    session.commit()
+
+
+@pytest.mark.parametrize("items", [1, 100])
+def test_cart_view_is_single_query(session, statements, items):
+    fill_cart(session, items)
+    statements.clear()
+
+    cart = CartService(session).get_cart_view(1)
+
+    assert len(statements) == 1
+    assert len(cart) == items
+    assert (cart[-1]["variation_name"], cart[-1]["Stock"]) == (f"Size {items - 1}", items - 1)
+
+
+def test_cart_view_picks_default_image(session):
+    fill_cart(session, 2)
+    session.add_all(
+        [
+            Images(ProductID=1, Id_Image="product.jpg", Set_Default=True),
+            Images(VariationID=1, Id_Image="v1-other.jpg"),
+            Images(VariationID=1, Id_Image="v1-default.jpg", Set_Default=True),
+            CartItem(Customer_id=1, Quantity=1, Status="ordered"),
+        ]
+    )
+    session.commit()
+
+    cart = CartService(session).get_cart_view(1)
+
+    assert [item["Image"] for item in cart] == ["v1-default.jpg", "product.jpg"]
+    assert [float(item["Price"]) for item in cart] == [100.0, 101.0]
+
+
+def test_add_items_merges_with_existing_cart(session, statements):
+    fill_cart(session, 3)  # variation i có tồn kho i, mỗi item số lượng 1
+    session.add(Variation(ProductID=1, SKU="NEW", Price=Decimal(50), Quantity=10))
+    session.commit()
+    statements.clear()
+
+    CartService(session).add_items(
+        1,
+        [
+            CartItemAdd(variation_id=3, quantity=1),
+            CartItemAdd(variation_id=4, quantity=2),
+            CartItemAdd(variation_id=4, quantity=3),
+        ],
+    )
+
+    # SELECT tồn kho + giỏ hiện tại, INSERT ... ON CONFLICT DO UPDATE
+    assert len(statements) == 2
+    cart = CartService(session).get_cart_view(1)
+    assert [(item["VariationID"], item["Quantity"]) for item in cart] == [(1, 1), (2, 1), (3, 2), (4, 5)]
+
+
+def test_add_to_cart_upserts_single_row(session, statements):
+    fill_cart(session, 3)
+    statements.clear()
+    service = CartService(session)
+
+    first = service.add_to_cart(1, CartItemAdd(variation_id=2, quantity=1))
+    # SELECT tồn kho, INSERT ... ON CONFLICT RETURNING, SELECT dòng giỏ hàng
+    assert len(statements) == 3
+    assert "ON CONFLICT" in statements[1]
+    new = service.add_to_cart(1, CartItemAdd(variation_id=3, quantity=2))
+
+    assert (first.PK_CartItem, first.Quantity) == (2, 2)
+    assert (new.VariationID, new.Quantity) == (3, 3)
+    assert session.query(CartItem).count() == 3
+    with pytest.raises(ValueError):
+        service.add_to_cart(1, CartItemAdd(variation_id=1, quantity=1))
+
+
+def test_add_items_is_all_or_nothing(session):
+    fill_cart(session, 3)
+
+    with pytest.raises(ValueError) as exc:
+        CartService(session).add_items(
+            1,
+            [
+                CartItemAdd(variation_id=3, quantity=1),
+                CartItemAdd(variation_id=2, quantity=5),
+                CartItemAdd(variation_id=99),
+            ],
+        )
+
+    assert "variation 2" in str(exc.value) and "variation 99" in str(exc.value)
+    session.rollback()
+    assert [item["Quantity"] for item in CartService(session).get_cart_view(1)] == [1, 1, 1]
+
+
+def test_reorder_adds_order_lines_to_cart(session):
+    fill_cart(session, 3)
+    order = POSOrder(CustomerID=1, Status="COMPLETED")
+    other = POSOrder(CustomerID=2, Status="COMPLETED")
+    session.add_all([order, other])
+    session.flush()
+    session.add_all(
+        [
+            OrderLine(OrderID=order.PK_POSOrder, VariationID=3, Quantity=1),
+            OrderLine(OrderID=order.PK_POSOrder, VariationID=3, Quantity=1),
+            OrderLine(OrderID=other.PK_POSOrder, VariationID=2, Quantity=1),
+        ]
+    )
+    session.commit()
+    service = CartService(session)
+
+    assert service.reorder(1, other.PK_POSOrder) is False
+    with pytest.raises(ValueError):
+        service.reorder(1, order.PK_POSOrder)  # 1 trong giỏ + 2 đặt lại > tồn kho 2
+
+    session.rollback()
+    session.get(Variation, 3).Quantity = 10
+    session.commit()
+    assert service.reorder(1, order.PK_POSOrder) is True
+    assert [item["Quantity"] for item in service.get_cart_view(1)] == [1, 1, 3]
@@ -0,0 +1,170 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import threading
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import sessionmaker
+
+from app.database.base_class import Base
+from app.model.cartitem_model import CartItem
+from app.model.customer_model import Customer
+from app.model.orderline_model import OrderLine
+from app.model.product_model import Product
+from app.model.variation_model import Variation
+from app.schema.cart_schema import CartItemAdd
+from app.service import checkout_service
+from app.service.cart_service import CartService
+from app.service.cart_store import MemoryCartStore
+from app.service.checkout_service import CheckoutService
+
+
+@pytest.fixture(scope="function")
+def engine(tmp_path):
+    # file DB: flush nền chạy trên thread khác (connection khác)
+    engine = create_engine(f"sqlite:///{tmp_path}/cart.db")
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(scope="function")
+def session(engine):
+    sess = sessionmaker(bind=engine)()
+    sess.add_all([Customer(Name="Cust1"), Product(Name="Giày")])
+    sess.flush()
+    for i in range(3):
+        sess.add(Variation(ProductID=1, SKU=f"SKU-{i}", Name=f"Size {i}", Price=Decimal(100 + i), Quantity=10, Sold=0))
+    sess.commit()
+    yield sess
+    sess.close()
+
+
+@pytest.fixture(scope="function")
+def store(engine):
+    return MemoryCartStore(session_factory=sessionmaker(bind=engine))
+
+
+@pytest.fixture(scope="function")
+def writes(engine):
+    executed = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if not statement.lstrip().upper().startswith("SELECT"):
+            executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    yield executed
+    event.remove(engine, "before_cursor_execute", count)
+
+
+def db_cart(session):
+    session.expire_all()
+    return dict(
+        session.execute(
+            select(CartItem.VariationID, CartItem.Quantity).where(
+                CartItem.Customer_id == 1, CartItem.Status == "active"
+            )
+        ).all()
+    )
+
+
+def test_memory_cart_writes_nothing_until_flush(session, store, writes):
+    service = CartService(session, store=store)
+    item = service.add_to_cart(1, CartItemAdd(variation_id=1, quantity=2))
+    service.add_items(1, [CartItemAdd(variation_id=2, quantity=1), CartItemAdd(variation_id=1, quantity=1)])
+    service.update_cart_item(item.PK_CartItem, 1, 4)
+    service.remove_from_cart(-2, 1)
+
+    assert writes == []
+    assert [(row["VariationID"], row["Quantity"]) for row in service.get_cart_view(1)] == [(1, 4)]
+    assert db_cart(session) == {}
+
+    assert store.flush() == 1
+    assert db_cart(session) == {1: 4}
+
+
+def test_temporary_ids_resolve_after_flush(session, store):
+    service = CartService(session, store=store)
+    item = service.add_to_cart(1, CartItemAdd(variation_id=3, quantity=1))
+    assert item.PK_CartItem == -3
+
+    store.flush()
+    (row,) = service.get_cart_view(1)
+    assert row["PK_CartItem"] > 0
+    # id tạm đã trả về cho client trước khi flush vẫn dùng được
+    assert service.update_cart_item(-3, 1, 2).Quantity == 2
+    assert service.get_cart_view(1, cart_item_id=row["PK_CartItem"])[0]["Quantity"] == 2
+
+
+def test_memory_cart_loads_existing_rows_and_checks_stock(session, store):
+    session.add(CartItem(Customer_id=1, VariationID=1, Quantity=9, Status="active"))
+    session.commit()
+    service = CartService(session, store=store)
+
+    with pytest.raises(ValueError, match="not enough stock"):
+        service.add_items(1, [CartItemAdd(variation_id=1, quantity=2)])
+    service.clear_cart(1)
+    store.flush()
+    assert db_cart(session) == {}
+
+
+def test_checkout_flushes_memory_cart(session, store):
+    CartService(session, store=store).add_items(
+        1, [CartItemAdd(variation_id=1, quantity=2), CartItemAdd(variation_id=2, quantity=1)]
+    )
+
+    order = CheckoutService(session, cart_store=store).checkout(1)
+
+    assert order.Total_Amount == Decimal(2 * 100 + 101)
+    assert session.query(OrderLine).count() == 2
+    assert db_cart(session) == {}
+    assert store.items(session, 1) == []
+    assert store.flush() == 1
+    assert db_cart(session) == {}
+
+
+def test_background_flush_during_checkout_keeps_ordered_rows_deleted(session, store, monkeypatch):
+    CartService(session, store=store).add_items(
+        1, [CartItemAdd(variation_id=1, quantity=2), CartItemAdd(variation_id=2, quantity=1)]
+    )
+    place_order = checkout_service.OrderService.place_order
+    background = threading.Thread(target=store.flush)
+
+    def place_order_then_flush(self, order_data):
+        order = place_order(self, order_data)
+        # customer thêm item trong lúc checkout, flush nền chạy trước khi checkout commit xong
+        store.add(session, 1, {3: 1})
+        background.start()
+        background.join(0.2)
+        assert background.is_alive()  # chờ checkout
+        return order
+
+    monkeypatch.setattr(checkout_service.OrderService, "place_order", place_order_then_flush)
+    CheckoutService(session, cart_store=store).checkout(1)
+    background.join()
+
+    assert db_cart(session) == {3: 1}
+    store.invalidate(1)
+    assert store.quantities(session, 1) == {3: 1}
+
+
+def test_idle_clean_carts_are_evicted(engine, session):
+    now = [0.0]
+    store = MemoryCartStore(session_factory=sessionmaker(bind=engine), idle_seconds=60, clock=lambda: now[0])
+    session.add(Customer(Name="Cust2"))
+    session.commit()
+    store.add(session, 1, {1: 2})
+    store.add(session, 2, {2: 1})
+    store.items(session, 1)
+    now[0] = 61
+    assert store.evict_idle() == 0  # chưa flush: không được bỏ
+
+    store.flush()
+    store.items(session, 2)
+    assert store.evict_idle() == 1
+    assert list(store._carts) == [2]
+    assert store.quantities(session, 1) == {1: 2}  # nạp lại từ DB
@@ -0,0 +1,85 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.database.base_class import Base
+from app.model.cartitem_model import CartItem
+from app.model.customer_model import Customer
+from app.model.orderline_model import OrderLine
+from app.model.posorder_model import POSOrder
+from app.model.variation_model import Variation
+from app.service.checkout_service import CheckoutService
+
+
+@pytest.fixture(scope="function")
+def engine():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(scope="function")
+def session(engine):
+    sess = sessionmaker(bind=engine)()
+    sess.add(Customer(Name="Cust1"))
+    sess.commit()
+    yield sess
+    sess.close()
+
+
+@pytest.fixture(scope="function")
+def statements(engine):
+    executed = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    yield executed
+    event.remove(engine, "before_cursor_execute", count)
+
+
+def fill_cart(session, items, stock=10):
+    for i in range(items):
+        variation = Variation(SKU=f"SKU-{i}", Price=Decimal(1000 + i), Quantity=stock, Sold=0)
+        session.add(variation)
+        session.flush()
+        session.add(CartItem(Customer_id=1, VariationID=variation.PK_Variation, Quantity=2, Status="active"))
+    session.commit()
+
+
+@pytest.mark.parametrize("items", [1, 20])
+def test_checkout_statement_budget(session, statements, items):
+    fill_cart(session, items)
+    statements.clear()
+
+    order = CheckoutService(session).checkout(1, payment_method_id=1)
+
+    # cart, SELECT stock, UPDATE stock, INSERT posorder, INSERT orderline, rollup x2, DELETE cart, refresh
+    assert len(statements) == 9
+    assert order.Total_Amount == sum(Decimal(2 * (1000 + i)) for i in range(items))
+    assert session.query(OrderLine).count() == items
+    assert session.query(CartItem).count() == 0
+
+
+def test_checkout_keeps_cart_when_order_fails(session):
+    fill_cart(session, 3, stock=1)
+
+    with pytest.raises(ValueError, match="insufficient stock"):
+        CheckoutService(session).checkout(1)
+
+    assert session.query(POSOrder).count() == 0
+    assert session.query(CartItem).count() == 3
+    assert {v.Quantity for v in session.query(Variation)} == {1}
+
+
+def test_checkout_empty_cart(session):
+    with pytest.raises(ValueError, match="Cart is empty"):
+        CheckoutService(session).checkout(1)
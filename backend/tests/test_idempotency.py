@@ -0,0 +1,90 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import pytest
+from fastapi import HTTPException, Response
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.cache import TTLCache
+from app.core.idempotency import (
+    IDEMPOTENT_REPLAY_HEADER,
+    DatabaseIdempotencyStore,
+    MemoryIdempotencyStore,
+    run_idempotent,
+)
+from app.database.base_class import Base
+from app.model.idempotency_model import IdempotencyKey
+
+
+@pytest.fixture(params=["memory", "database"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        yield MemoryIdempotencyStore(maxsize=100, ttl=60, lock_ttl=5)
+        return
+    engine = create_engine(f"sqlite:///{tmp_path / 'idem.db'}")
+    Base.metadata.create_all(engine, tables=[IdempotencyKey.__table__])
+    yield DatabaseIdempotencyStore(ttl=60, lock_ttl=5, session_factory=sessionmaker(bind=engine))
+    engine.dispose()
+
+
+def test_retry_replays_stored_response(store):
+    calls = []
+
+    def handler():
+        calls.append(1)
+        return {"PK_POSOrder": len(calls)}
+
+    first = run_idempotent(Response(), "key-1", "scope", {"a": 1}, handler, store=store)
+    replay = Response()
+    second = run_idempotent(replay, "key-1", "scope", {"a": 1}, handler, store=store)
+
+    assert first == second == {"PK_POSOrder": 1}
+    assert len(calls) == 1
+    assert replay.headers[IDEMPOTENT_REPLAY_HEADER] == "true"
+    # Key khác hoặc scope khác (người dùng khác) chạy lại handler
+    assert run_idempotent(Response(), "key-1", "other", {"a": 1}, handler, store=store) == {"PK_POSOrder": 2}
+    assert run_idempotent(Response(), None, "scope", {"a": 1}, handler, store=store) == {"PK_POSOrder": 3}
+
+
+def test_reused_key_with_different_body_is_rejected(store):
+    run_idempotent(Response(), "key-1", "scope", {"a": 1}, lambda: {"ok": True}, store=store)
+    with pytest.raises(HTTPException) as exc:
+        run_idempotent(Response(), "key-1", "scope", {"a": 2}, lambda: {"ok": True}, store=store)
+    assert exc.value.status_code == 422
+
+
+def test_in_progress_key_returns_conflict(store):
+    def handler():
+        with pytest.raises(HTTPException) as exc:
+            run_idempotent(Response(), "key-1", "scope", {}, lambda: {"ok": True}, store=store)
+        assert exc.value.status_code == 409
+        return {"ok": True}
+
+    assert run_idempotent(Response(), "key-1", "scope", {}, handler, store=store) == {"ok": True}
+
+
+def test_failed_request_releases_key(store):
+    def failing():
+        raise HTTPException(status_code=400, detail="Insufficient stock")
+
+    with pytest.raises(HTTPException):
+        run_idempotent(Response(), "key-1", "scope", {}, failing, store=store)
+    assert run_idempotent(Response(), "key-1", "scope", {}, lambda: {"ok": True}, store=store) == {"ok": True}
+
+
+def test_ttl_cache_expires_and_evicts_lru():
+    now = [0.0]
+    cache = TTLCache(maxsize=2, ttl=10, clock=lambda: now[0])
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" thành entry ít dùng nhất
+    cache.set("c", 3)
+    assert (cache.get("a"), cache.get("b"), cache.get("c")) == (1, None, 3)
+
+    assert cache.add("a", 100) == 1
+    now[0] = 11
+    assert cache.get("a") is None
+    assert cache.add("a", 100) is None
+    assert cache.get("a") == 100
@@ -0,0 +1,88 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from app.auth.login_limiter import (
+    LoginLimiter,
+    LoginRateLimited,
+    MemoryRateLimitBackend,
+    client_ip,
+    parse_trusted_proxies,
+)
+
+
+@pytest.fixture(scope="function")
+def clock():
+    return [1000.0]
+
+
+@pytest.fixture(scope="function")
+def limiter(clock):
+    return LoginLimiter(MemoryRateLimitBackend(clock=lambda: clock[0]), per_username=3, per_ip=5, window=60)
+
+
+def test_username_limit_with_sliding_window(limiter, clock):
+    for _ in range(3):
+        limiter.check("Alice", "10.0.0.1")
+        clock[0] += 10
+    with pytest.raises(LoginRateLimited) as exc:
+        limiter.check("alice", "10.0.0.2")
+    assert exc.value.retry_after == pytest.approx(30)
+
+    # lần thử đầu tiên ra khỏi cửa sổ -> được thử thêm một lần
+    clock[0] += 30
+    limiter.check("alice", "10.0.0.2")
+    with pytest.raises(LoginRateLimited):
+        limiter.check("alice", "10.0.0.2")
+
+
+def test_ip_limit_across_usernames(limiter):
+    for n in range(5):
+        limiter.check(f"user{n}", "10.0.0.1")
+    with pytest.raises(LoginRateLimited):
+        limiter.check("someone-else", "10.0.0.1")
+    limiter.check("someone-else", "10.0.0.9")
+
+
+def test_success_resets_username(limiter):
+    for _ in range(3):
+        limiter.check("alice", None)
+    limiter.succeeded("alice")
+    limiter.check("alice", None)
+
+
+def test_rejected_attempts_are_not_counted(limiter, clock):
+    for _ in range(3):
+        limiter.check("alice", None)
+    for _ in range(100):
+        with pytest.raises(LoginRateLimited):
+            limiter.check("alice", None)
+    clock[0] += 61
+    limiter.check("alice", None)
+
+
+def test_client_ip_from_trusted_proxy():
+    trusted = parse_trusted_proxies("10.0.0.0/8, 127.0.0.1")
+    assert client_ip("203.0.113.7", "1.2.3.4", trusted) == "203.0.113.7"  # không qua proxy: bỏ qua header
+    assert client_ip("10.1.2.3", "203.0.113.7", trusted) == "203.0.113.7"
+    # hop bên trái do client tự gửi; lấy hop ngoài cùng bên phải không phải proxy
+    assert client_ip("10.1.2.3", "6.6.6.6, 203.0.113.7, 10.9.9.9", trusted) == "203.0.113.7"
+    assert client_ip("10.1.2.3", None, trusted) == "10.1.2.3"
+    assert client_ip("10.1.2.3", "1.2.3.4", parse_trusted_proxies("")) == "10.1.2.3"
+
+
+def test_many_usernames_behind_one_proxy(limiter):
+    trusted = parse_trusted_proxies("10.0.0.0/8")
+    # mỗi người dùng một IP thật, cùng đi qua proxy 10.0.0.2: không bị gộp vào bộ đếm của proxy
+    for n in range(50):
+        limiter.check(f"user{n}", client_ip("10.0.0.2", f"203.0.113.{n}", trusted))
+    limiter.succeeded("user0")
+
+    # nhiều username từ cùng một IP thật vẫn bị giới hạn theo IP
+    for n in range(5):
+        limiter.check(f"victim{n}", client_ip("10.0.0.2", "198.51.100.1", trusted))
+    with pytest.raises(LoginRateLimited):
+        limiter.check("victim-next", client_ip("10.0.0.3", "6.6.6.6, 198.51.100.1", trusted))
@@ -0,0 +1,331 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, event, update
+from sqlalchemy.orm import sessionmaker
+
+from app.core.pagination import next_cursor
+from app.database.base_class import Base
+from app.model.address_model import Address, District, Province, Ward
+from app.model.customer_model import Customer
+from app.model.orderline_model import OrderLine
+from app.model.paymentmethod_model import PaymentMethod
+from app.model.posorder_model import POSOrder
+from app.model.variation_model import Variation
+from app.schema.order_schema import OrderCreate, OrderLineCreate, OrderUpdate
+from app.service.order_service import OrderService
+
+
+@pytest.fixture(scope="function")
+def engine():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(scope="function")
+def session(engine):
+    sess = sessionmaker(bind=engine)()
+    yield sess
+    sess.close()
+
+
+@pytest.fixture(scope="function")
+def statements(engine):
+    executed = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    yield executed
+    event.remove(engine, "before_cursor_execute", count)
+
+
+def test_get_orders_cursor_handles_equal_creation_dates(session):
+    cust = Customer(Name="Cust1")
+    session.add(cust)
+    session.flush()
+    base = datetime(2025, 1, 1)
+    # Hai đơn cùng Creation_date để kiểm tra PK làm tiêu chí phụ
+    for i in range(7):
+        session.add(
+            POSOrder(
+                CustomerID=cust.PK_Customer,
+                Creation_date=base + timedelta(days=i // 2),
+                Total_Amount=Decimal(1000),
+                Status="pending",
+            )
+        )
+    session.commit()
+
+    service = OrderService(session)
+    expected = [o.PK_POSOrder for o in service.get_orders(limit=100)]
+    seen, cursor = [], None
+    while True:
+        page = service.get_orders(limit=3, cursor=cursor)
+        seen += [o.PK_POSOrder for o in page]
+        cursor = next_cursor(page, 3, OrderService.KEYSET)
+        if not cursor:
+            break
+    assert seen == expected
+    assert len(seen) == 7
+
+
+def test_get_orders_cursor_handles_null_creation_dates(session):
+    cust = Customer(Name="Cust1")
+    session.add(cust)
+    session.flush()
+    dates = [datetime(2025, 1, 1), None, datetime(2025, 1, 2), None, None, datetime(2025, 1, 3)]
+    session.add_all(
+        [POSOrder(CustomerID=cust.PK_Customer, Creation_date=d, Total_Amount=Decimal(1000)) for d in dates]
+    )
+    session.commit()
+
+    service = OrderService(session)
+    seen, cursor = [], None
+    while True:
+        page = service.get_orders(limit=2, cursor=cursor)
+        seen += [o.PK_POSOrder for o in page]
+        cursor = next_cursor(page, 2, OrderService.KEYSET)
+        if not cursor:
+            break
+    # mới nhất trước, đơn không có ngày tạo ở cuối (mọi DB)
+    assert seen == [6, 3, 1, 5, 4, 2]
+    assert [o.PK_POSOrder for o in service.get_orders(limit=100)] == seen
+
+
+def _seed_customer_orders(session, count):
+    province = Province(Name="Hà Nội", Code="01")
+    session.add(province)
+    session.flush()
+    district = District(ProvinceID=province.PK_Province, Name="Ba Đình", Code="001")
+    session.add(district)
+    session.flush()
+    ward = Ward(DistrictID=district.PK_District, Name="Phúc Xá", Code="00001")
+    cust = Customer(Name="Cust1")
+    session.add_all([ward, cust])
+    session.flush()
+    address = Address(
+        CustomerID=cust.PK_Customer,
+        ProvinceID=province.PK_Province,
+        DistrictID=district.PK_District,
+        WardID=ward.PK_Ward,
+        StreetAddress="1 Hoàng Hoa Thám",
+    )
+    session.add(address)
+    session.flush()
+    for i in range(count):
+        session.add(
+            POSOrder(
+                CustomerID=cust.PK_Customer,
+                AddressID=address.PK_Address if i % 2 == 0 else None,
+                Creation_date=datetime(2025, 1, 1) + timedelta(minutes=i),
+                Total_Amount=Decimal(1000),
+                Status="pending",
+            )
+        )
+    customer_id = cust.PK_Customer
+    session.commit()
+    session.expunge_all()
+    return customer_id
+
+
+def test_get_customer_orders_uses_constant_queries(session, statements):
+    customer_id = _seed_customer_orders(session, 50)
+    statements.clear()
+
+    orders = OrderService(session).get_customer_orders(customer_id, limit=50)
+
+    assert len(orders) == 50
+    assert len(statements) == 1
+    with_address = [o for o in orders if o.AddressID]
+    assert len(with_address) == 25
+    assert all(o.ShippingAddress == "1 Hoàng Hoa Thám, Phúc Xá, Ba Đình, Hà Nội" for o in with_address)
+    assert all(o.ShippingAddress is None for o in orders if not o.AddressID)
+
+
+@pytest.fixture(scope="function")
+def placed_order(session):
+    cust = Customer(Name="Cust1")
+    variation = Variation(SKU="SKU-1", Name="Áo", Price=Decimal(1000), Quantity=10, Sold=0)
+    session.add_all([cust, variation])
+    session.flush()
+    order = POSOrder(CustomerID=cust.PK_Customer, Total_Amount=Decimal(3000), Status="pending")
+    session.add(order)
+    session.flush()
+    session.add_all(
+        [
+            OrderLine(OrderID=order.PK_POSOrder, VariationID=variation.PK_Variation, Quantity=q, Status="pending")
+            for q in (1, 2)
+        ]
+    )
+    variation.Quantity -= 3
+    variation.Sold += 3
+    session.commit()
+    return order.PK_POSOrder, variation.PK_Variation
+
+
+def test_get_order_by_id_is_read_only(session, statements, placed_order):
+    order_id, _ = placed_order
+    session.execute(update(POSOrder).values(Status="COMPLETED"))
+    session.commit()
+    statements.clear()
+
+    order = OrderService(session).get_order_by_id(order_id)
+
+    assert order.Status == "COMPLETED"
+    assert all(s.lstrip().upper().startswith("SELECT") for s in statements)
+    assert not session.dirty
+
+
+def test_update_order_propagates_final_status(session, placed_order):
+    order_id, _ = placed_order
+    OrderService(session).update_order(order_id, OrderUpdate(Status="COMPLETED"))
+    statuses = {line.Status for line in session.query(OrderLine).filter(OrderLine.OrderID == order_id)}
+    assert statuses == {"COMPLETED"}
+
+
+def test_cancel_order_restores_stock_once(session, placed_order):
+    order_id, variation_id = placed_order
+    service = OrderService(session)
+
+    cancelled = service.cancel_order(order_id)
+    assert cancelled.Status == "CANCELLED"
+    assert service.cancel_order(order_id) is None
+
+    variation = session.get(Variation, variation_id)
+    assert (variation.Quantity, variation.Sold) == (10, 0)
+    statuses = {line.Status for line in session.query(OrderLine).filter(OrderLine.OrderID == order_id)}
+    assert statuses == {"CANCELLED"}
+
+
+def test_order_statistics_aggregates_in_sql(session, statements):
+    cash = PaymentMethod(Type="Cash")
+    session.add(cash)
+    session.flush()
+    rows = [
+        (datetime(2025, 3, 3, 9), "COMPLETED", 100),  # thứ Hai
+        (datetime(2025, 3, 3, 18), "pending", 50),
+        (datetime(2025, 3, 5, 10), "CANCELLED", 70),
+        (datetime(2025, 3, 10, 8), "COMPLETED", 30),  # tuần sau
+    ]
+    for order_date, status, amount in rows:
+        session.add(
+            POSOrder(
+                Order_Date=order_date,
+                Status=status,
+                Total_Amount=Decimal(amount),
+                PaymentMethodID=cash.PK_PaymentMethod,
+            )
+        )
+    session.commit()
+    statements.clear()
+
+    stats = OrderService(session).get_order_statistics(group_by="week")
+
+    assert len(statements) == 3
+    assert stats["total_orders"] == 4
+    assert stats["total_revenue"] == 180.0
+    assert stats["completed_orders"] == 2
+    assert stats["cancelled_orders"] == 2
+    assert stats["by_status"]["CANCELLED"] == {"orders": 1, "revenue": 0.0}
+    assert stats["by_payment_method"] == [
+        {"payment_method_id": cash.PK_PaymentMethod, "type": "Cash", "orders": 4, "revenue": 180.0}
+    ]
+    assert stats["buckets"] == [
+        {"bucket": "2025-03-03", "orders": 3, "revenue": 150.0},
+        {"bucket": "2025-03-10", "orders": 1, "revenue": 30.0},
+    ]
+
+    daily = OrderService(session).get_order_statistics(start_date=datetime(2025, 3, 4), group_by="day")
+    assert [b["bucket"] for b in daily["buckets"]] == ["2025-03-05", "2025-03-10"]
+
+
+def _checkout(variation_id, quantity, *more):
+    lines = [(variation_id, quantity), *zip(more[::2], more[1::2])]
+    return OrderCreate(
+        PaymentMethodID=1,
+        order_lines=[OrderLineCreate(VariationID=v, Quantity=q, Unit_Price=Decimal(1000)) for v, q in lines],
+    )
+
+
+def test_create_order_fails_atomically_on_insufficient_stock(session):
+    session.add_all(
+        [
+            Variation(SKU="A", Price=Decimal(1000), Quantity=5, Sold=0),
+            Variation(SKU="B", Price=Decimal(1000), Quantity=1, Sold=0),
+        ]
+    )
+    session.commit()
+    service = OrderService(session)
+
+    with pytest.raises(ValueError, match="Variation 2"):
+        service.create_order(_checkout(1, 3, 2, 2))
+    assert session.query(POSOrder).count() == 0
+    assert [(v.Quantity, v.Sold) for v in session.query(Variation).order_by(Variation.PK_Variation)] == [
+        (5, 0),
+        (1, 0),
+    ]
+
+    # Cùng một variation trên nhiều dòng được cộng dồn trước khi kiểm tra tồn kho
+    with pytest.raises(ValueError):
+        service.create_order(_checkout(1, 3, 1, 3))
+    with pytest.raises(ValueError):
+        service.create_order(_checkout(99, 1))
+
+    service.create_order(_checkout(1, 2, 1, 3, 2, 1))
+    session.expire_all()
+    assert [(v.Quantity, v.Sold) for v in session.query(Variation).order_by(Variation.PK_Variation)] == [
+        (0, 5),
+        (0, 1),
+    ]
+
+
+@pytest.mark.parametrize("line_count", [1, 50])
+def test_create_order_statement_count_is_constant(session, statements, line_count):
+    session.add_all([Variation(SKU=f"V{i}", Price=Decimal(1000), Quantity=10, Sold=0) for i in range(line_count)])
+    session.commit()
+    statements.clear()
+
+    lines = [value for i in range(1, line_count + 1) for value in (i, 1)]
+    order = OrderService(session).create_order(_checkout(*lines))
+
+    # SELECT stock, UPDATE stock, INSERT posorder, INSERT orderline, rollup (SELECT + INSERT), refresh
+    assert len(statements) == 7
+    assert session.query(OrderLine).filter(OrderLine.OrderID == order.PK_POSOrder).count() == line_count
+
+
+def test_parallel_checkouts_never_oversell(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'checkout.db'}", connect_args={"timeout": 60})
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        db.add(Variation(SKU="HOT", Price=Decimal(1000), Quantity=50, Sold=0))
+        db.commit()
+
+    def checkout(_):
+        with Session() as db:
+            try:
+                OrderService(db).create_order(_checkout(1, 1))
+                return True
+            except ValueError:
+                return False
+
+    with ThreadPoolExecutor(max_workers=50) as pool:
+        results = list(pool.map(checkout, range(200)))
+
+    with Session() as db:
+        variation = db.get(Variation, 1)
+        assert results.count(True) == 50
+        assert (variation.Quantity, variation.Sold) == (0, 50)
+        assert db.query(POSOrder).count() == 50
+        assert db.query(OrderLine).count() == 50
+    engine.dispose()
@@ -0,0 +1,78 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import threading
+
+import pytest
+
+from app.auth.password_pool import PasswordHasherPool, PasswordPoolBusy
+
+
+@pytest.fixture(scope="function")
+def pool():
+    pool = PasswordHasherPool(workers=1, max_pending=2)
+    yield pool
+    pool.shutdown()
+
+
+def test_hash_and_verify_in_worker_process(pool):
+    hashed = pool.hash("secret")
+    assert hashed.startswith("$argon2")
+    assert pool.verify(hashed, "secret") is True
+    assert pool.verify(hashed, "wrong") is False
+    assert pool.verify("not-a-hash", "secret") is False
+
+
+def test_inline_mode():
+    pool = PasswordHasherPool(workers=0)
+    assert pool.verify(pool.hash("secret"), "secret") is True
+
+
+def test_saturated_pool_sheds_instead_of_queueing(pool):
+    hashed = pool.hash("secret")
+    # giữ chỗ toàn bộ hàng đợi như thể có 2 request đang chờ
+    for _ in range(pool.max_pending):
+        pool._slots.acquire()
+    with pytest.raises(PasswordPoolBusy):
+        pool.verify(hashed, "secret")
+    for _ in range(pool.max_pending):
+        pool._slots.release()
+    assert pool.verify(hashed, "secret") is True
+
+
+def test_concurrent_requests_within_limit(pool):
+    hashed = pool.hash("secret")
+    results = []
+
+    def login():
+        try:
+            results.append(pool.verify(hashed, "secret"))
+        except PasswordPoolBusy:
+            results.append("busy")
+
+    threads = [threading.Thread(target=login) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(results) == 6
+    assert True in results
+    assert set(results) <= {True, "busy"}
+
+
+@pytest.mark.parametrize("workers", [0, 1])
+def test_configured_parameters_and_rehash(workers):
+    old = PasswordHasherPool(workers=0, time_cost=1, memory_cost=8192, parallelism=1)
+    pool = PasswordHasherPool(workers=workers, time_cost=2, memory_cost=8192, parallelism=1)
+    try:
+        old_hash = old.hash("secret")
+        new_hash = pool.hash("secret")
+        assert "m=8192,t=2,p=1" in new_hash
+        # hash cũ vẫn verify được, nhưng cần hash lại
+        assert pool.verify(old_hash, "secret") is True
+        assert pool.needs_rehash(old_hash) is True
+        assert pool.needs_rehash(new_hash) is False
+        assert pool.needs_rehash("not-a-hash") is False
+    finally:
+        pool.shutdown()
@@ -0,0 +1,42 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import pytest
+from sqlalchemy import create_engine, exc
+
+from app.database.pool_metrics import TimedQueuePool, pool_metrics
+
+
+@pytest.fixture(scope="function")
+def engine(tmp_path):
+    pool_metrics.reset()
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=TimedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.1,
+    )
+    yield engine
+    engine.dispose()
+
+
+def test_checkout_wait_is_recorded(engine):
+    with engine.connect():
+        pass
+    with engine.connect():
+        pass
+    stats = pool_metrics.snapshot()
+    assert stats["checkouts"] == 2
+    assert stats["timeouts"] == 0
+    assert stats["p99_wait_ms"] >= stats["p50_wait_ms"] >= 0
+
+
+def test_checkout_timeout_is_recorded(engine):
+    with engine.connect():
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+    stats = pool_metrics.snapshot()
+    assert stats["timeouts"] == 1
+    assert stats["max_wait_ms"] >= 100
@@ -0,0 +1,97 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+
+from app.core.text import fold, words
+from app.database.base_class import Base
+from app.database.fulltext import install_fulltext
+from app.model.product_model import Product
+from app.model.variation_model import Variation
+from app.service.public_service import PublicProductService, _search_stmt
+
+NAMES = {
+    "Áo thun": ["Áo thun cổ tròn trắng", "Áo thun polo xanh"],
+    "Đầm dạ hội": ["Đầm dạ hội đỏ"],
+    "Quần jean": ["Quần jean ống suông", "Quần short thun"],
+}
+
+
+@pytest.fixture(scope="function")
+def session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    with engine.begin() as conn:
+        install_fulltext(conn)
+    sess = sessionmaker(bind=engine)()
+    for product_name, variation_names in NAMES.items():
+        product = Product(Name=product_name)
+        sess.add(product)
+        sess.flush()
+        for name in variation_names:
+            sess.add(Variation(ProductID=product.PK_Product, SKU=name, Name=name, Price=Decimal("1"), Quantity=1))
+    sess.commit()
+    yield sess
+    sess.close()
+    engine.dispose()
+
+
+def search(session, keyword, backend="fulltext"):
+    return [v.Name for v in PublicProductService(session, backend).search_variations(keyword)]
+
+
+def test_fold():
+    assert fold("Đầm Dạ Hội") == "dam da hoi"
+    assert words("Áo-thun  cổ tròn!") == ["ao", "thun", "co", "tron"]
+
+
+def test_accent_insensitive_prefix_search(session):
+    assert sorted(search(session, "ao thun")) == ["Áo thun cổ tròn trắng", "Áo thun polo xanh"]
+    assert search(session, "dam") == ["Đầm dạ hội đỏ"]
+    assert sorted(search(session, "qua je")) == ["Quần jean ống suông", "Quần short thun"]  # tiền tố từng từ
+    assert search(session, "!!!") == []
+
+
+def test_ranked_by_relevance(session):
+    # "thun" ở tên variation và tên product xếp trước chỉ khớp tên variation
+    assert search(session, "thun")[-1] == "Quần short thun"
+
+
+def test_index_follows_mutations(session):
+    product = session.query(Product).filter(Product.Name == "Quần jean").one()
+    product.Name = "Quần kaki"
+    variation = session.query(Variation).filter(Variation.Name == "Áo thun polo xanh").one()
+    session.delete(variation)
+    session.add(Variation(ProductID=product.PK_Product, SKU="new", Name="Áo khoác gió", Quantity=1))
+    session.commit()
+
+    assert sorted(search(session, "kaki")) == ["Quần jean ống suông", "Quần short thun", "Áo khoác gió"]
+    assert search(session, "polo") == []
+    assert search(session, "khoac") == ["Áo khoác gió"]
+
+
+def test_like_backend_unchanged(session):
+    assert sorted(search(session, "jean", backend="like")) == ["Quần jean ống suông", "Quần short thun"]
+
+
+def test_listing_keeps_id_order(session):
+    variations = PublicProductService(session, "fulltext").get_variations(search="thun")
+    ids = [v.PK_Variation for v in variations]
+    assert ids == sorted(ids) and len(ids) == 3
+
+
+def test_postgres_query_uses_trigram_indexes():
+    sql = str(
+        _search_stmt("Áo 100%", 0, 20, search_backend="fulltext", dialect="postgresql").compile(
+            dialect=postgresql.dialect()
+        )
+    )
+    assert sql.count("f_unaccent(lower(") >= 4  # khớp biểu thức của index
+    assert "word_similarity" in sql
+    assert "IN (SELECT" in sql
@@ -0,0 +1,85 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.core.pagination import InvalidCursorError, next_cursor
+from app.database.base_class import Base
+from app.model.images_model import Images
+from app.model.product_model import Product
+from app.service.imgage_service import ImagesService
+from app.service.product_service import ProductService
+
+
+@pytest.fixture(scope="function")
+def engine():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(scope="function")
+def session(engine):
+    sess = sessionmaker(bind=engine)()
+    sess.add_all([Product(Name=f"Giày {i}") for i in range(25)])
+    sess.flush()
+    sess.add_all([Images(ProductID=1, Id_Image=f"img-{i}.jpg") for i in range(12)])
+    sess.commit()
+    yield sess
+    sess.close()
+
+
+@pytest.fixture(scope="function")
+def statements(engine):
+    executed = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", count)
+    yield executed
+    event.remove(engine, "before_cursor_execute", count)
+
+
+def test_get_products_runs_single_query(session, statements):
+    products = ProductService(session).get_products(skip=20, limit=10)
+    assert [p.Name for p in products] == [f"Giày {i}" for i in range(20, 25)]
+    assert len(statements) == 1
+
+
+def test_count_products_with_filter(session):
+    service = ProductService(session)
+    assert service.count_products() == 25
+    assert service.count_products(name="Giày 1") == 11  # "Giày 1", "Giày 10".."Giày 19"
+    # SQLite không có pg_class nên estimated quay về đếm chính xác
+    assert service.count_products(mode="estimated") == 25
+
+
+def test_get_images_runs_single_query(session, statements):
+    service = ImagesService(session)
+    images = service.get_images(skip=10, limit=5, product_id=1)
+    assert len(images) == 2
+    assert len(statements) == 1
+    assert service.count_images(product_id=1) == 12
+
+
+def test_get_products_cursor_walks_all_pages(session, statements):
+    service = ProductService(session)
+    seen, cursor = [], None
+    while True:
+        page = service.get_products(limit=10, cursor=cursor)
+        seen += [p.PK_Product for p in page]
+        cursor = next_cursor(page, 10, ProductService.KEYSET)
+        if not cursor:
+            break
+    assert seen == list(range(1, 26))
+    assert all("product.pk_product > ?" in s for s in statements[1:])
+
+
+def test_invalid_cursor_is_rejected(session):
+    with pytest.raises(InvalidCursorError):
+        ProductService(session).get_products(cursor="not-a-cursor")
@@ -0,0 +1,85 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database.base_class import Base
+from app.model.brand_model import Brand
+from app.model.category_model import Category
+from app.model.product_model import Product
+from app.model.variation_model import Variation
+from app.service.public_service import AsyncPublicProductService, PublicProductService
+
+
+@pytest.fixture(scope="function")
+def db_path(tmp_path):
+    path = tmp_path / "catalog.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    sess = sessionmaker(bind=engine)()
+    cat = Category(Name="Áo")
+    brand = Brand(Name="Local")
+    sess.add_all([cat, brand])
+    sess.flush()
+    product = Product(Name="Áo thun", CategoryID=cat.PK_Category, BrandID=brand.PK_Brand)
+    sess.add(product)
+    sess.flush()
+    for i in range(5):
+        sess.add(
+            Variation(
+                ProductID=product.PK_Product,
+                SKU=f"SKU-{i}",
+                Name=f"Áo thun size {i}",
+                Price=Decimal("100000"),
+                Quantity=i,  # SKU-0 hết hàng
+                Sold=i * 10,
+                Status="ACTIVE",
+            )
+        )
+    sess.commit()
+    sess.close()
+    engine.dispose()
+    return path
+
+
+@pytest.fixture(scope="function")
+def session(db_path):
+    engine = create_engine(f"sqlite:///{db_path}")
+    sess = sessionmaker(bind=engine)()
+    yield sess
+    sess.close()
+    engine.dispose()
+
+
+def test_get_variations_populates_category(session):
+    variations = PublicProductService(session).get_variations(limit=10)
+    assert len(variations) == 4
+    assert all(v.CategoryID is not None for v in variations)
+
+
+def test_featured_variations_order_by_sold(session):
+    variations = PublicProductService(session).get_featured_variations(limit=2)
+    assert [v.SKU for v in variations] == ["SKU-4", "SKU-3"]
+
+
+@pytest.mark.asyncio
+async def test_async_service_matches_sync(db_path, session):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{db_path}")
+    async with AsyncSession(engine) as db:
+        service = AsyncPublicProductService(db)
+        variations = await service.get_variations(limit=10)
+        found = await service.search_variations("size 3")
+        featured = await service.get_featured_variations(limit=2)
+    await engine.dispose()
+
+    expected = PublicProductService(session).get_variations(limit=10)
+    assert [v.PK_Variation for v in variations] == [v.PK_Variation for v in expected]
+    assert [v.CategoryID for v in variations] == [v.CategoryID for v in expected]
+    assert [v.SKU for v in found] == ["SKU-3"]
+    assert [v.SKU for v in featured] == ["SKU-4", "SKU-3"]
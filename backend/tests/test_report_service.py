@@ -0,0 +1,116 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import sessionmaker
+
+from app.database.base_class import Base
+from app.model.brand_model import Brand
+from app.model.category_model import Category
+from app.model.paymentmethod_model import PaymentMethod
+from app.model.product_model import Product
+from app.model.sales_rollup_model import SalesDailyRollup
+from app.model.variation_model import Variation
+from app.schema.order_schema import OrderCreate, OrderLineCreate, OrderUpdate
+from app.service.order_service import OrderService
+from app.service.report_service import ReportService
+
+
+@pytest.fixture(scope="function")
+def session():
+    engine = create_engine("sqlite:///:memory:")
+    Base.metadata.create_all(engine)
+    sess = sessionmaker(bind=engine)()
+    sess.add_all([Category(Name="Sneaker"), Brand(Name="Nike"), PaymentMethod(Type="Cash")])
+    sess.flush()
+    sess.add_all([Product(Name="Air", CategoryID=1, BrandID=1), Product(Name="No brand")])
+    sess.flush()
+    sess.add_all(
+        [
+            Variation(ProductID=1, SKU="AIR-40", Price=Decimal("100"), Quantity=50, Sold=0),
+            Variation(ProductID=2, SKU="NB-1", Price=Decimal("20"), Quantity=50, Sold=0),
+        ]
+    )
+    sess.commit()
+    yield sess
+    sess.close()
+    engine.dispose()
+
+
+def _order(*lines):
+    return OrderCreate(
+        PaymentMethodID=1,
+        order_lines=[OrderLineCreate(VariationID=v, Quantity=q, Unit_Price=p) for v, q, p in lines],
+    )
+
+
+def _rollup(session):
+    rows = session.execute(
+        select(SalesDailyRollup).order_by(
+            SalesDailyRollup.Status, SalesDailyRollup.CategoryID, SalesDailyRollup.BrandID
+        )
+    ).scalars().all()
+    return [(r.Status, r.CategoryID, r.BrandID, r.Order_Count, r.Line_Count, r.Quantity, r.Revenue) for r in rows]
+
+
+def test_create_and_cancel_update_rollup(session):
+    service = OrderService(session)
+    first = service.create_order(_order((1, 2, Decimal("100")), (2, 1, Decimal("20"))))
+    service.create_order(_order((1, 1, Decimal("100"))))
+
+    assert _rollup(session) == [
+        ("PENDING", 0, 0, 1, 1, 1, Decimal("20")),
+        ("PENDING", 1, 1, 2, 2, 3, Decimal("300")),
+    ]
+
+    service.cancel_order(first.PK_POSOrder)
+    assert _rollup(session) == [
+        ("CANCELLED", 0, 0, 1, 1, 1, Decimal("20")),
+        ("CANCELLED", 1, 1, 1, 1, 2, Decimal("200")),
+        ("PENDING", 0, 0, 0, 0, 0, Decimal("0")),
+        ("PENDING", 1, 1, 1, 1, 1, Decimal("100")),
+    ]
+
+    reports = ReportService(session)
+    today = date.today()
+    assert [dict(r) for r in reports.daily_sales()] == [
+        {"date": today, "orders": 1, "quantity": 1, "revenue": Decimal("100")}
+    ]
+    by_brand = reports.sales_by_brand(status="cancelled")
+    assert [(r["brand_name"], r["revenue"]) for r in by_brand] == [("Nike", Decimal("200")), (None, Decimal("20"))]
+
+
+def test_rebuild_matches_incremental(session):
+    service = OrderService(session)
+    a = service.create_order(_order((1, 2, Decimal("100")), (2, 3, Decimal("20"))))
+    b = service.create_order(_order((2, 1, Decimal("20"))))
+    service.create_order(_order((1, 1, Decimal("100"))))
+    service.update_order(a.PK_POSOrder, OrderUpdate(Status="completed"))
+    service.cancel_order(b.PK_POSOrder)
+
+    incremental = [row for row in _rollup(session) if row[3]]  # bỏ các dòng đã về 0
+    ReportService(session).rebuild(chunk_size=2)
+    assert _rollup(session) == incremental
+
+
+def test_cancel_after_product_moves_category(session):
+    service = OrderService(session)
+    order = service.create_order(_order((1, 2, Decimal("100"))))
+    session.add(Category(Name="Running"))
+    session.get(Product, 1).CategoryID = 2
+    session.commit()
+
+    service.cancel_order(order.PK_POSOrder)
+    # trừ đúng nhóm đã cộng lúc đặt, không tạo dòng âm ở danh mục mới
+    assert _rollup(session) == [
+        ("CANCELLED", 1, 1, 1, 1, 2, Decimal("200")),
+        ("PENDING", 1, 1, 0, 0, 0, Decimal("0")),
+    ]
+    incremental = [row for row in _rollup(session) if row[3]]
+    ReportService(session).rebuild()
+    assert _rollup(session) == incremental
@@ -0,0 +1,195 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import threading
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database.base_class import Base
+from app.model.brand_model import Brand
+from app.model.category_model import Category
+from app.schema.order_schema import OrderCreate, OrderLineCreate
+from app.schema.product_schema import ProductCreate
+from app.schema.variation_schema import VariationCreate, VariationUpdate
+from app.service import search_index
+from app.service.order_service import OrderService
+from app.service.product_service import ProductService
+from app.service.search_index import IndexedProduct, SearchIndex, _within_one_edit, load_from_database
+from app.service.variation_service import VariationService
+
+PRODUCTS = {
+    1: IndexedProduct("Áo khoác", 1, 1),
+    2: IndexedProduct("Đầm dạ hội", 2, 1),
+    3: IndexedProduct("Quần jean", 3, 2),
+}
+
+
+def doc(variation_id, product_id, name, quantity=5, **fields):
+    return dict(
+        {field: None for field in search_index.PUBLIC_FIELDS},
+        PK_Variation=variation_id,
+        ProductID=product_id,
+        SKU=f"SKU-{variation_id:03d}",
+        Name=name,
+        Price=Decimal("100000"),
+        Quantity=quantity,
+        Status="ACTIVE",
+        **fields,
+    )
+
+
+ROWS = [
+    doc(1, 1, "Áo khoác gió", Color="Đen", Material="Dù"),
+    doc(2, 1, "Áo khoác jean", Color="Xanh"),
+    doc(3, 2, "Đầm đỏ", Size="M"),
+    doc(4, 3, "Quần jean ống suông", Color="Xanh"),
+    doc(5, 3, "Quần jean rách", quantity=0),
+]
+
+
+@pytest.fixture(scope="function")
+def index():
+    index = SearchIndex(lambda: ((row, row["ProductID"], PRODUCTS[row["ProductID"]]) for row in ROWS))
+    index.rebuild()
+    return index
+
+
+def ids(results):
+    return [result["PK_Variation"] for result in results]
+
+
+def test_within_one_edit():
+    assert _within_one_edit("khoac", "khoac")
+    assert _within_one_edit("khoac", "khaoc")  # đảo ký tự
+    assert _within_one_edit("khoac", "khoc")
+    assert _within_one_edit("khoac", "khoat")
+    assert not _within_one_edit("khoac", "kaoc")
+
+
+def test_accent_insensitive_prefix_and_fields(index):
+    assert ids(index.search("dam do")) == [3]
+    assert ids(index.search("ĐẦM")) == [3]
+    assert ids(index.search("ao kh")) == [1, 2]
+    assert ids(index.search("den")) == [1]  # màu
+    assert ids(index.search("sku-004")) == [4]
+    assert index.search("!!!") == []
+
+
+def test_typo_tolerance(index):
+    assert ids(index.search("khaoc gio")) == [1]
+    assert ids(index.search("jaen")) == [2, 4]
+    assert index.search("xyzw") == []
+
+
+def test_ranking_filters_and_stock(index):
+    # khớp tên xếp trên khớp màu, cùng điểm thì theo id; hết hàng bị loại
+    index.upsert_variation(doc(6, 2, "Đầm xanh"))
+    assert ids(index.search("xanh")) == [6, 2, 4]
+    assert ids(index.search("jean")) == [2, 4]
+    assert ids(index.search("xanh", category_id=3)) == [4]
+    assert ids(index.search("xanh", brand_id=1)) == [6, 2]
+    assert ids(index.search("xanh", skip=1, limit=1)) == [2]
+    result = index.search("gio")[0]
+    assert result["CategoryID"] == 1 and result["SKU"] == "SKU-001"
+
+
+def test_incremental_updates(index):
+    index.upsert_variation(doc(6, 2, "Đầm maxi hoa"))
+    index.upsert_variation(doc(1, 1, "Áo gió nhẹ"))
+    index.remove_variation(3)
+    index.upsert_product(3, IndexedProduct("Quần kaki", 3, 2))
+
+    assert ids(index.search("maxi")) == [6]
+    assert ids(index.search("nhe")) == [1]
+    assert ids(index.search("khoac")) == [1, 2]  # tên product
+    assert index.search("do") == []
+    assert ids(index.search("kaki")) == [4]
+    assert index.stats()["terms"] == len(index._state.postings)
+
+    index.remove_product(1)
+    assert index.search("ao") == []
+    assert index.stats()["variations"] == 3
+
+
+def test_changes_during_rebuild_are_kept():
+    loading, release = threading.Event(), threading.Event()
+
+    def slow_loader():
+        loading.set()
+        release.wait()
+        return [(ROWS[0], 1, PRODUCTS[1])]
+
+    index = SearchIndex(slow_loader)
+    rebuild = threading.Thread(target=index.rebuild)
+    rebuild.start()
+    loading.wait()
+    index.upsert_variation(doc(7, 1, "Áo len"))
+    release.set()
+    rebuild.join()
+    assert ids(index.search("ao")) == [1, 7]
+
+
+@pytest.fixture(scope="function")
+def session_factory():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        db.add_all([Category(Name="Áo"), Brand(Name="Local")])
+        db.commit()
+    yield factory
+    engine.dispose()
+
+
+def test_load_from_database_and_service_hooks(session_factory, monkeypatch):
+    db = session_factory()
+    product = ProductService(db).create_product(ProductCreate(Name="Áo thun", Images=None, CategoryID=1, BrandID=1))
+    variation = VariationService(db).create_variation(
+        VariationCreate(ProductID=product.PK_Product, SKU="AT-1", Name="Áo thun trắng", Price=1, Quantity=3,
+                        Status="ACTIVE")
+    )
+    index = SearchIndex(load_from_database(session_factory))
+    assert index.rebuild() == 1
+    monkeypatch.setattr(search_index, "_search_index", index)
+
+    VariationService(db).update_variation(variation.PK_Variation, VariationUpdate(Color="Đỏ"))
+    assert ids(index.search("do")) == [variation.PK_Variation]
+    ProductService(db).update_product(
+        product.PK_Product, ProductCreate(Name="Áo polo", Images=None, CategoryID=1, BrandID=1)
+    )
+    assert ids(index.search("polo")) == [variation.PK_Variation]
+    VariationService(db).create_variation(
+        VariationCreate(ProductID=product.PK_Product, SKU="AT-2", Name="Áo polo đen", Price=1, Quantity=1,
+                        Status="ACTIVE")
+    )
+    assert len(index.search("polo")) == 2
+    ProductService(db).delete_product(product.PK_Product)
+    assert index.search("polo") == []
+    db.close()
+
+
+def test_orders_update_indexed_stock(session_factory, monkeypatch):
+    db = session_factory()
+    product = ProductService(db).create_product(ProductCreate(Name="Áo thun", Images=None, CategoryID=1, BrandID=1))
+    variation = VariationService(db).create_variation(
+        VariationCreate(ProductID=product.PK_Product, SKU="AT-1", Name="Áo thun trắng", Price=1, Quantity=2,
+                        Status="ACTIVE")
+    )
+    index = SearchIndex(load_from_database(session_factory))
+    index.rebuild()
+    monkeypatch.setattr(search_index, "_search_index", index)
+
+    order = OrderService(db).create_order(
+        OrderCreate(
+            PaymentMethodID=1,
+            order_lines=[OrderLineCreate(VariationID=variation.PK_Variation, Quantity=2, Unit_Price=Decimal("1"))],
+        )
+    )
+    assert index.search("ao thun") == []  # hết hàng
+    OrderService(db).cancel_order(order.PK_POSOrder)
+    assert [result["Quantity"] for result in index.search("ao thun")] == [2]
+    db.close()
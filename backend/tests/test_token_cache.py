@@ -0,0 +1,63 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import time
+
+import pytest
+from jose import JWTError, jwt
+
+from app.auth.token_cache import TokenCache
+
+SECRET = "test-secret"
+
+
+def make_token(exp_in: float, **claims):
+    return jwt.encode({"sub": "alice", "exp": int(time.time() + exp_in), **claims}, SECRET, algorithm="HS256")
+
+
+def test_cached_until_expiry():
+    now = [time.time()]
+    cache = TokenCache(SECRET, "HS256", maxsize=10, clock=lambda: now[0])
+    token = make_token(60, ver=1)
+
+    assert cache.decode(token)["ver"] == 1
+    assert cache.decode(token)["ver"] == 1
+    now[0] += 30
+    cache.decode(token)
+    assert (cache.hits, cache.misses) == (2, 1)
+    assert cache.stats()["size"] == 1
+
+
+def test_invalid_tokens_are_not_cached():
+    cache = TokenCache(SECRET, "HS256", maxsize=10)
+    forged = jwt.encode({"sub": "alice", "exp": int(time.time() + 60)}, "other-secret", algorithm="HS256")
+    for _ in range(2):
+        with pytest.raises(JWTError):
+            cache.decode(forged)
+    with pytest.raises(JWTError):
+        cache.decode(make_token(-10))
+    assert cache.stats() == {"size": 0, "maxsize": 10, "hits": 0, "misses": 3, "hit_ratio": 0.0}
+
+
+def test_entry_expires_with_token():
+    now = [time.time()]
+    cache = TokenCache(SECRET, "HS256", maxsize=10, clock=lambda: now[0])
+    token = make_token(30)
+    cache.decode(token)
+    now[0] += 31
+    cache.decode(token)
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+def test_bounded_and_disabled():
+    cache = TokenCache(SECRET, "HS256", maxsize=2)
+    tokens = [make_token(60, n=n) for n in range(3)]
+    for token in tokens:
+        cache.decode(token)
+    assert cache.stats()["size"] == 2
+
+    disabled = TokenCache(SECRET, "HS256", maxsize=0)
+    disabled.decode(tokens[0])
+    disabled.decode(tokens[0])
+    assert (disabled.hits, disabled.misses) == (0, 2)
@@ -0,0 +1,119 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import sessionmaker
+
+from app.auth import revocation as revocation_module
+from app.auth.revocation import BloomFilter, RevocationList
+from app.database.base_class import Base
+from app.model.revoked_token_model import RevokedToken
+
+
+@pytest.fixture(scope="function")
+def engine(tmp_path):
+    # file DB: hai RevocationList (hai worker) dùng chung bảng qua các connection khác nhau
+    engine = create_engine(f"sqlite:///{tmp_path}/revocation.db")
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(scope="function")
+def session_factory(engine):
+    return sessionmaker(bind=engine)
+
+
+@pytest.fixture(scope="function")
+def session(session_factory):
+    sess = session_factory()
+    yield sess
+    sess.close()
+
+
+@pytest.fixture(scope="function")
+def statements(engine):
+    executed = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield executed
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def in_one_hour():
+    return datetime.utcnow() + timedelta(hours=1)
+
+
+def test_bloom_filter_no_false_negatives_and_bounded_false_positives():
+    bloom = BloomFilter(capacity=10000, error_rate=0.01)
+    members = [uuid.uuid4().hex for _ in range(10000)]
+    for jti in members:
+        bloom.add(jti)
+    assert all(jti in bloom for jti in members)
+
+    false_positives = sum(uuid.uuid4().hex in bloom for _ in range(20000))
+    assert false_positives / 20000 < 0.02
+    assert len(bloom._bits) < 10000 * 2  # ~1.2 byte / phần tử
+
+
+def test_unrevoked_token_needs_no_query(session_factory, session, statements):
+    revocation = RevocationList(session_factory)
+    revocation.revoke(session, "revoked-jti", in_one_hour(), account_id=1)
+    statements.clear()
+
+    assert revocation.is_revoked(session, uuid.uuid4().hex) is False
+    assert statements == []
+    assert revocation.is_revoked(session, "revoked-jti") is True
+    assert len(statements) == 1
+
+
+def test_revoke_twice_is_harmless(session_factory, session):
+    revocation = RevocationList(session_factory)
+    revocation.revoke(session, "jti-1", in_one_hour())
+    revocation.revoke(session, "jti-1", in_one_hour())
+    assert session.scalar(select(func.count()).select_from(RevokedToken)) == 1
+    assert revocation.is_revoked(session, "jti-1")
+
+
+def test_other_worker_sees_revocation_after_refresh(session_factory, session):
+    worker_a, worker_b = RevocationList(session_factory), RevocationList(session_factory)
+    worker_a.refresh()
+    worker_b.refresh()
+
+    worker_a.revoke(session, "jti-1", in_one_hour())
+    assert worker_b.is_revoked(session, "jti-1") is False  # chưa nạp lại filter
+    assert worker_b.refresh() == 1
+    assert worker_b.is_revoked(session, "jti-1") is True
+
+
+def test_refresh_purges_expired_rows(session_factory, session):
+    revocation = RevocationList(session_factory)
+    revocation.revoke(session, "expired", datetime.utcnow() - timedelta(seconds=1))
+    revocation.revoke(session, "active", in_one_hour())
+
+    assert revocation.refresh() == 1
+    assert session.scalars(select(RevokedToken.JTI)).all() == ["active"]
+    assert revocation.is_revoked(session, "expired") is False
+
+
+def test_revoke_during_refresh_is_not_lost(session_factory, session, monkeypatch):
+    revocation = RevocationList(session_factory)
+    real_bloom_filter = BloomFilter
+
+    def bloom_filter_after_revoke(*args, **kwargs):
+        # refresh() đã đọc xong bảng nhưng chưa thay filter: một request logout chen vào đúng lúc này
+        monkeypatch.setattr(revocation_module, "BloomFilter", real_bloom_filter)
+        revocation.revoke(session, "revoked-during-refresh", in_one_hour())
+        return real_bloom_filter(*args, **kwargs)
+
+    monkeypatch.setattr(revocation_module, "BloomFilter", bloom_filter_after_revoke)
+    assert revocation.refresh() == 0
+    assert revocation.is_revoked(session, "revoked-during-refresh") is True